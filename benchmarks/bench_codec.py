@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""
+Benchmark comparing the FileStorage snapshot formats.
+
+Usage (from the repository root):
+>>  python3 -m benchmarks.bench_codec [--places N]
+
+For each format of `formats`, prints the size of the snapshot file and
+the time FileStorage takes to reload it and to save it again.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_reload import generate
+
+
+def measure(file_format, source, file_path):
+    """Converts `source` to `file_format`, then reloads and saves it."""
+    from models.engine.file_storage import FileStorage, formats
+    from models.engine.snapshot import iter_json
+
+    codec = formats[file_format]
+    with open(source) as src, open(file_path, 'w' + codec.binary) as dst:
+        codec.write(dst, iter_json(src))
+    size = os.path.getsize(file_path) / (1 << 20)
+
+    storage = FileStorage(file_path, file_format=file_format)
+    start = time.perf_counter()
+    storage.reload()
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    storage.save()
+    saved = time.perf_counter() - start
+    print(
+        f"{file_format:>9}: {size:7.1f} MiB, "
+        f"reload {loaded:.2f}s, save {saved:.2f}s"
+    )
+
+
+def main():
+    """Generates a file and measures every format on it."""
+    from models.engine.file_storage import formats
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--places", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.json")
+        generate(source, args.places)
+        for file_format in formats:
+            measure(file_format, source, os.path.join(tmp, file_format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""
+Benchmark comparing the size and CPU cost of compressed snapshots.
+
+Usage (from the repository root):
+>>  python3 -m benchmarks.bench_compression [--places N]
+
+For each streaming format and each codec of `compressions`, prints the
+size of the snapshot file and the time FileStorage takes to reload it
+and to save it again.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_reload import generate
+
+
+def measure(file_format, ext, source, file_path):
+    """
+    Converts `source` to `file_format` compressed by the codec of `ext`,
+    then reloads and saves it.
+    """
+    from models.engine.file_storage import (
+        FileStorage, compressions, formats
+    )
+    from models.engine.snapshot import iter_json
+
+    codec = formats[file_format]
+    opener = compressions.get(ext, open)
+    with open(source) as src, opener(
+        file_path, 'w' + (codec.binary or 't')
+    ) as dst:
+        codec.write(dst, iter_json(src))
+    size = os.path.getsize(file_path) / (1 << 20)
+
+    storage = FileStorage(file_path, file_format=file_format)
+    start = time.perf_counter()
+    storage.reload()
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    storage.save()
+    saved = time.perf_counter() - start
+    name = f"{file_format}{ext}"
+    print(
+        f"{name:>13}: {size:7.1f} MiB, "
+        f"reload {loaded:.2f}s, save {saved:.2f}s"
+    )
+
+
+def main():
+    """Generates a file and measures every format and codec on it."""
+    from models.engine.file_storage import compressions, formats
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--places", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.json")
+        generate(source, args.places)
+        for file_format, codec in formats.items():
+            if codec.mapper is not None:
+                # read in place, so never compressed
+                continue
+            for ext in ("", *compressions):
+                file_path = os.path.join(tmp, f"{file_format}{ext}")
+                measure(file_format, ext, source, file_path)
+
+
+if __name__ == "__main__":
+    main()
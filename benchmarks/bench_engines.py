@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+"""
+Benchmark comparing the storage engines with the in-memory baseline.
+
+Usage (from the repository root):
+>>  python3 -m benchmarks.bench_engines [--states N] [--cities N]
+
+Each engine runs in its own process (HBNB_TYPE_STORAGE is read when the
+models are imported) in a temporary directory, and times:
+-   insert: new() of every object, with a save() every 100 objects.
+-   get: one get() per object.
+-   all: iterating over all() of each class.
+-   related: State.cities of every state.
+The overhead of an engine is its time minus the time of `memory`.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ENGINES = ("memory", "file", "dbm", "sqlite")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed(measures, name, function):
+    """Runs `function` and stores its duration in `measures`."""
+    start = time.perf_counter()
+    function()
+    measures[name] = time.perf_counter() - start
+
+
+def run(engine, states, cities):
+    """Runs every measure on the storage of the current process."""
+    from models import storage
+    from models.state import State
+    from models.city import City
+
+    objects = []
+    for i in range(states):
+        state = State(name=f"State {i}")
+        objects.append(state)
+        for j in range(cities):
+            objects.append(City(state_id=state.id, name=f"City {i}.{j}"))
+
+    def insert():
+        for i, obj in enumerate(objects, 1):
+            storage.new(obj)
+            if i % 100 == 0:
+                storage.save()
+        storage.save()
+
+    def get():
+        for obj in objects:
+            storage.get(obj.__class__, obj.id)
+
+    def all():
+        for cls in (State, City):
+            for _ in storage.all(cls).values():
+                pass
+
+    def related():
+        for state in storage.all(State).values():
+            state.cities
+
+    measures = {}
+    timed(measures, "insert", insert)
+    timed(measures, "get", get)
+    timed(measures, "all", all)
+    timed(measures, "related", related)
+    storage.close()
+    print(f"{engine:>8}: " + ", ".join(
+        f"{name} {elapsed:.2f}s" for name, elapsed in measures.items()
+    ))
+
+
+def main():
+    """Runs every engine in its own process."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--states", type=int, default=200)
+    parser.add_argument("--cities", type=int, default=20)
+    parser.add_argument("--run", choices=ENGINES)
+    args = parser.parse_args()
+
+    if args.run:
+        run(args.run, args.states, args.cities)
+        return
+
+    count = args.states * (args.cities + 1)
+    print(f"{count} objects")
+    for engine in ENGINES:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                HBNB_TYPE_STORAGE=engine,
+                PYTHONPATH=os.pathsep.join(
+                    filter(None, (ROOT, os.getenv("PYTHONPATH")))
+                ),
+            )
+            env.pop("HBNB_ENV", None)
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_engines",
+                 "--run", engine, "--states", str(args.states),
+                 "--cities", str(args.cities)],
+                cwd=tmp, env=env, check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
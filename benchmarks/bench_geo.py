@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""
+Benchmark comparing the grid index searches with a scan of every place.
+
+Usage (from the repository root):
+>>  python3 -m benchmarks.bench_geo [--places N] [--queries N] [--radius KM]
+
+Places are spread at random over the contiguous United States and added
+to a FileStorage, then the same random searches are timed:
+-   build: the first search, which builds the grid index.
+-   nearby: nearby() within the radius of a random point.
+-   within: within() of a random box of one degree.
+-   scan: the same nearby search, computing the distance of every place
+    of all(), as the code did before the index.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+# the contiguous United States, (south, west, north, east)
+AREA = (24.5, -124.8, 49.4, -66.9)
+
+
+def main():
+    """Generates the places and measures each search on them."""
+    from models.engine.file_storage import FileStorage
+    from models.engine.geo import distance
+    from models.place import Place
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--places", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--radius", type=float, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    south, west, north, east = AREA
+
+    def point():
+        return rng.uniform(south, north), rng.uniform(west, east)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = FileStorage(os.path.join(tmp, "hbnb.json"))
+        for i in range(args.places):
+            latitude, longitude = point()
+            storage.new(
+                Place(name=f"Place {i}", latitude=latitude,
+                      longitude=longitude)
+            )
+        points = [point() for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        storage.within(Place, *AREA)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = [
+            len(storage.nearby(Place, lat, lon, args.radius))
+            for lat, lon in points
+        ]
+        nearby = (time.perf_counter() - start) / args.queries
+
+        start = time.perf_counter()
+        for lat, lon in points:
+            storage.within(Place, lat, lon, lat + 1, lon + 1)
+        within = (time.perf_counter() - start) / args.queries
+
+        start = time.perf_counter()
+        scanned = [
+            sum(
+                1
+                for place in storage.all(Place).values()
+                if distance(lat, lon, place.latitude, place.longitude)
+                <= args.radius
+            )
+            for lat, lon in points
+        ]
+        scan = (time.perf_counter() - start) / args.queries
+
+    assert found == scanned, "the index and the scan disagree"
+    print(f"{args.places} places, {sum(found) / len(found):.1f} found "
+          f"within {args.radius:g} km on average")
+    print(f" build: {build:.2f}s")
+    print(f"nearby: {nearby * 1000:.2f} ms per search")
+    print(f"within: {within * 1000:.2f} ms per search")
+    print(f"  scan: {scan * 1000:.2f} ms per search")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+"""
+Benchmark comparing the FileStorage reload paths on a generated file.
+
+Usage (from the repository root):
+>>  python3 -m benchmarks.bench_reload [--places N] [--file PATH]
+
+Each path runs in its own process so that its peak memory (max RSS)
+can be measured:
+-   legacy: f.read() + json.loads() + building every object.
+-   stream: FileStorage.reload(), which decodes one record at a time.
+-   lazy: FileStorage.reload() in lazy mode, which builds no object.
+-   mapped: FileStorage.reload() in lazy mode on the same records in the
+    memory-mapped format, which decodes no record, followed by a get().
+-   cached: FileStorage.reload() from the cache of built objects, written
+    beforehand by an untimed reload.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+DESCRIPTION = "A cozy place to stay, close to everything. " * 8
+
+
+def generate(path, places):
+    """Writes a hbnb.json holding `places` Place records."""
+    with open(path, 'w') as f:
+        f.write("{")
+        for i in range(places):
+            place_id = str(uuid.uuid4())
+            record = {
+                "id": place_id,
+                "created_at": "2024-01-01T00:00:00.000001",
+                "updated_at": "2024-01-01T00:00:00.000001",
+                "__class__": "Place",
+                "city_id": str(uuid.uuid4()),
+                "user_id": str(uuid.uuid4()),
+                "name": f"Place {i}",
+                "description": DESCRIPTION,
+                "number_rooms": i % 5,
+                "number_bathrooms": i % 3,
+                "max_guest": i % 10,
+                "price_by_night": i % 300,
+                "latitude": 37.77,
+                "longitude": -122.41,
+            }
+            separator = ", " if i else ""
+            f.write(f'{separator}"Place.{place_id}": {json.dumps(record)}')
+        f.write("}")
+
+
+def run(path_name, file_path):
+    """Loads `file_path` with the given path and prints the measures."""
+    from models.engine.file_storage import FileStorage, classes
+
+    if path_name == "mapped":
+        from models.engine.mapped import MappedSnapshot
+
+        with open(file_path, 'rb') as f:
+            key = next(iter(MappedSnapshot(f)))
+
+    start = time.perf_counter()
+    if path_name == "legacy":
+        with open(file_path) as f:
+            _dict = json.loads(f.read())
+        objects = {
+            key: classes[key.split('.')[0]](**obj)
+            for key, obj in _dict.items()
+        }
+    elif path_name == "mapped":
+        storage = FileStorage(file_path, lazy=True, file_format="mapped")
+        storage.reload()
+        storage.get("Place", key.split('.')[1])
+    elif path_name == "cached":
+        storage = FileStorage(file_path, cache=True)
+        storage.reload()
+    else:
+        storage = FileStorage(file_path, lazy=path_name == "lazy")
+        storage.reload()
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{path_name:>8}: loaded in {elapsed:.2f}s, peak RSS {peak:.0f} MiB")
+
+
+def main():
+    """Generates the file if needed and runs every path."""
+    from models.engine.mapped import write_mapped
+    from models.engine.snapshot import iter_json
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--places", type=int, default=100000)
+    parser.add_argument("--file", help="existing file to load instead")
+    parser.add_argument(
+        "--run", choices=("legacy", "stream", "lazy", "mapped", "cached")
+    )
+    args = parser.parse_args()
+
+    if args.run:
+        run(args.run, args.file)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = args.file
+        if file_path is None:
+            file_path = os.path.join(tmp, "hbnb.json")
+            generate(file_path, args.places)
+        size = os.path.getsize(file_path) / (1 << 20)
+        print(f"{file_path}: {size:.0f} MiB")
+        mapped_path = os.path.join(tmp, "hbnb.map")
+        with open(file_path) as src, open(mapped_path, 'wb') as dst:
+            write_mapped(dst, iter_json(src))
+        # in another process, so that it does not count in the peak RSS
+        # the runs inherit
+        subprocess.run(
+            [sys.executable, "-c",
+             "import sys; from models.engine.file_storage import FileStorage;"
+             " FileStorage(sys.argv[1], cache=True).reload()", file_path],
+            check=True,
+        )
+        for path_name in ("legacy", "stream", "lazy", "mapped", "cached"):
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_reload",
+                 "--run", path_name, "--file",
+                 mapped_path if path_name == "mapped" else file_path],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
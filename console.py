@@ -19,12 +19,14 @@ The console offers the following functionalities:
 > destroy User <id> | User.destroy(<id>)
 - Counting the number of instances for each class.
 > count all | count User
+- Searching the text of places and reviews, the best matches first.
+> search Place <words> | Place.search(<words>)
 """
 import cmd
 import sys
 from typing import TypedDict
 from models.base_model import BaseModel
-from models.__init__ import storage
+from models import storage
 from models.user import User
 from models.place import Place
 from models.state import State
@@ -43,6 +45,7 @@ class ErrorMessages(TypedDict):
     no_attr_name: str
     no_attr_value: str
     no_json: str
+    no_search: str
 
 
 error_messages: ErrorMessages = {
@@ -54,6 +57,7 @@ error_messages: ErrorMessages = {
     "no_attr_name": "** attribute name missing **",
     "no_attr_value": "** value missing **",
     "no_json": "** invalid json object **",
+    "no_search": "** search text missing **",
 }
 
 classes = {
@@ -122,6 +126,7 @@ class HBNBCommand(cmd.Cmd):
             'show',
             'destroy',
             'update',
+            'search',
         ]
 
         _cmd = _cls = _id = _args = ''
@@ -275,9 +280,7 @@ class HBNBCommand(cmd.Cmd):
 
         c_name = args["c_name"]
         obj_id = args["obj_id"]
-        all_objs = storage.all()
-        key = f"{c_name}.{obj_id}"
-        obj = all_objs.get(key)
+        obj = storage.get(c_name, obj_id)
 
         if obj is None:
             print(error_messages["no_obj"])
@@ -292,7 +295,7 @@ class HBNBCommand(cmd.Cmd):
     def do_destroy(self, arg):
         """
         Deletes an instance based on the class name and provided instance id
-        (saves the change into the JSON file).
+        (saves the change into the storage).
 
         Args:
         -   arg (str): The user input argument (command to be interpreted).
@@ -306,14 +309,12 @@ class HBNBCommand(cmd.Cmd):
         c_name = args["c_name"]
         obj_id = args["obj_id"]
 
-        objs = storage.all()
-        key = f"{c_name}.{obj_id}"
-        removed_obj = objs.pop(key, None)
-        if removed_obj is None:
+        obj = storage.get(c_name, obj_id)
+        if obj is None:
             print(error_messages["no_obj"])
             return
 
-        storage.save()
+        storage.delete(obj)
 
     def help_destroy(self):
         """Help information for the destroy command"""
@@ -365,20 +366,49 @@ class HBNBCommand(cmd.Cmd):
         if not args:
             return
 
-        nm_instances = 0
-        objs = storage.all()
-        for obj in objs.values():
-            nm_instances += (
-                1
-                if arg == "all" or obj.__class__.__name__ == args["c_name"]
-                else 0
-            )
-        print(nm_instances)
+        if arg == "all":
+            print(storage.count())
+        else:
+            print(storage.count(args["c_name"]))
 
     def help_count(self):
         """ """
         print("Usage: count <class_name>")
 
+    def do_search(self, arg):
+        """
+        Prints the string representation of the instances of a class
+        whose text matches the search, the best matches first.
+
+        Args:
+        -   arg (str): The user input argument (command to be interpreted).
+
+        Return:
+        -   None (prints the matching instances or empty []).
+
+        Raises:
+        -   None (prints error messages to the console).
+        """
+        args = validate(arg, get_params=True)
+        if not args:
+            return
+        if args["c_name"] == "all":
+            print(error_messages["no_cls"])
+            return
+
+        text = args["params"].strip()
+        if not text:
+            print(error_messages["no_search"])
+            return
+
+        objs = [obj.__str__() for obj in storage.search(args["c_name"], text)]
+        print(objs)
+
+    def help_search(self):
+        """Help information for the search command"""
+        print("Shows the objects of a class matching words or \"phrases\"")
+        print("[Usage]: search <className> <words>\n")
+
     def do_update(self, arg):
         """
         Updates an instance based on the class name and its id.
@@ -397,14 +427,11 @@ class HBNBCommand(cmd.Cmd):
         c_name = args["c_name"]
         attributes = args["attributes"][0]
 
-        key = f"{c_name}.{c_id}"
-
-        if key not in storage.all():
+        obj = storage.get(c_name, c_id)
+        if obj is None:
             print(error_messages["no_obj"])
             return
 
-        obj = storage.all()[key]
-
         # determine if attributes are kwargs or args
         if (
             '{' in attributes
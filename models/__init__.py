@@ -1,13 +1,27 @@
 #!/usr/bin/python3
-"""This module instantiates an object of class FileStorage"""
+"""This module instantiates the storage engine"""
 import os
 
 storage_type = os.getenv('HBNB_TYPE_STORAGE')
+# the engines storing the models in SQL tables through SQLAlchemy
+sql_storage = storage_type in ('db', 'sqlite')
 
 if storage_type == 'db':
     from models.engine.db_storage import DBStorage
 
     storage = DBStorage()
+elif storage_type == 'sqlite':
+    from models.engine.sqlite_storage import SQLiteStorage
+
+    storage = SQLiteStorage()
+elif storage_type == 'dbm':
+    from models.engine.dbm_storage import DBMStorage
+
+    storage = DBMStorage()
+elif storage_type == 'memory':
+    from models.engine.memory_storage import MemoryStorage
+
+    storage = MemoryStorage()
 else:
     from models.engine.file_storage import FileStorage
 
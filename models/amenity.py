@@ -3,11 +3,11 @@
 from sqlalchemy import Column, String
 from sqlalchemy.orm import relationship
 from models.base_model import BaseModel, Base
-from models import storage_type
+from models import sql_storage
 
 
 class Amenity(BaseModel, Base):
-    if storage_type == 'db':
+    if sql_storage:
         __tablename__ = 'amenities'
         name = Column(String(128), nullable=False)
         place_amenities = relationship(
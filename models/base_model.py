@@ -4,10 +4,10 @@ import uuid
 from datetime import datetime
 from sqlalchemy import Column, String, DateTime
 from sqlalchemy.ext.declarative import declarative_base
-from models import storage_type
+from models import sql_storage
 
 Base = object
-if storage_type == 'db':
+if sql_storage:
     Base = declarative_base()
 
 
@@ -20,7 +20,7 @@ class BaseModel:
         updated_at: Timestamp indicating when the instance was updated.
     """
 
-    if storage_type == 'db':
+    if sql_storage:
         id = Column(String(60), primary_key=True, nullable=False)
         created_at = Column(DateTime, default=datetime.now(), nullable=False)
         updated_at = Column(DateTime, default=datetime.now(), nullable=False)
@@ -32,9 +32,12 @@ class BaseModel:
             *args: Variable length argument list.
             **kwargs: Arbitrary keyword arguments.
         """
-        self.id = str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = self.created_at
+        # objects rebuilt from storage already have these
+        if 'id' not in kwargs:
+            self.id = str(uuid.uuid4())
+        if 'created_at' not in kwargs or 'updated_at' not in kwargs:
+            self.created_at = datetime.now()
+            self.updated_at = self.created_at
 
         if kwargs:
             for key, value in kwargs.items():
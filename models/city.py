@@ -3,16 +3,21 @@
 from models.base_model import BaseModel, Base
 from sqlalchemy.orm import relationship
 from sqlalchemy import Column, String, ForeignKey
-from models import storage_type
+from models import sql_storage
 
 
 class City(BaseModel, Base):
     """The city class, contains state ID and name"""
 
-    if storage_type == 'db':
+    if sql_storage:
         __tablename__ = 'cities'
         name = Column(String(128), nullable=False)
-        state_id = Column(String(60), ForeignKey('states.id'), nullable=False)
+        state_id = Column(
+            String(60),
+            ForeignKey('states.id'),
+            nullable=False,
+            index=True,
+        )
         state = relationship('State', back_populates='cities')
         places = relationship(
             'Place', back_populates='cities', cascade='all, delete'
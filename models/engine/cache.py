@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""
+Module reading and writing the cache of built objects kept next to the
+snapshot files.
+
+Unpickling the objects is much faster than decoding the records and
+building the objects from them, so FileStorage can start from the cache
+as long as the snapshot files did not change since it was written.
+
+Layout of a cache file:
+>>  MAGIC, VERSION (H), CRC32 of the payload (I), payload size (Q)
+>>  payload: the pickled (fingerprint, {key: object}) pair
+
+The cache is trusted as much as the snapshot files: it must only be
+writable by whoever can write them, since unpickling runs code.
+"""
+import os
+import pickle
+import struct
+import zlib
+
+MAGIC = b"HBNBPKL"
+# bump when the cached objects change in an incompatible way
+VERSION = 1
+_HEADER = struct.Struct("<7sHIQ")
+
+
+def read_cache(path, fingerprint):
+    """
+    Returns the {key: object} dictionary stored in the cache at `path`,
+    or None if there is no cache, if it is damaged or from another
+    version, or if it was written for another fingerprint.
+
+    Args:
+    -   path (str): The path to the cache file.
+    -   fingerprint: What identifies the snapshot files the objects
+            were read from, compared with the one stored in the cache.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                return None
+            magic, version, checksum, size = _HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                return None
+            payload = f.read(size)
+    except OSError:
+        return None
+    if len(payload) != size or zlib.crc32(payload) != checksum:
+        return None
+    try:
+        cached_fingerprint, objects = pickle.loads(payload)
+    except Exception:
+        # e.g. a class that no longer exists
+        return None
+    if cached_fingerprint != fingerprint:
+        return None
+    return objects
+
+
+def write_cache(path, fingerprint, objects):
+    """
+    Stores the {key: object} dictionary `objects`, read from the
+    snapshot files identified by `fingerprint`, in the cache at `path`.
+
+    The cache is written aside and renamed over the old one. Failing to
+    write it is not an error, the next load only misses it.
+    """
+    payload = pickle.dumps(
+        (fingerprint, objects), protocol=pickle.HIGHEST_PROTOCOL
+    )
+    header = _HEADER.pack(MAGIC, VERSION, zlib.crc32(payload), len(payload))
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
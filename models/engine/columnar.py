@@ -0,0 +1,308 @@
+#!/usr/bin/python3
+"""
+Module reading and writing snapshots in a compact binary layout.
+
+The records are stored in blocks of up to BLOCK_SIZE records of the
+same class. Each block holds one column per attribute instead of
+repeating the attribute names in every record, and stores integers,
+floats and datetimes as fixed size binary numbers (datetimes as
+microseconds since the epoch).
+
+Layout of a file:
+>>  MAGIC, then blocks until the end of the file
+Layout of a block:
+>>  class name, row count (I), flags (B), ids (string column),
+>>  column count (H), then for each column:
+>>  name, type (c), has-missing flag (B), [presence bytes], values
+
+Numbers are little-endian, names and strings are prefixed with their
+length. A file can be converted from and to JSON with:
+>>  python3 -m models.engine.columnar to-json hbnb.col hbnb.json
+>>  python3 -m models.engine.columnar from-json hbnb.json hbnb.col
+"""
+import json
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta
+
+MAGIC = b"HBNBCOL1"
+BLOCK_SIZE = 4096
+EPOCH = datetime(1970, 1, 1)
+# block flags: the "id" and "__class__" attributes match the key
+IDS_FROM_KEYS = 1
+CLASS_FROM_KEYS = 2
+
+_MISSING = object()
+_UINT = struct.Struct("<I")
+_USHORT = struct.Struct("<H")
+_NUMBERS = {b"q": "q", b"d": "d", b"t": "q"}
+
+
+def _datetime_micros(value):
+    """
+    Returns the microseconds since the epoch of the ISO datetime string
+    `value`, or None if it does not read back as the same string.
+    """
+    if len(value) not in (19, 26) or value[10] != "T":
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if dt.tzinfo is not None or dt.isoformat() != value:
+        return None
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+
+def _encode_column(values):
+    """
+    Returns the type code that fits every value in `values` and the
+    values encoded for that type.
+    """
+    kinds = {type(value) for value in values}
+    if kinds == {int}:
+        if -(1 << 63) <= min(values) and max(values) < 1 << 63:
+            return b"q", _pack_numbers("q", values)
+    elif kinds == {float}:
+        return b"d", _pack_numbers("d", values)
+    elif kinds == {str}:
+        micros = []
+        for value in values:
+            micro = _datetime_micros(value)
+            if micro is None:
+                return b"s", _pack_strings(values)
+            micros.append(micro)
+        return b"t", _pack_numbers("q", micros)
+    return b"j", _pack_strings([json.dumps(value) for value in values])
+
+
+def _pack_numbers(typecode, values):
+    """Returns `values` as little-endian binary numbers."""
+    numbers = array(typecode, values)
+    if sys.byteorder == "big":
+        numbers.byteswap()
+    return numbers.tobytes()
+
+
+def _pack_strings(values):
+    """Returns the lengths (in characters) and the UTF-8 text of `values`."""
+    text = "".join(values).encode()
+    return (
+        _UINT.pack(len(text))
+        + _pack_numbers("I", [len(value) for value in values])
+        + text
+    )
+
+
+def _pack_name(name):
+    """Returns `name` prefixed with its length."""
+    data = name.encode()
+    return _USHORT.pack(len(data)) + data
+
+
+def _write_block(f, name, keys, records):
+    """Writes the records of class `name` as one block."""
+    ids = [key[len(name) + 1:] for key in keys]
+    flags = 0
+    if all(r.get("id", _MISSING) == i for r, i in zip(records, ids)):
+        flags |= IDS_FROM_KEYS
+    if all(r.get("__class__", _MISSING) == name for r in records):
+        flags |= CLASS_FROM_KEYS
+    attrs = {}
+    for record in records:
+        for attr in record:
+            attrs[attr] = None
+    if flags & IDS_FROM_KEYS:
+        del attrs["id"]
+    if flags & CLASS_FROM_KEYS:
+        del attrs["__class__"]
+
+    parts = [
+        _pack_name(name),
+        _UINT.pack(len(records)),
+        bytes((flags,)),
+        _pack_strings(ids),
+        _USHORT.pack(len(attrs)),
+    ]
+    for attr in attrs:
+        column = [record.get(attr, _MISSING) for record in records]
+        values = [value for value in column if value is not _MISSING]
+        kind, data = _encode_column(values)
+        parts.append(_pack_name(attr) + kind)
+        if len(values) < len(column):
+            parts.append(b"\x01")
+            parts.append(bytes(value is not _MISSING for value in column))
+        else:
+            parts.append(b"\x00")
+        parts.append(data)
+    f.write(b"".join(parts))
+
+
+def write_columnar(f, items, block_size=BLOCK_SIZE):
+    """
+    Writes the (key, record) pairs of `items` to `f` in the columnar
+    layout, one block at a time.
+
+    The records are grouped by class, so at most one block per class is
+    held in memory.
+
+    Args:
+    -   f (file): A file opened in binary mode.
+    -   items (iterable): The (key, record) pairs to write.
+    -   block_size (int, optional): Maximum number of records per block.
+    """
+    f.write(MAGIC)
+    blocks = {}
+    for key, record in items:
+        name = key.split('.')[0]
+        block = blocks.get(name)
+        if block is None:
+            blocks[name] = block = ([], [])
+        block[0].append(key)
+        block[1].append(record)
+        if len(block[0]) >= block_size:
+            _write_block(f, name, *blocks.pop(name))
+    for name, (keys, records) in blocks.items():
+        _write_block(f, name, keys, records)
+
+
+class _Reader:
+    """Reads the fields of a block from a binary file."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def read(self, size):
+        """Reads exactly `size` bytes."""
+        data = self.f.read(size)
+        if len(data) != size:
+            raise ValueError("Truncated columnar file")
+        return data
+
+    def uint(self):
+        """Reads an unsigned int."""
+        return _UINT.unpack(self.read(4))[0]
+
+    def ushort(self):
+        """Reads an unsigned short."""
+        return _USHORT.unpack(self.read(2))[0]
+
+    def name(self):
+        """Reads a name prefixed with its length."""
+        return self.read(self.ushort()).decode()
+
+    def numbers(self, typecode, count):
+        """Reads `count` little-endian numbers of the array `typecode`."""
+        numbers = array(typecode)
+        numbers.frombytes(self.read(numbers.itemsize * count))
+        if sys.byteorder == "big":
+            numbers.byteswap()
+        return numbers
+
+    def strings(self, count):
+        """Reads `count` strings packed by _pack_strings()."""
+        size = self.uint()
+        lengths = self.numbers("I", count)
+        text = self.read(size).decode()
+        values = []
+        start = 0
+        for length in lengths:
+            values.append(text[start:start + length])
+            start += length
+        return values
+
+
+def _read_block(reader, name):
+    """Returns the keys and the records of the block after its name."""
+    count = reader.uint()
+    flags = reader.read(1)[0]
+    ids = reader.strings(count)
+    records = [{} for _ in range(count)]
+    if flags & IDS_FROM_KEYS:
+        for record, id in zip(records, ids):
+            record["id"] = id
+    for _ in range(reader.ushort()):
+        attr = reader.name()
+        kind = reader.read(1)
+        present = None
+        if reader.read(1) != b"\x00":
+            present = reader.read(count)
+        size = count if present is None else sum(present)
+        if kind in _NUMBERS:
+            values = reader.numbers(_NUMBERS[kind], size)
+            if kind == b"t":
+                values = [
+                    (EPOCH + timedelta(microseconds=v)).isoformat()
+                    for v in values
+                ]
+        elif kind == b"s":
+            values = reader.strings(size)
+        elif kind == b"j":
+            values = [json.loads(v) for v in reader.strings(size)]
+        else:
+            raise ValueError(f"Unknown column type {kind!r}")
+        if present is None:
+            for record, value in zip(records, values):
+                record[attr] = value
+        else:
+            rows = (r for r, p in zip(records, present) if p)
+            for record, value in zip(rows, values):
+                record[attr] = value
+    if flags & CLASS_FROM_KEYS:
+        for record in records:
+            record["__class__"] = name
+    return [f"{name}.{id}" for id in ids], records
+
+
+def iter_columnar(f):
+    """
+    Yields the (key, record) pairs stored in `f` in the columnar layout,
+    one block at a time.
+
+    Args:
+    -   f (file): A file opened in binary mode.
+
+    Raises:
+    -   ValueError: If the file is not a valid columnar file.
+    """
+    magic = f.read(len(MAGIC))
+    if not magic:
+        return
+    if magic != MAGIC:
+        raise ValueError("Not a columnar file")
+    reader = _Reader(f)
+    while True:
+        size = f.read(2)
+        if not size:
+            return
+        if len(size) != 2:
+            raise ValueError("Truncated columnar file")
+        name = reader.read(_USHORT.unpack(size)[0]).decode()
+        yield from zip(*_read_block(reader, name))
+
+
+def main(argv=None):
+    """Converts a snapshot between the JSON and the columnar layouts."""
+    from models.engine.snapshot import iter_json, write_json
+
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 3 or args[0] not in ("to-json", "from-json"):
+        print(
+            "Usage: python3 -m models.engine.columnar "
+            "to-json|from-json SOURCE TARGET",
+            file=sys.stderr,
+        )
+        return 2
+    command, source, target = args
+    if command == "to-json":
+        with open(source, 'rb') as src, open(target, 'w') as dst:
+            write_json(dst, iter_columnar(src))
+    else:
+        with open(source) as src, open(target, 'wb') as dst:
+            write_columnar(dst, iter_json(src))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,13 @@
 #!/usr/bin/python3
 """Module handling database storage"""
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import and_, create_engine, func, or_, select
 from sqlalchemy.orm import sessionmaker, scoped_session
 from models.base_model import Base
+from models.engine.file_storage import geo_attrs, text_attrs
+from models.engine.geo import circle_box, nearest
+from models.engine.search import TextIndex, parse_search
+from models.engine.query import SQLQuery
 from models.city import City
 from models.place import Place
 from models.review import Review
@@ -42,15 +46,22 @@ class DBStorage:
     __engine = None
     __session = None
 
-    def __init__(self):
+    def __init__(self, engine=None):
         """
         Initializes the database connection and creates a new session.
 
         Drops all tables if the environment variable `HBNB_ENV` is "test"
         to ensure a clean slate for testing purposes.
+
+        Args:
+            engine (Engine, optional): The engine to use. Defaults to None,
+                in which case it connects to the MySQL server given by the
+                `HBNB_MYSQL_*` environment variables.
         """
-        conn = f'mysql+mysqldb://{USER}:{PWD}@{HOST}/{DB}'
-        self.__engine = create_engine(conn, pool_pre_ping=True)
+        if engine is None:
+            conn = f'mysql+mysqldb://{USER}:{PWD}@{HOST}/{DB}'
+            engine = create_engine(conn, pool_pre_ping=True)
+        self.__engine = engine
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
@@ -70,16 +81,160 @@ class DBStorage:
                   and values are the corresponding model objects.
         """
         _dict = {}
+        if self.__session is None:
+            return _dict
         for clss in classes:
-            if cls is None or cls is classes[clss] or cls is clss:
-                if self.__session is not None:
-                    objs = self.__session.query(classes[clss]).all()
-                _dict = {
-                    f"{obj.__class__.__name__}.{obj.id}": obj for obj in objs
-                }
+            if cls is None or cls is classes[clss] or cls == clss:
+                objs = self.__session.query(classes[clss]).all()
+                _dict.update(
+                    (f"{obj.__class__.__name__}.{obj.id}", obj) for obj in objs
+                )
 
         return _dict
 
+    def get(self, cls, id):
+        """
+        Retrieves one instance of a class by its id, with a primary key
+        lookup (no query if the session already holds it).
+
+        Args:
+            cls (class | str): The model class (or class name).
+            id (str): The id of the instance.
+
+        Returns:
+            object: The instance, or None if there is none.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        if self.__session is None or name not in classes:
+            return None
+        return self.__session.get(classes[name], id)
+
+    def count(self, cls=None):
+        """
+        Counts the instances of a class with a `SELECT COUNT(*)`.
+
+        Args:
+            cls (class | str, optional): The model class (or class name).
+                Defaults to None, in which case it counts the instances
+                of every registered model class.
+
+        Returns:
+            int: The number of instances.
+        """
+        if self.__session is None:
+            return 0
+        if cls is None:
+            return sum(self.count(name) for name in classes)
+        name = cls if isinstance(cls, str) else cls.__name__
+        if name not in classes:
+            return 0
+        query = select(func.count()).select_from(classes[name])
+        return self.__session.scalar(query)
+
+    def query(self, cls):
+        """
+        Builds a query on the instances of a class, run as one SELECT
+        statement (see models.engine.query).
+
+        Args:
+            cls (class | str): The model class (or class name).
+
+        Returns:
+            SQLQuery: The query.
+
+        Raises:
+            KeyError: If the class is not a model class.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        return SQLQuery(self.__session, classes[name])
+
+    def within(self, cls, south, west, north, east):
+        """
+        Retrieves the instances of a class located in a box, with a
+        range query on the (latitude, longitude) index.
+
+        Args:
+            cls (class | str): The model class (or class name).
+            south, west, north, east (float): The bounds of the box, in
+                degrees. A box whose west is greater than its east
+                crosses the antimeridian.
+
+        Returns:
+            list: The instances in the box, empty for the classes that
+                are not located.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        if self.__session is None or name not in geo_attrs:
+            return []
+        latitude, longitude = (
+            getattr(classes[name], attr) for attr in geo_attrs[name]
+        )
+        query = select(classes[name]).where(latitude.between(south, north))
+        if west <= east:
+            query = query.where(longitude.between(west, east))
+        else:
+            query = query.where(or_(longitude >= west, longitude <= east))
+        return list(self.__session.scalars(query).all())
+
+    def nearby(self, cls, latitude, longitude, radius):
+        """
+        Retrieves the instances of a class within a distance of a point,
+        read by within() from the box holding the circle.
+
+        Args:
+            cls (class | str): The model class (or class name).
+            latitude, longitude (float): The point, in degrees.
+            radius (float): The distance, in kilometers.
+
+        Returns:
+            list: The instances, the nearest first.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        return nearest(
+            self.within(name, *circle_box(latitude, longitude, radius)),
+            geo_attrs.get(name, ()),
+            latitude,
+            longitude,
+            radius,
+        )
+
+    def search(self, cls, text, limit=None):
+        """
+        Retrieves the instances of a class whose text matches a search,
+        see models.engine.search.
+
+        The rows holding every word of the search in one of their text
+        columns are selected with LIKE, then indexed to check the words
+        and phrases and to rank them, among themselves.
+
+        Args:
+            cls (class | str): The model class (or class name).
+            text (str): The words and "quoted phrases" to search.
+            limit (int, optional): The maximum number of instances.
+
+        Returns:
+            list: The instances, the best ranked first, empty for the
+                classes without text.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        if self.__session is None or name not in text_attrs:
+            return []
+        words = {word for phrase in parse_search(text) for word in phrase}
+        if not words:
+            return []
+        columns = [getattr(classes[name], a) for a in text_attrs[name]]
+        query = select(classes[name]).where(and_(*(
+            or_(*(column.ilike(f"%{word}%") for column in columns))
+            for word in sorted(words)
+        )))
+        objects = {
+            obj.id: obj for obj in self.__session.scalars(query).all()
+        }
+        index = TextIndex()
+        for id, obj in objects.items():
+            index.add(id, [getattr(obj, a, None) for a in text_attrs[name]])
+        return [objects[id] for id in index.search(text, limit)]
+
     def new(self, obj):
         """
         Adds a new model object to the current session for persistence.
@@ -99,7 +254,8 @@ class DBStorage:
 
     def delete(self, obj=None):
         """
-        Deletes a model object from the database.
+        Deletes a model object from the database and commits the session,
+        as the other engines save on delete.
 
         Args:
             obj (object, optional): The model object to be deleted.
@@ -109,6 +265,7 @@ class DBStorage:
             return
         if self.__session is not None:
             self.__session.delete(obj)
+            self.__session.commit()
 
     def reload(self):
         """
@@ -0,0 +1,414 @@
+#!/usr/bin/python3
+"""
+Module handling a storage kept in dbm key-value files.
+
+Each class is stored in its own dbm file, keyed by "<class name>.<id>"
+with the JSON object dictionaries as values, so the keys of a file are
+the index of its class. Objects are only built when they are accessed
+and a bounded LRU keeps the last ones used, so the memory used does not
+grow with the number of objects stored.
+
+The foreign keys of `foreign_keys` are indexed in a second file per
+class, mapping "<attribute>=<value>" to the JSON list of the ids of the
+objects holding that value.
+
+dbm files cannot be shared by several processes writing to them.
+"""
+import dbm
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from models.engine.file_storage import (
+    classes, foreign_keys, geo_attrs, text_attrs
+)
+from models.engine.geo import circle_box, coordinates, in_box, nearest
+from models.engine.search import TextIndex
+from models.engine.query import Query
+
+# the prefix of the dbm files, e.g. hbnb.dbm.State
+HBNB_DBM_PATH = os.getenv("HBNB_DBM_PATH", "hbnb.dbm")
+# the number of built objects kept in memory
+HBNB_DBM_CACHE_SIZE = int(os.getenv("HBNB_DBM_CACHE_SIZE", 10000))
+
+
+class DBMStorage:
+    """
+    Manage the storage of class instances in dbm files.
+
+    Attributes:
+    -   __path (str): The prefix of the dbm files.
+    -   __cache_size (int): The number of built objects kept in __cache.
+    -   __files (dict): The open dbm file of each class name.
+    -   __indexes (dict): The open foreign key file of each class name.
+    -   __cache (OrderedDict): The objects built last, the least
+            recently used first.
+    -   __pending (dict): The objects added or changed since the last
+            save, None for the deleted ones, by key.
+    -   __lock (RLock): Guards the state above.
+    """
+
+    def __init__(self, path=None, cache_size=None):
+        """
+        Initializes the storage.
+
+        Args:
+        -   path (str, optional): The prefix of the dbm files, defaults
+                to the `HBNB_DBM_PATH` environment variable.
+        -   cache_size (int, optional): The number of built objects kept
+                in memory, defaults to the `HBNB_DBM_CACHE_SIZE`
+                environment variable.
+        """
+        self.__path = path or HBNB_DBM_PATH
+        self.__cache_size = cache_size or HBNB_DBM_CACHE_SIZE
+        self.__files = {}
+        self.__indexes = {}
+        self.__cache = OrderedDict()
+        self.__pending = {}
+        self.__lock = threading.RLock()
+
+    def all(self, cls=None):
+        """
+        Returns a dictionary of the stored instances by key.
+
+        Every object is built, see iter_all() to read them one at a time.
+
+        Args:
+        -   cls (class | str, optional): Only returns the instances of
+                this class (or class name).
+        """
+        return dict(self.iter_all(cls).items())
+
+    def iter_all(self, cls=None):
+        """
+        Returns a read-only mapping of the stored instances by key.
+
+        The mapping lists the keys of the files when it is iterated and
+        builds each object when it is accessed, so iterating it holds
+        one object at a time in memory besides the LRU.
+
+        Args:
+        -   cls (class | str, optional): Only returns the instances of
+                this class (or class name).
+        """
+        if cls is None:
+            names = list(classes)
+        else:
+            names = [cls if isinstance(cls, str) else cls.__name__]
+        return _Objects(
+            lambda: (key for name in names for key in self.__keys(name)),
+            lambda key: (
+                self.__get(key) if key.split('.')[0] in names else None
+            ),
+        )
+
+    def get(self, cls, id):
+        """
+        Returns the instance of `cls` (a class or class name) with the
+        given id, or None if there is none.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        return self.__get(f"{name}.{id}")
+
+    def count(self, cls=None):
+        """
+        Returns the number of instances of `cls` (a class or class
+        name), or of every class if `cls` is None, from the number of
+        keys of the files.
+        """
+        if cls is None:
+            return sum(self.count(name) for name in classes)
+        name = cls if isinstance(cls, str) else cls.__name__
+        if name not in classes:
+            return 0
+        with self.__lock:
+            db = self.__file(name)
+            count = len(db)
+            for key, obj in self.__pending.items():
+                if key.split('.')[0] != name:
+                    continue
+                stored = key in db
+                if obj is None and stored:
+                    count -= 1
+                elif obj is not None and not stored:
+                    count += 1
+            return count
+
+    def query(self, cls):
+        """
+        Returns a query on the instances of `cls` (a class or class
+        name), see models.engine.query.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        return Query(self, name, foreign_keys.get(name, ()))
+
+    def related(self, cls, attr, value):
+        """
+        Returns the list of `cls` instances whose foreign key `attr`
+        equals `value`, e.g. related(City, "state_id", state.id).
+
+        Only the attributes listed in `foreign_keys` are indexed.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        if attr not in foreign_keys.get(name, ()):
+            return []
+        with self.__lock:
+            keys = {
+                f"{name}.{id}"
+                for id in self.__read_index(name, attr, value)
+            }
+            for key, obj in self.__pending.items():
+                if key.split('.')[0] != name:
+                    continue
+                if obj is not None and getattr(obj, attr, None) == value:
+                    keys.add(key)
+                else:
+                    keys.discard(key)
+            objects = (self.__get(key) for key in sorted(keys))
+            return [obj for obj in objects if obj is not None]
+
+    def within(self, cls, south, west, north, east):
+        """
+        Returns the list of `cls` instances located in the box bounded
+        by the given latitudes and longitudes (in degrees). A box whose
+        west is greater than its east crosses the antimeridian.
+
+        The coordinates are not indexed, so every instance of the class
+        is read, one at a time.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        attrs = geo_attrs.get(name)
+        if attrs is None:
+            return []
+        box = (south, west, north, east)
+        located = []
+        for obj in self.iter_all(name).values():
+            point = coordinates([getattr(obj, attr, None) for attr in attrs])
+            if point is not None and in_box(*point, box):
+                located.append(obj)
+        return located
+
+    def nearby(self, cls, latitude, longitude, radius):
+        """
+        Returns the list of `cls` instances within `radius` km of the
+        point (`latitude`, `longitude`), the nearest first.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        return nearest(
+            self.within(name, *circle_box(latitude, longitude, radius)),
+            geo_attrs.get(name, ()),
+            latitude,
+            longitude,
+            radius,
+        )
+
+    def search(self, cls, text, limit=None):
+        """
+        Returns the list of `cls` instances whose text matches `text`,
+        the best ranked first, at most `limit` of them (see
+        models.engine.search).
+
+        The text is not indexed in the files, so every instance of the
+        class is read to index it for the search.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        attrs = text_attrs.get(name)
+        if attrs is None:
+            return []
+        index = TextIndex()
+        for key, obj in self.iter_all(name).items():
+            index.add(key, [getattr(obj, attr, None) for attr in attrs])
+        objects = (self.__get(key) for key in index.search(text, limit))
+        return [obj for obj in objects if obj is not None]
+
+    def new(self, obj):
+        """
+        Adds obj to the storage, under the key <obj class name>.id. It
+        is written on the next save().
+
+        Args:
+        -   obj (BaseModel): The object to be added.
+        """
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        with self.__lock:
+            self.__pending[key] = obj
+            self.__cache_put(key, obj)
+
+    def save(self):
+        """
+        Writes the objects added, changed or deleted since the last save
+        to the dbm files.
+        """
+        with self.__lock:
+            for key, obj in self.__pending.items():
+                name = key.split('.')[0]
+                db = self.__file(name)
+                old = db.get(key)
+                if obj is None:
+                    if old is not None:
+                        del db[key]
+                    record = None
+                else:
+                    record = obj.to_dict()
+                    db[key] = json.dumps(record)
+                if name in foreign_keys:
+                    self.__update_index(
+                        name, key, old and json.loads(old), record
+                    )
+            self.__pending = {}
+            for db in (*self.__files.values(), *self.__indexes.values()):
+                if hasattr(db, "sync"):
+                    db.sync()
+
+    def delete(self, obj=None):
+        """Deletes an object."""
+        if obj is None:
+            return
+
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        with self.__lock:
+            self.__cache.pop(key, None)
+            self.__pending[key] = None
+        self.save()
+
+    def reload(self):
+        """
+        Forgets the objects built so far, so that they are read again
+        from the dbm files. The objects not saved yet are kept.
+        """
+        with self.__lock:
+            self.__cache.clear()
+
+    def close(self):
+        """Closes the dbm files and forgets the objects built so far."""
+        with self.__lock:
+            for db in (*self.__files.values(), *self.__indexes.values()):
+                db.close()
+            self.__files = {}
+            self.__indexes = {}
+            self.__cache.clear()
+
+    def __file(self, name):
+        """Returns the dbm file of the class `name`, opened if needed."""
+        db = self.__files.get(name)
+        if db is None:
+            db = dbm.open(f"{self.__path}.{name}", 'c')
+            self.__files[name] = db
+        return db
+
+    def __index_file(self, name):
+        """Returns the foreign key file of the class `name`."""
+        db = self.__indexes.get(name)
+        if db is None:
+            db = dbm.open(f"{self.__path}.{name}.fk", 'c')
+            self.__indexes[name] = db
+        return db
+
+    def __keys(self, name):
+        """Yields the keys of the instances of the class `name`."""
+        with self.__lock:
+            pending = {
+                key: obj
+                for key, obj in self.__pending.items()
+                if key.split('.')[0] == name
+            }
+            # a list of the keys, the objects are built as they are used
+            stored = self.__file(name).keys()
+        for key in stored:
+            key = key.decode()
+            if key not in pending:
+                yield key
+        for key, obj in pending.items():
+            if obj is not None:
+                yield key
+
+    def __get(self, key):
+        """Returns the object stored under `key`, or None."""
+        with self.__lock:
+            if key in self.__pending:
+                return self.__pending[key]
+            obj = self.__cache.get(key)
+            if obj is not None:
+                self.__cache.move_to_end(key)
+                return obj
+            name = key.split('.')[0]
+            if name not in classes:
+                return None
+            data = self.__file(name).get(key)
+            if data is None:
+                return None
+            obj = classes[name](**json.loads(data))
+            self.__cache_put(key, obj)
+            return obj
+
+    def __cache_put(self, key, obj):
+        """Keeps `obj` in the LRU, dropping the least recently used."""
+        self.__cache[key] = obj
+        self.__cache.move_to_end(key)
+        while len(self.__cache) > self.__cache_size:
+            self.__cache.popitem(last=False)
+
+    def __read_index(self, name, attr, value):
+        """Returns the ids of the class `name` whose `attr` is `value`."""
+        data = self.__index_file(name).get(f"{attr}={value}")
+        return json.loads(data) if data is not None else []
+
+    def __update_index(self, name, key, old, new):
+        """
+        Moves the id of `key` between the foreign key entries, from the
+        values of the `old` record to the values of the `new` one (None
+        for a deleted or new object).
+        """
+        id = key[len(name) + 1:]
+        db = self.__index_file(name)
+        for attr in foreign_keys[name]:
+            before = old and old.get(attr)
+            after = new and new.get(attr)
+            if before == after:
+                continue
+            if before is not None:
+                ids = self.__read_index(name, attr, before)
+                if id in ids:
+                    ids.remove(id)
+                if ids:
+                    db[f"{attr}={before}"] = json.dumps(ids)
+                else:
+                    del db[f"{attr}={before}"]
+            if after is not None:
+                ids = self.__read_index(name, attr, after)
+                ids.append(id)
+                db[f"{attr}={after}"] = json.dumps(ids)
+
+
+class _Objects(Mapping):
+    """
+    A read-only view of stored objects by key, whose objects are only
+    built when they are accessed.
+    """
+
+    __slots__ = ("keys_of", "get_object")
+
+    def __init__(self, keys_of, get_object):
+        """
+        Args:
+        -   keys_of (function): Returns an iterator on the keys.
+        -   get_object (function): Returns the object of a key, or None.
+        """
+        self.keys_of = keys_of
+        self.get_object = get_object
+
+    def __getitem__(self, key):
+        obj = self.get_object(key)
+        if obj is None:
+            raise KeyError(key)
+        return obj
+
+    def __contains__(self, key):
+        return self.get_object(key) is not None
+
+    def __iter__(self):
+        return self.keys_of()
+
+    def __len__(self):
+        return sum(1 for _ in self.keys_of())
@@ -1,6 +1,20 @@
 #!/usr/bin/python3
 """Define the FileStorage class module"""
+import atexit
+import bisect
+import bz2
+import gzip
+import itertools
 import json
+import logging
+import lzma
+import os
+import threading
+import time
+import weakref
+from collections import namedtuple
+from contextlib import ExitStack, contextmanager
+from functools import partial
 from models.base_model import BaseModel
 from models.amenity import Amenity
 from models.user import User
@@ -8,6 +22,14 @@ from models.city import City
 from models.state import State
 from models.place import Place
 from models.review import Review
+from models.engine.locks import FileLock, RWLock
+from models.engine.mapped import MappedSnapshot, iter_mapped, write_mapped
+from models.engine.query import Query
+from models.engine.geo import Grid, circle_box, coordinates, nearest
+from models.engine.search import TextIndex
+from models.engine.cache import read_cache, write_cache
+from models.engine.columnar import iter_columnar, write_columnar
+from models.engine.snapshot import iter_json, write_json
 
 
 classes = {
@@ -20,6 +42,92 @@ classes = {
     'Review': Review,
 }
 
+# numeric attributes kept in sorted indexes by FileStorage, for range
+# queries such as between(Place, "price_by_night", high=100)
+sorted_attrs = {
+    'Place': (
+        'price_by_night', 'max_guest', 'number_rooms', 'number_bathrooms'
+    ),
+}
+
+# latitude and longitude attributes kept in grid indexes by FileStorage,
+# for nearby() and within() searches
+geo_attrs = {
+    'Place': ('latitude', 'longitude'),
+}
+
+# text attributes kept in full-text indexes by FileStorage, for search()
+text_attrs = {
+    'Place': ('name', 'description'),
+    'Review': ('text',),
+}
+
+# attributes holding the id of another object, indexed by FileStorage
+foreign_keys = {
+    'City': ('state_id',),
+    'Place': ('city_id', 'user_id'),
+    'Review': ('place_id', 'user_id'),
+}
+
+# a snapshot codec: its streaming reader and writer, the suffix of the
+# file modes ('b' for binary files), the default file path, and a class
+# giving access to single records of a file, if the codec has one
+Format = namedtuple("Format", "read write binary path mapper")
+formats = {
+    'json': Format(iter_json, write_json, '', "hbnb.json", None),
+    'columnar': Format(
+        iter_columnar, write_columnar, 'b', "hbnb.col", None
+    ),
+    'mapped': Format(
+        iter_mapped, write_mapped, 'b', "hbnb.map", MappedSnapshot
+    ),
+}
+
+# the stdlib codecs the snapshot files are streamed through, chosen by
+# the extension of their path, e.g. hbnb.json.gz (the journals are not
+# compressed)
+compressions = {
+    # level 6 (zlib's default) writes twice as fast as gzip's default 9
+    # for a few percent more bytes
+    '.gz': partial(gzip.open, compresslevel=6),
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+# the path to the snapshot file, defaults to the path of the format
+HBNB_FILE_PATH = os.getenv("HBNB_FILE_PATH")
+# the format of the snapshot files, a key of `formats`
+HBNB_FILE_FORMAT = os.getenv("HBNB_FILE_FORMAT", "json")
+# "snapshot" rewrites the whole file on every save,
+# "journal" appends only the changed records to <file>.journal
+HBNB_FILE_MODE = os.getenv("HBNB_FILE_MODE", "snapshot")
+# the journal is folded into the JSON file once it grows past this size
+# or once replaying it costs more than loading the JSON file
+HBNB_JOURNAL_MAX_BYTES = int(os.getenv("HBNB_JOURNAL_MAX_BYTES", 4 << 20))
+JOURNAL_MIN_ENTRIES = 1000
+# keep the records read from the files and only build the objects
+# the first time they are accessed
+HBNB_FILE_LAZY = os.getenv("HBNB_FILE_LAZY", "0") == "1"
+# store each class in its own file, e.g. hbnb.State.json
+HBNB_FILE_SHARDED = os.getenv("HBNB_FILE_SHARDED", "0") == "1"
+# when set, save() only marks the objects dirty and a background thread
+# writes them every HBNB_WRITE_BEHIND seconds, or as soon as
+# HBNB_WRITE_BEHIND_MAX_DIRTY objects are waiting
+HBNB_WRITE_BEHIND = float(os.getenv("HBNB_WRITE_BEHIND", 0))
+HBNB_WRITE_BEHIND_MAX_DIRTY = int(
+    os.getenv("HBNB_WRITE_BEHIND_MAX_DIRTY", 1000)
+)
+# "none" leaves the writes to the OS, "fsync" flushes every save to disk,
+# "group" does the same but the saves made meanwhile by other threads
+# share the next write and fsync
+HBNB_FILE_SYNC = os.getenv("HBNB_FILE_SYNC", "none")
+# set to "1" when several processes share the files: writes and reloads
+# take <file>.lock and each commit bumps the counter in <file>.gen
+HBNB_FILE_LOCKING = os.getenv("HBNB_FILE_LOCKING", "0") == "1"
+# set to "1" to keep the built objects in <file>.cache, so that the next
+# process starts from it rather than from the snapshot files
+HBNB_FILE_CACHE = os.getenv("HBNB_FILE_CACHE", "0") == "1"
+
 
 class FileStorage:
     """
@@ -27,20 +135,354 @@ class FileStorage:
 
     Attributes:
     -   __file_path (str): The path to the Json file.
+    -   __format (Format): The `formats` entry of the snapshot files.
+    -   __compression (function): The `compressions` entry of the
+            snapshot files, None if they are not compressed.
+    -   __snapshots (dict): The path of each Json file, mapped to the
+            names of the classes it holds (None for every class).
     -   __objects (dict): A dictionary containing every class instance.
+    -   __records (dict): In lazy mode, the records read from the files
+            whose instance was not built yet. With a format that has a
+            mapper, the mapper of the file holding the record is stored
+            instead, and the record is only decoded when needed.
+    -   __by_class (dict): The keys of the instances grouped by class
+            name.
+    -   __by_fk (dict): Maps (class name, foreign key, id) to the keys
+            of the instances whose foreign key holds that id. It is only
+            built the first time it is needed.
+    -   __fk_values (dict): The __by_fk entries each instance is in.
+    -   __by_value (dict): Maps (class name, attribute) of
+            `sorted_attrs` to the list of the (value, key) pairs of the
+            instances, sorted. Only numbers are indexed. It is only built
+            the first time it is needed.
+    -   __sorted_values (dict): The __by_value pairs each instance is in.
+    -   __grids (dict): Maps the class names of `geo_attrs` to the Grid
+            of the coordinates of their instances. It is only built the
+            first time it is needed.
+    -   __texts (dict): Maps the class names of `text_attrs` to the
+            TextIndex of the text of their instances. It is only built
+            the first time it is needed.
+    -   __mode (str): Either "snapshot" or "journal".
+    -   __dirty (dict): Keys changed since the last save, mapped to
+            the object to write or None if the object was deleted.
+    -   __journal_entries (int): Number of entries in the journal files.
+    -   __loaded (tuple): Identity of the files as of the last reload
+            or save, used to skip reloads when nothing changed.
+    -   __journal_offset (int): How far the journal has been replayed.
+    -   __compactor (Thread): The running background compaction, if any.
+    -   __batch (tuple): While a batch() block runs, the state to roll
+            back to.
+    -   __batch_owner (int): The id of the thread running the block.
+    -   __batch_saved (bool): Whether save() was called in the block.
+    -   __write_behind (float): Seconds between two background flushes,
+            0 if save() writes right away.
+    -   __flush_at (float): When the saves left to the flusher thread
+            are due, on the time.monotonic() clock, None if there are none.
+    -   __lock (RWLock): Held for reading while the objects are read,
+            and for writing while they are changed or written.
+    -   __mutex (Lock): Lets readers build objects from their records
+            and build the foreign key index one at a time.
+    -   __sync (str): Either "none", "fsync" or "group".
+    -   __commit (Condition): Lets the threads saving at the same time
+            wait for a shared write in "group" sync mode.
+    -   __requested (int): Number of saves requested in "group" mode.
+    -   __committed (int): Number of those saves written so far.
+    -   __committing (bool): Whether a thread is writing for the others.
+    -   __locking (bool): Whether other processes share the files.
+    -   __file_lock (FileLock): Taken for reading around reloads and for
+            writing around the writes, when __locking is set.
+    -   __generation (int): The commit counter of the files as of the
+            last reload or save, 0 if unknown.
+    -   __cache_path (str): The path to the cache of built objects, None
+            if it is not used.
     """
 
-    __file_path = "hbnb.json"
-    __objects = {}
+    # the write-behind storages of the process share one flusher thread,
+    # which stops once they are all gone, and one exit hook
+    __flushed = weakref.WeakSet()
+    __flusher = None
+    __flusher_lock = threading.Lock()
+    __wake = threading.Event()
+    __exit_hooked = False
+
+    def __init__(self, file_path=None, mode=None, lazy=None, sharded=None,
+                 write_behind=None, sync=None, locking=None,
+                 file_format=None, cache=None):
+        """
+        Initializes the storage.
+
+        Args:
+        -   file_path (str, optional): The path to the Json file,
+                defaults to the `HBNB_FILE_PATH` environment variable.
+                Its extension tells whether the file is compressed.
+        -   mode (str, optional): The write mode, defaults to the
+                `HBNB_FILE_MODE` environment variable.
+        -   lazy (bool, optional): Whether objects are built on first
+                access, defaults to the `HBNB_FILE_LAZY` environment
+                variable.
+        -   sharded (bool, optional): Whether each class is stored in its
+                own file, defaults to the `HBNB_FILE_SHARDED` environment
+                variable.
+        -   write_behind (float, optional): Seconds between two
+                background flushes (0 to write on every save), defaults
+                to the `HBNB_WRITE_BEHIND` environment variable.
+        -   sync (str, optional): How saves are flushed to disk,
+                defaults to the `HBNB_FILE_SYNC` environment variable.
+        -   locking (bool, optional): Whether other processes share the
+                files, defaults to the `HBNB_FILE_LOCKING` environment
+                variable.
+        -   file_format (str, optional): The format of the snapshot
+                files, defaults to the `HBNB_FILE_FORMAT` environment
+                variable.
+        -   cache (bool, optional): Whether the built objects are cached
+                next to the files, defaults to the `HBNB_FILE_CACHE`
+                environment variable. The cache is not used in lazy mode.
+
+        Raises:
+        -   ValueError: If the files of a format with a mapper are
+                compressed.
+        """
+        self.__format = formats[file_format or HBNB_FILE_FORMAT]
+        self.__file_path = file_path or HBNB_FILE_PATH or self.__format.path
+        root, ext = os.path.splitext(self.__file_path)
+        self.__compression = compressions.get(ext)
+        if self.__compression is not None:
+            if self.__format.mapper is not None:
+                raise ValueError("Mapped snapshots cannot be compressed")
+            # hbnb.json.gz is sharded as hbnb.State.json.gz
+            root, inner = os.path.splitext(root)
+            ext = inner + ext
+        if HBNB_FILE_SHARDED if sharded is None else sharded:
+            self.__snapshots = {
+                f"{root}.{name}{ext}": (name,) for name in classes
+            }
+        else:
+            self.__snapshots = {self.__file_path: None}
+        self.__journal_path = f"{self.__file_path}.journal"
+        self.__sealed_path = f"{self.__journal_path}.compacting"
+        self.__mode = mode or HBNB_FILE_MODE
+        self.__lazy = HBNB_FILE_LAZY if lazy is None else lazy
+        self.__objects = {}
+        self.__records = {}
+        self.__by_class = {}
+        self.__by_fk = None
+        self.__fk_values = {}
+        self.__by_value = None
+        self.__sorted_values = {}
+        self.__grids = None
+        self.__texts = None
+        self.__dirty = {}
+        self.__journal_entries = 0
+        self.__loaded = None
+        self.__journal_offset = 0
+        self.__journal_lock = threading.Lock()
+        self.__compactor = None
+        self.__batch = None
+        self.__batch_owner = None
+        self.__batch_saved = False
+        self.__write_behind = (
+            HBNB_WRITE_BEHIND if write_behind is None else write_behind
+        )
+        self.__flush_at = None
+        self.__lock = RWLock()
+        self.__mutex = threading.Lock()
+        self.__sync = sync or HBNB_FILE_SYNC
+        self.__commit = threading.Condition()
+        self.__requested = 0
+        self.__committed = 0
+        self.__committing = False
+        self.__locking = HBNB_FILE_LOCKING if locking is None else locking
+        self.__file_lock = FileLock(
+            f"{self.__file_path}.lock" if self.__locking else None
+        )
+        self.__generation_path = f"{self.__file_path}.gen"
+        self.__generation = 0
+        self.__cache_path = None
+        if (HBNB_FILE_CACHE if cache is None else cache) and not self.__lazy:
+            self.__cache_path = f"{self.__file_path}.cache"
+        if self.__write_behind:
+            self.__start_flusher()
 
     def all(self, cls=None):
         """
         Returns A dictionary containing all instances stored in __objects.
+
+        The returned dictionary is a copy, so it can be iterated while
+        other threads add and remove objects with new() and delete().
+
+        Args:
+        -   cls (class | str, optional): Only returns the instances of
+                this class (or class name).
+        """
+        with self.__lock.read():
+            if cls is None:
+                with self.__mutex:
+                    for key in list(self.__records):
+                        self.__hydrate(key)
+                    return dict(self.__objects)
+
+            name = cls if isinstance(cls, str) else cls.__name__
+            return {
+                key: self.__get(key) for key in self.__by_class.get(name, ())
+            }
+
+    def iter_all(self, cls=None):
+        """
+        Returns the instances to iterate by key, the same as all(): they
+        are all in memory already.
+        """
+        return self.all(cls)
+
+    def get(self, cls, id):
+        """
+        Returns the instance of `cls` (a class or class name) with the
+        given id, or None if there is none.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        # a single lookup needs no lock, building the object takes one
+        return self.__get(f"{name}.{id}")
+
+    def count(self, cls=None):
+        """
+        Returns the number of instances of `cls` (a class or class
+        name), or of every class if `cls` is None, without building
+        any object.
+        """
+        with self.__lock.read():
+            if cls is None:
+                return len(self.__objects) + len(self.__records)
+            name = cls if isinstance(cls, str) else cls.__name__
+            return len(self.__by_class.get(name, ()))
+
+    def query(self, cls):
+        """
+        Returns a query on the instances of `cls` (a class or class
+        name), see models.engine.query.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        return Query(
+            self,
+            name,
+            foreign_keys.get(name, ()),
+            sorted_attrs.get(name, ()),
+        )
+
+    def between(self, cls, attr, low=None, high=None, open_low=False,
+                open_high=False, reverse=False):
+        """
+        Yields the `cls` instances whose attribute `attr` is between `low`
+        and `high` (None for no bound), sorted by `attr`, e.g.
+        between(Place, "price_by_night", high=100). The instances are
+        found in O(log n) and only built as they are yielded.
+
+        Only the numbers of the attributes listed in `sorted_attrs` are
+        indexed.
+
+        Args:
+        -   open_low, open_high (bool, optional): Whether the instances
+                equal to `low`, `high` are left out.
+        -   reverse (bool, optional): Whether the highest values come
+                first.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        with self.__lock.read():
+            entries = self.__sorted_entries(name, attr)
+            start, stop = _bounds(entries, low, high, open_low, open_high)
+            keys = [key for _, key in entries[start:stop]]
+        if reverse:
+            keys.reverse()
+        for key in keys:
+            obj = self.__get(key)
+            if obj is not None:
+                yield obj
+
+    def count_between(self, cls, attr, low=None, high=None, open_low=False,
+                      open_high=False):
+        """
+        Returns the number of instances between() yields, in O(log n)
+        and without building any object.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        with self.__lock.read():
+            entries = self.__sorted_entries(name, attr)
+            start, stop = _bounds(entries, low, high, open_low, open_high)
+            return stop - start
+
+    def within(self, cls, south, west, north, east):
+        """
+        Returns the list of `cls` instances located in the box bounded
+        by the given latitudes and longitudes (in degrees), e.g.
+        within(Place, 37.7, -122.5, 37.8, -122.4). A box whose west is
+        greater than its east crosses the antimeridian.
+
+        Only the cells of the grid index overlapping the box are read,
+        and only the instances returned are built. The classes of
+        `geo_attrs` are indexed, the others have no instances located.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        box = (south, west, north, east)
+        with self.__lock.read():
+            grid = self.__grid(name)
+            keys = grid.within(box) if grid is not None else []
+            objects = (self.__get(key) for key in keys)
+            return [obj for obj in objects if obj is not None]
+
+    def nearby(self, cls, latitude, longitude, radius):
+        """
+        Returns the list of `cls` instances within `radius` km of the
+        point (`latitude`, `longitude`), the nearest first, e.g.
+        nearby(Place, 37.77, -122.41, 5). The instances are read by
+        within() from the box holding the circle.
         """
-        if cls is None:
-            return self.__objects
+        name = cls if isinstance(cls, str) else cls.__name__
+        return nearest(
+            self.within(name, *circle_box(latitude, longitude, radius)),
+            geo_attrs.get(name, ()),
+            latitude,
+            longitude,
+            radius,
+        )
 
-        return {k: v for k, v in self.__objects.items() if v.__class__ == cls}
+    def search(self, cls, text, limit=None):
+        """
+        Returns the list of `cls` instances whose text matches `text`,
+        the best ranked first, at most `limit` of them, e.g.
+        search(Place, 'quiet "ocean view"'), see models.engine.search.
+
+        Only the postings of the words searched are read, and only the
+        instances returned are built. The attributes of `text_attrs` are
+        indexed, the instances of the other classes never match.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        with self.__lock.read():
+            index = self.__text_index(name)
+            keys = index.search(text, limit) if index is not None else []
+            objects = (self.__get(key) for key in keys)
+            return [obj for obj in objects if obj is not None]
+
+    def related(self, cls, attr, value):
+        """
+        Returns the list of `cls` instances whose foreign key `attr`
+        equals `value`, e.g. related(City, "state_id", state.id).
+
+        Only the attributes listed in `foreign_keys` are indexed.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        with self.__lock.read():
+            if self.__by_fk is None:
+                with self.__mutex:
+                    if self.__by_fk is None:
+                        by_fk = {}
+                        for fk_name in foreign_keys:
+                            for key in self.__by_class.get(fk_name, ()):
+                                item = (
+                                    self.__objects.get(key)
+                                    or self.__records[key]
+                                )
+                                self.__index_fk(by_fk, fk_name, key, item)
+                        self.__by_fk = by_fk
+            keys = self.__by_fk.get((name, attr, value), ())
+            return [self.__get(key) for key in keys]
 
     def new(self, obj):
         """
@@ -50,15 +492,59 @@ class FileStorage:
         -   obj (BaseModel): The object to be added.
         """
         key = f"{obj.__class__.__name__}.{obj.id}"
-        self.__objects[key] = obj
+        with self.__lock.write():
+            self.__put(key, obj)
+            self.__dirty[key] = obj
 
     def save(self):
         """
         Serializes __objects to the JSON file (path: __file_path)
+
+        In journal mode only the objects changed since the last save
+        are appended to the journal file.
+
+        Inside a batch() block, the save happens when the block exits.
+        The saves of the other threads wait for the end of the block.
+
+        In write-behind mode, the save is left to the flusher thread and
+        the saves made meanwhile are written as one, see flush().
+
+        In "group" sync mode, a save requested while another thread is
+        writing waits for the next write, shared by all the saves
+        requested meanwhile.
+        """
+        if self.__batch_owner == threading.get_ident():
+            self.__batch_saved = True
+        elif self.__write_behind:
+            if len(self.__dirty) >= HBNB_WRITE_BEHIND_MAX_DIRTY:
+                self.__flush_at = time.monotonic()
+            elif self.__flush_at is None:
+                self.__flush_at = time.monotonic() + self.__write_behind
+            else:
+                return
+            self.__wake.set()
+        elif self.__sync == "group":
+            self.__group_commit()
+        else:
+            self.__write()
+
+    def flush(self):
+        """
+        Writes the saves left to the flusher thread, if any.
+
+        It is called by the flusher thread and when the interpreter
+        exits, and does nothing inside a batch() block.
         """
-        with open(self.__file_path, 'w') as f:
-            _dict = {k: v.to_dict() for k, v in self.__objects.items()}
-            json.dump(_dict, f)
+        with self.__lock.write():
+            flush_at = self.__flush_at
+            if flush_at is None or self.__batch is not None:
+                return
+            self.__flush_at = None
+        try:
+            self.__write()
+        except BaseException:
+            self.__flush_at = flush_at
+            raise
 
     def delete(self, obj=None):
         """Deletes an object."""
@@ -66,8 +552,50 @@ class FileStorage:
             return
 
         key = f"{obj.__class__.__name__}.{obj.id}"
-        if key in self.__objects:
-            del self.__objects[key]
+        # held until the delete is written, so no reload sees the object
+        # gone from memory but still in the files
+        with self.__lock.write():
+            if key not in self.__objects and key not in self.__records:
+                return
+            self.__remove(key)
+            self.__dirty[key] = None
+            self.save()
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups the saves made in a `with storage.batch():` block into one,
+        made when the block exits.
+
+        If an exception escapes the block, the objects are rolled back to
+        their state when the block was entered and nothing is saved.
+        Nested blocks are part of the outermost one.
+
+        The block holds the lock for writing, so the other threads wait
+        for its end to read or change the objects: a rollback can only
+        undo the changes made in the block.
+        """
+        if self.__batch_owner == threading.get_ident():
+            yield self
+            return
+        with self.__lock.write():
+            self.__batch = (
+                {key: (obj, obj.__dict__.copy())
+                 for key, obj in self.__objects.items()},
+                self.__records.copy(),
+                self.__dirty.copy(),
+            )
+            self.__batch_owner = threading.get_ident()
+            self.__batch_saved = False
+            try:
+                yield self
+            except BaseException:
+                self.__rollback()
+                raise
+            finally:
+                self.__batch = None
+                self.__batch_owner = None
+        if self.__batch_saved:
             self.save()
 
     def reload(self):
@@ -75,22 +603,949 @@ class FileStorage:
         Deserializes the JSON file to objects
         (only if the JSON file (__file_path) exists; otherwise, do nothing)
         (If the file doesn't exist, no exception should be raised)
+
+        Records found in the journal files are replayed on top of the
+        JSON file, in the order they were written.
+
+        Nothing is done if the files did not change since the last reload
+        or save. If only the journal grew, only its new entries are read,
+        and objects whose record did not change are kept as they are.
+        Objects changed since the last save are kept as they are too, to
+        be written with the next save.
+
+        Saves left to the flusher thread are written first.
+
+        When other processes share the files, nothing is read unless one
+        of them committed since, and the files are locked meanwhile.
         """
-        try:
-            with open(self.__file_path) as f:
-                result = f.read()
-                if not result:
-                    return
-                _dict = json.loads(result)
-                self.__objects = {
-                    key: classes[key.split('.')[0]](**obj)
-                    for key, obj in _dict.items()
-                }
-        except IOError:
-            pass
+        with self.__lock.write():
+            if (
+                self.__generation
+                and self.__generation == self.__read_generation()
+            ):
+                return
+            if self.__identity() == self.__loaded:
+                return
+            self.flush()
+            with self.__file_lock.shared():
+                generation = self.__read_generation()
+                self.__reload()
+                self.__generation = generation
+
+    def __reload(self):
+        """
+        Does the work of reload().
+
+        The journal lock is held so that a compaction does not swap the
+        files or change __loaded meanwhile.
+        """
+        with self.__journal_lock:
+            self.__reload_files()
+
+    def __reload_files(self):
+        """Does the work of __reload(), with the journal lock held."""
+        identity = self.__identity()
+        loaded = self.__loaded
+        if identity == loaded:
+            return
+        if (
+            loaded is not None
+            and identity[:2] == loaded[:2]
+            and identity[2] is not None
+            and (loaded[2] is None or identity[2][0] == loaded[2][0])
+        ):
+            changes = {}
+            count, self.__journal_offset = self.__replay_journal(
+                self.__journal_path, changes, self.__journal_offset
+            )
+            for key, record in changes.items():
+                self.__apply(key, record)
+            self.__journal_entries += count
+        else:
+            self.__load(loaded)
+        self.__loaded = identity
 
     def close(self):
         """
         Calls reload() method for deserializing the JSON file to objects
         """
         self.reload()
+
+    def compact(self, wait=False):
+        """
+        Folds the journal into the JSON file in a background thread.
+
+        The current journal is sealed (renamed) so that writers can keep
+        appending to a new one while the thread rewrites the JSON file
+        from the files on disk.
+
+        Args:
+        -   wait (bool): If True, returns only once the compaction is done.
+        """
+        with self.__file_lock.exclusive(), self.__journal_lock:
+            if self.__compactor is None or not self.__compactor.is_alive():
+                # a sealed journal left by a crash is folded first
+                if not os.path.exists(self.__sealed_path):
+                    if not os.path.exists(self.__journal_path):
+                        return
+                    in_sync = self.__identity() == self.__loaded
+                    os.replace(self.__journal_path, self.__sealed_path)
+                    self.__sync_dir()
+                    self.__journal_entries = 0
+                    if in_sync:
+                        self.__loaded = self.__identity()
+                        self.__journal_offset = 0
+                self.__compactor = threading.Thread(
+                    target=self.__fold_journal, daemon=True
+                )
+                self.__compactor.start()
+            compactor = self.__compactor
+        if wait:
+            compactor.join()
+
+    def __write(self):
+        """
+        Writes the changes the way __mode says, taking the locks it
+        needs.
+        """
+        if self.__mode == "journal":
+            self.__append_journal()
+        else:
+            self.__write_snapshot()
+
+    def __group_commit(self):
+        """
+        Writes the changes made so far, along with those of the threads
+        saving at the same time.
+
+        The first thread to come writes for every save requested before
+        it starts, the ones coming meanwhile wait and the next of them
+        writes for all of them. A thread holding the lock of the objects
+        writes alone, since the writing thread would wait for it.
+        """
+        if self.__lock.writing():
+            self.__write()
+            return
+        with self.__commit:
+            self.__requested += 1
+            ticket = self.__requested
+            while self.__committed < ticket:
+                if self.__committing:
+                    self.__commit.wait()
+                    continue
+                self.__committing = True
+                served = self.__requested
+                self.__commit.release()
+                try:
+                    self.__write()
+                finally:
+                    self.__commit.acquire()
+                    self.__committing = False
+                    self.__commit.notify_all()
+                self.__committed = served
+
+    def __start_flusher(self):
+        """
+        Adds the storage to those of the flusher thread, and starts the
+        thread if it is not running.
+        """
+        cls = FileStorage
+        with cls.__flusher_lock:
+            cls.__flushed.add(self)
+            # wakes the thread up to stop once the storage is gone
+            weakref.finalize(self, cls.__wake.set)
+            if cls.__flusher is None:
+                cls.__flusher = threading.Thread(
+                    target=cls.__flush_loop,
+                    name="FileStorage flusher",
+                    daemon=True,
+                )
+                cls.__flusher.start()
+            if not cls.__exit_hooked:
+                atexit.register(cls.__flush_all)
+                cls.__exit_hooked = True
+
+    @classmethod
+    def __flush_loop(cls):
+        """Runs the flusher thread, until no write-behind storage is left."""
+        while True:
+            cls.__wake.clear()
+            timeout = cls.__flush_round()
+            with cls.__flusher_lock:
+                if not cls.__flushed:
+                    cls.__flusher = None
+                    return
+            cls.__wake.wait(timeout)
+
+    @classmethod
+    def __flush_round(cls):
+        """
+        Flushes the write-behind storages whose saves are due.
+
+        Returns:
+        -   float: Seconds until the next saves are due, None if there are
+                none.
+        """
+        timeout = None
+        for storage in list(cls.__flushed):
+            now = time.monotonic()
+            if storage.__flush_at is not None and storage.__flush_at <= now:
+                try:
+                    storage.flush()
+                except Exception:
+                    logging.getLogger(__name__).exception(
+                        "could not flush %s", storage.__file_path
+                    )
+                if storage.__flush_at is not None and (
+                    storage.__flush_at <= now
+                ):
+                    # failed, or left to the end of a batch() block: it
+                    # is retried on the next round
+                    storage.__flush_at = now + storage.__write_behind
+            if storage.__flush_at is not None:
+                wait = max(storage.__flush_at - now, 0)
+                timeout = wait if timeout is None else min(timeout, wait)
+        return timeout
+
+    @classmethod
+    def __flush_all(cls):
+        """Flushes every write-behind storage, when the interpreter exits."""
+        for storage in list(cls.__flushed):
+            storage.flush()
+
+    def __rollback(self):
+        """Restores the state saved when the batch() block was entered."""
+        objects, records, self.__dirty = self.__batch
+        keys = itertools.chain(self.__objects, self.__records)
+        for key in [k for k in keys if k not in objects and k not in records]:
+            self.__remove(key)
+        for key, (obj, attrs) in objects.items():
+            if self.__objects.get(key) is not obj or obj.__dict__ != attrs:
+                obj.__dict__.clear()
+                obj.__dict__.update(attrs)
+                self.__put(key, obj)
+        for key, record in records.items():
+            if self.__records.get(key) is not record:
+                self.__put_record(key, record)
+
+    def __get(self, key):
+        """
+        Returns the object stored under `key` or None, building it from
+        its record if it was not built yet.
+        """
+        obj = self.__objects.get(key)
+        if obj is None and key in self.__records:
+            with self.__mutex:
+                obj = self.__objects.get(key)
+                if obj is None and key in self.__records:
+                    obj = self.__hydrate(key)
+        return obj
+
+    def __hydrate(self, key):
+        """
+        Builds the object stored under `key` from its record, with the
+        mutex held.
+        """
+        record = self.__records.pop(key)
+        if not isinstance(record, dict):
+            record = record[key]
+        obj = classes[key.split('.')[0]](**record)
+        self.__objects[key] = obj
+        return obj
+
+    def __put(self, key, obj):
+        """Stores `obj` under `key` and indexes it."""
+        self.__records.pop(key, None)
+        self.__objects[key] = obj
+        self.__index(key, obj)
+
+    def __put_record(self, key, record):
+        """Stores `record` under `key` until its object is needed."""
+        self.__objects.pop(key, None)
+        self.__records[key] = record
+        self.__index(key, record)
+
+    def __remove(self, key):
+        """Removes the object stored under `key` (if any) from the indexes."""
+        obj = self.__objects.pop(key, None)
+        record = self.__records.pop(key, None)
+        if obj is not None or record is not None:
+            self.__index(key, None)
+
+    def __apply(self, key, record):
+        """
+        Brings the object stored under `key` in line with `record`, an
+        object dictionary or None if the object was deleted.
+
+        The object is only rebuilt if it differs from `record`, and only
+        when it is first accessed in lazy mode. An object changed since
+        the last save is kept, to be written over `record`.
+        """
+        if key in self.__dirty:
+            return
+        if record is None:
+            self.__remove(key)
+            return
+        obj = self.__objects.get(key)
+        if obj is not None and obj.to_dict() == record:
+            return
+        if self.__lazy:
+            self.__put_record(key, record)
+        else:
+            self.__put(key, classes[key.split('.')[0]](**record))
+
+    def __index(self, key, item):
+        """
+        Moves `key` to the class and foreign key index entries matching
+        `item`, an object or a record, or removes it from the indexes if
+        `item` is None.
+        """
+        name = key.split('.')[0]
+        if item is None:
+            self.__by_class[name].pop(key, None)
+        else:
+            self.__by_class.setdefault(name, {})[key] = None
+        if self.__by_fk is not None and name in foreign_keys:
+            self.__index_fk(self.__by_fk, name, key, item)
+        if self.__by_value is not None and name in sorted_attrs:
+            self.__index_sorted(self.__by_value, name, key, item)
+        if self.__grids is not None and name in geo_attrs:
+            self.__index_geo(self.__grids[name], name, key, item)
+        if self.__texts is not None and name in text_attrs:
+            self.__index_text(self.__texts[name], name, key, item)
+
+    def __index_fk(self, by_fk, name, key, item):
+        """Same as __index() for the foreign key index `by_fk` only."""
+        for entry_key in self.__fk_values.pop(key, ()):
+            entry = by_fk.get(entry_key)
+            if entry is not None:
+                entry.pop(key, None)
+                if not entry:
+                    del by_fk[entry_key]
+        if item is None:
+            return
+        attrs = foreign_keys[name]
+        values = _values(name, key, item, attrs)
+        entry_keys = [(name, attr, v) for attr, v in zip(attrs, values)]
+        for entry_key in entry_keys:
+            entry = by_fk.get(entry_key)
+            if entry is None:
+                by_fk[entry_key] = entry = {}
+            entry[key] = None
+        self.__fk_values[key] = entry_keys
+
+    def __sorted_entries(self, name, attr):
+        """
+        Returns the sorted (value, key) pairs of the `attr` index of the
+        class `name`, building the sorted indexes if needed. Called with
+        the lock held for reading.
+        """
+        if self.__by_value is None:
+            with self.__mutex:
+                if self.__by_value is None:
+                    by_value = {}
+                    for sorted_name in sorted_attrs:
+                        for key in self.__by_class.get(sorted_name, ()):
+                            item = (
+                                self.__objects.get(key)
+                                or self.__records[key]
+                            )
+                            self.__index_sorted(
+                                by_value, sorted_name, key, item, True
+                            )
+                    for entries in by_value.values():
+                        entries.sort()
+                    self.__by_value = by_value
+        return self.__by_value.get((name, attr), [])
+
+    def __index_sorted(self, by_value, name, key, item, unsorted=False):
+        """
+        Same as __index() for the sorted index `by_value` only. With
+        `unsorted`, the pairs are appended and left to be sorted.
+        """
+        for entry_key, value in self.__sorted_values.pop(key, ()):
+            entries = by_value[entry_key]
+            i = bisect.bisect_left(entries, (value, key))
+            if i < len(entries) and entries[i] == (value, key):
+                del entries[i]
+        if item is None:
+            return
+        attrs = sorted_attrs[name]
+        pairs = []
+        for attr, value in zip(attrs, _values(name, key, item, attrs)):
+            if not isinstance(value, (int, float)):
+                continue
+            entries = by_value.setdefault((name, attr), [])
+            if unsorted:
+                entries.append((value, key))
+            else:
+                bisect.insort(entries, (value, key))
+            pairs.append(((name, attr), value))
+        if pairs:
+            self.__sorted_values[key] = pairs
+
+    def __grid(self, name):
+        """
+        Returns the grid index of the class `name`, building the grid
+        indexes if needed, or None if the class is not located. Called
+        with the lock held for reading.
+        """
+        if self.__grids is None:
+            with self.__mutex:
+                if self.__grids is None:
+                    grids = {}
+                    for geo_name in geo_attrs:
+                        grid = grids[geo_name] = Grid()
+                        for key in self.__by_class.get(geo_name, ()):
+                            item = (
+                                self.__objects.get(key)
+                                or self.__records[key]
+                            )
+                            self.__index_geo(grid, geo_name, key, item)
+                    self.__grids = grids
+        return self.__grids.get(name)
+
+    def __index_geo(self, grid, name, key, item):
+        """Same as __index() for the grid index `grid` only."""
+        point = None
+        if item is not None:
+            point = coordinates(_values(name, key, item, geo_attrs[name]))
+        if point is None:
+            grid.remove(key)
+        else:
+            grid.add(key, point)
+
+    def __text_index(self, name):
+        """
+        Returns the full-text index of the class `name`, building the
+        full-text indexes if needed, or None if the class has no text.
+        Called with the lock held for reading.
+        """
+        if self.__texts is None:
+            with self.__mutex:
+                if self.__texts is None:
+                    texts = {}
+                    for text_name in text_attrs:
+                        index = texts[text_name] = TextIndex()
+                        for key in self.__by_class.get(text_name, ()):
+                            item = (
+                                self.__objects.get(key)
+                                or self.__records[key]
+                            )
+                            self.__index_text(index, text_name, key, item)
+                    self.__texts = texts
+        return self.__texts.get(name)
+
+    def __index_text(self, index, name, key, item):
+        """Same as __index() for the full-text index `index` only."""
+        if item is None:
+            index.remove(key)
+        else:
+            index.add(key, _values(name, key, item, text_attrs[name]))
+
+    def __write_snapshot(self):
+        """
+        Writes the objects to the JSON files and drops the journals.
+
+        When each class has its own file, only the files of the classes
+        changed since the last save are written, unless there are
+        journals to fold. Nothing is written if the files exist and
+        nothing changed here or in them since the last save or reload.
+
+        The objects are only locked while their records are built, so
+        they can change while the files are written, and in "group" sync
+        mode the saves made meanwhile join the next write. The file and
+        journal locks are taken before the objects are released, so
+        the writes are made in order and no reload reads the files in
+        the middle of one. If another process committed since the last
+        reload, its changes are read first and the objects changed here
+        are written over them.
+        """
+        dirty = {}
+        try:
+            with ExitStack() as locks:
+                with self.__lock.write():
+                    if self.__compactor is not None:
+                        self.__compactor.join()
+                    identity = self.__identity()
+                    # nothing changed here or in the files since
+                    if (
+                        not self.__dirty
+                        and identity == self.__loaded
+                        and None not in identity[0]
+                        and identity[1:] == (None, None)
+                    ):
+                        return
+                    locks.enter_context(self.__file_lock.exclusive())
+                    generation = self.__read_generation()
+                    if generation != self.__generation:
+                        # the objects changed here since the last save
+                        # are kept, to be written over the changes read
+                        self.__reload()
+                    locks.enter_context(self.__journal_lock)
+                    journals = [
+                        path
+                        for path in (self.__sealed_path, self.__journal_path)
+                        if os.path.exists(path)
+                    ]
+                    dirty = self.__dirty
+                    classes_changed = {key.split('.')[0] for key in dirty}
+                    snapshots = []
+                    for path, names in self.__snapshots.items():
+                        if names is None:
+                            names = list(self.__by_class)
+                        elif not journals and classes_changed.isdisjoint(
+                            names
+                        ):
+                            continue
+                        snapshots.append(
+                            (path, list(self.__records_of(names)))
+                        )
+                    self.__dirty = {}
+                for path, records in snapshots:
+                    self.__replace(path, records)
+                for path in journals:
+                    os.remove(path)
+                self.__generation = self.__bump_generation(generation)
+                self.__journal_entries = 0
+                self.__journal_offset = 0
+                self.__loaded = self.__identity()
+        except BaseException:
+            # the changes are written with the next save
+            with self.__lock.write():
+                for key, obj in dirty.items():
+                    self.__dirty.setdefault(key, obj)
+            raise
+
+    def __records_of(self, names):
+        """Yields the (key, record) pairs of the given classes' objects."""
+        for name in names:
+            for key in self.__by_class.get(name, ()):
+                obj = self.__objects.get(key)
+                if obj is not None:
+                    yield key, obj.to_dict()
+                    continue
+                record = self.__records[key]
+                if not isinstance(record, dict):
+                    record = record[key]
+                yield key, record
+
+    def __append_journal(self):
+        """
+        Appends one Json line per changed object to the journal file.
+
+        The objects are only locked while their lines are built, so they
+        can change while the lines are written to disk. The file and
+        journal locks are taken before the objects are released so the
+        lines are written in the order the changes were made.
+        """
+        dirty = {}
+        try:
+            with ExitStack() as locks:
+                with self.__lock.write():
+                    dirty = self.__dirty
+                    if not dirty:
+                        return
+                    lines = [
+                        json.dumps({
+                            "key": key,
+                            "obj": obj.to_dict() if obj is not None else None,
+                        }) + "\n"
+                        for key, obj in dirty.items()
+                    ]
+                    self.__dirty = {}
+                    locks.enter_context(self.__file_lock.exclusive())
+                    locks.enter_context(self.__journal_lock)
+                in_sync = self.__identity() == self.__loaded
+                generation = self.__read_generation()
+                created = not os.path.exists(self.__journal_path)
+                with open(self.__journal_path, 'a') as f:
+                    f.writelines(lines)
+                    size = f.tell()
+                    self.__fsync(f)
+                if created:
+                    self.__sync_dir()
+                bumped = self.__bump_generation(generation)
+                self.__journal_entries += len(lines)
+                # no one else wrote to the files, the next reload can skip
+                # them
+                if in_sync:
+                    self.__loaded = self.__identity()
+                    self.__journal_offset = size
+                if generation == self.__generation:
+                    self.__generation = bumped
+        except BaseException:
+            # the changes are written with the next save
+            with self.__lock.write():
+                for key, obj in dirty.items():
+                    self.__dirty.setdefault(key, obj)
+            raise
+        count = len(self.__objects) + len(self.__records)
+        if size >= HBNB_JOURNAL_MAX_BYTES or self.__journal_entries > max(
+            JOURNAL_MIN_ENTRIES, count
+        ):
+            self.compact()
+
+    def __fold_journal(self):
+        """
+        Rewrites the JSON files from themselves and the sealed journal.
+
+        Only the files holding a class found in the journal are written.
+        The new files are written aside with no lock held, so the other
+        threads and processes keep appending to the live journal
+        meanwhile. The files and the journal are then locked only to
+        rename the new files over the old ones and drop the sealed
+        journal, so readers see either the old files and the sealed
+        journal, or the new files alone.
+        If another process rewrote the files in between, the fold starts
+        over from them.
+        """
+        while True:
+            layout = self.__identity()[:2]
+            # another process may have folded it meanwhile
+            if layout[1] is None:
+                return
+            suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+            written = []
+            try:
+                changes = {}
+                self.__replay_journal(self.__sealed_path, changes)
+                for path, names in self.__snapshots.items():
+                    changed = {
+                        key: record
+                        for key, record in changes.items()
+                        if names is None or key.split('.')[0] in names
+                    }
+                    if not changed:
+                        continue
+                    kept = (
+                        (key, record)
+                        for key, record in self.__snapshot_records(path)
+                        if key not in changed
+                    )
+                    added = (
+                        (key, record)
+                        for key, record in changed.items()
+                        if record is not None
+                    )
+                    written.append(path)
+                    self.__write_aside(
+                        path + suffix, itertools.chain(kept, added)
+                    )
+                # the reloads of this process wait for the swap too
+                with self.__file_lock.exclusive(), self.__journal_lock:
+                    if self.__identity()[:2] != layout:
+                        continue
+                    for path in written:
+                        os.replace(path + suffix, path)
+                    written = []
+                    self.__sync_dir()
+                    os.remove(self.__sealed_path)
+                    # the objects already hold what was folded
+                    if (
+                        self.__loaded is not None
+                        and self.__loaded[:2] == layout
+                    ):
+                        self.__loaded = (
+                            self.__identity()[:2] + self.__loaded[2:]
+                        )
+                    return
+            finally:
+                for path in written:
+                    try:
+                        os.remove(path + suffix)
+                    except OSError:
+                        pass
+
+    def __replace(self, path, items):
+        """
+        Writes the (key, record) pairs of `items` to the snapshot file
+        `path`.
+
+        The file is written aside and renamed over the old one, so a
+        crash in the middle of the write leaves the old file untouched.
+        """
+        tmp_path = f"{path}.tmp"
+        self.__write_aside(tmp_path, items)
+        os.replace(tmp_path, path)
+        self.__sync_dir()
+
+    def __write_aside(self, tmp_path, items):
+        """
+        Writes the (key, record) pairs of `items` to the file `tmp_path`,
+        flushed to disk, in the format of the snapshot files.
+
+        A compressed file is streamed through its codec, which is closed
+        (writing the end of the stream) before the file is flushed.
+        """
+        if self.__compression is None:
+            mode = 'w' + self.__format.binary
+        else:
+            mode = 'wb'
+        with open(tmp_path, mode) as f:
+            if self.__compression is None:
+                self.__format.write(f, items)
+            else:
+                with self.__compression(
+                    f, 'w' + (self.__format.binary or 't')
+                ) as stream:
+                    self.__format.write(stream, items)
+            self.__fsync(f)
+
+    def __fsync(self, f):
+        """Flushes the file `f` to disk, unless sync mode is "none"."""
+        if self.__sync != "none":
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __sync_dir(self):
+        """
+        Flushes the directory of the files to disk, so that renamed and
+        created files survive a crash, unless sync mode is "none".
+        """
+        if self.__sync == "none":
+            return
+        fd = os.open(os.path.dirname(self.__file_path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def __load(self, previous=None):
+        """
+        Loads the objects from the files.
+
+        The JSON files are streamed and each record is turned into an
+        object as soon as it is decoded, so the whole text and the whole
+        decoded tree are never held in memory. The journals are read
+        first, and the records they supersede are skipped.
+
+        The load is retried if a compaction swapped the files meanwhile.
+
+        When the objects are cached, a first load starts from the cache
+        if the JSON files did not change since it was written, and
+        writes the cache otherwise (when there are no journals, so that
+        it holds the JSON files only).
+
+        Args:
+        -   previous (tuple, optional): The identity of the files as of
+                the last load, the JSON files that did not change since
+                are not read again.
+        """
+        for _ in range(5):
+            layout = self.__layout()
+            journals = [
+                path
+                for path in (self.__sealed_path, self.__journal_path)
+                if os.path.exists(path)
+            ]
+            if not journals and not any(
+                st is not None and st[2] > 0 for st in layout[0]
+            ):
+                return
+            changes = {}
+            entries = offset = 0
+            for path in journals:
+                count, offset = self.__replay_journal(path, changes)
+                entries += count
+            if self.__journal_path not in journals:
+                offset = 0
+            cached = None
+            if previous is None and self.__cache_path is not None:
+                cached = read_cache(self.__cache_path, layout[0])
+            if cached is not None:
+                for key in list(self.__objects):
+                    if key not in cached and key not in self.__dirty:
+                        self.__remove(key)
+                for key, obj in cached.items():
+                    if key not in self.__dirty:
+                        self.__put(key, obj)
+            for i, (path, names) in enumerate(self.__snapshots.items()):
+                if cached is not None or (
+                    previous is not None and previous[0][i] == layout[0][i]
+                ):
+                    continue
+                seen = set(changes)
+                if self.__lazy and self.__format.mapper is not None:
+                    records = self.__mapped_records(path)
+                else:
+                    records = self.__snapshot_records(path)
+                for key, record in records:
+                    if key not in seen:
+                        seen.add(key)
+                        self.__apply(key, record)
+                keys = [
+                    key
+                    for name in names or list(self.__by_class)
+                    for key in self.__by_class.get(name, ())
+                    if key not in seen and key not in self.__dirty
+                ]
+                for key in keys:
+                    self.__remove(key)
+            for key, record in changes.items():
+                self.__apply(key, record)
+            if layout == self.__layout():
+                break
+            previous = None
+        if (
+            previous is None
+            and cached is None
+            and not journals
+            and not self.__dirty
+            and self.__cache_path is not None
+        ):
+            write_cache(self.__cache_path, layout[0], self.__objects)
+        self.__journal_entries = entries
+        self.__journal_offset = offset
+
+    def __read_generation(self):
+        """
+        Returns the commit counter of the files, 0 if it is unknown or
+        other processes do not share the files.
+        """
+        if not self.__locking:
+            return 0
+        try:
+            with open(self.__generation_path) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return 0
+
+    def __bump_generation(self, generation):
+        """
+        Stores `generation` + 1 as the commit counter of the files, with
+        the file lock held, and returns it.
+        """
+        if not self.__locking:
+            return 0
+        generation += 1
+        with open(self.__generation_path, 'w') as f:
+            f.write(str(generation))
+        return generation
+
+    def __identity(self):
+        """
+        Returns the (inode, mtime, size) of the JSON files, the sealed
+        journal and the live journal, None for the missing ones.
+        """
+        return (
+            tuple(self.__stat(path) for path in self.__snapshots),
+            self.__stat(self.__sealed_path),
+            self.__stat(self.__journal_path),
+        )
+
+    @staticmethod
+    def __stat(path):
+        """Returns the (inode, mtime, size) of `path`, None if missing."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def __layout(self):
+        """Returns what must not change while the files are being read."""
+        layout = self.__identity()
+        # appending to the live journal is fine, replacing it is not
+        return layout[:2] + (layout[2] and layout[2][0],)
+
+    def __snapshot_records(self, path):
+        """
+        Yields the (key, record) pairs of the snapshot file `path`, if
+        any, decompressed on the fly if it is compressed.
+        """
+        opener = self.__compression or open
+        try:
+            f = opener(path, 'r' + (self.__format.binary or 't'))
+        except IOError:
+            return
+        with f:
+            yield from self.__format.read(f)
+
+    def __mapped_records(self, path):
+        """
+        Yields the keys of the snapshot file `path`, if any, each paired
+        with the mapper of the file instead of its record.
+        """
+        try:
+            f = open(path, 'rb')
+        except IOError:
+            return
+        with f:
+            if not os.fstat(f.fileno()).st_size:
+                return
+            mapper = self.__format.mapper(f)
+        for key in mapper:
+            yield key, mapper
+
+    def __replay_journal(self, path, records, offset=0):
+        """
+        Applies the entries of the journal file at `path` to `records`
+        in place, from the byte `offset` on. Deleted objects are set to
+        None.
+
+        A truncated last line (e.g. a crash in the middle of an append)
+        is ignored.
+
+        Returns:
+        -   tuple: The number of entries applied and the offset of the
+                first byte that was not consumed.
+        """
+        count = 0
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    records[entry["key"]] = entry["obj"]
+                    offset += len(line)
+                    count += 1
+        except IOError:
+            pass
+        return count, offset
+
+
+class _Last:
+    """Sorts after any key, to bisect past the pairs of a value."""
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+_LAST = _Last()
+
+
+def _values(name, key, item, attrs):
+    """
+    Returns the values of the attributes `attrs` of `item`, the object
+    or the record (or the mapper of the record) stored under `key`.
+    """
+    if isinstance(item, MappedSnapshot):
+        item = item[key]
+    if isinstance(item, dict):
+        cls = classes[name]
+        return [item.get(attr, getattr(cls, attr, None)) for attr in attrs]
+    return [getattr(item, attr, None) for attr in attrs]
+
+
+def _bounds(entries, low, high, open_low, open_high):
+    """
+    Returns the slice of the sorted (value, key) pairs `entries` whose
+    value is between `low` and `high`.
+    """
+    start, stop = 0, len(entries)
+    if low is not None:
+        bound = (low, _LAST) if open_low else (low,)
+        start = bisect.bisect_left(entries, bound)
+    if high is not None:
+        bound = (high,) if open_high else (high, _LAST)
+        stop = bisect.bisect_left(entries, bound)
+    return start, max(start, stop)
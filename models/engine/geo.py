@@ -0,0 +1,184 @@
+#!/usr/bin/python3
+"""
+Module defining the geospatial index of the storage engines.
+
+A Grid splits the globe in cells of `GRID_DEGREES` of latitude and
+longitude and keeps the coordinates of each key in its cell, so a
+bounding box only reads the cells it overlaps rather than every object.
+
+Boxes are given as (south, west, north, east) in degrees. A box whose
+west is greater than its east crosses the antimeridian. Distances are
+great-circle distances in kilometers.
+"""
+import math
+
+# the mean radius of the Earth, in kilometers
+EARTH_RADIUS_KM = 6371.0088
+# the side of the grid cells, in degrees (about 28 km of latitude)
+GRID_DEGREES = 0.25
+
+
+def distance(latitude, longitude, other_latitude, other_longitude):
+    """Returns the distance in km between two points (haversine)."""
+    lat1, lon1, lat2, lon2 = map(
+        math.radians, (latitude, longitude, other_latitude, other_longitude)
+    )
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def circle_box(latitude, longitude, radius):
+    """
+    Returns the smallest box holding the points within `radius` km of
+    the point (`latitude`, `longitude`).
+    """
+    delta = math.degrees(radius / EARTH_RADIUS_KM)
+    south = max(-90.0, latitude - delta)
+    north = min(90.0, latitude + delta)
+    if south == -90.0 or north == 90.0 or delta >= 90.0:
+        # the circle holds a pole, so every longitude
+        return south, -180.0, north, 180.0
+    # the widest longitude span is where the circle touches its
+    # meridians, closer to the pole than its center
+    spread = math.asin(
+        min(1.0, math.sin(math.radians(delta))
+            / math.cos(math.radians(latitude)))
+    )
+    spread = math.degrees(spread)
+    if spread >= 180.0:
+        return south, -180.0, north, 180.0
+    west = _wrap(longitude - spread)
+    east = _wrap(longitude + spread)
+    return south, west, north, east
+
+
+def in_box(latitude, longitude, box):
+    """Returns whether the point is in the (south, west, north, east) box."""
+    south, west, north, east = box
+    if not south <= latitude <= north:
+        return False
+    if west <= east:
+        return west <= longitude <= east
+    return longitude >= west or longitude <= east
+
+
+def coordinates(values):
+    """
+    Returns the (latitude, longitude) pair of `values`, or None if they
+    are not both numbers.
+    """
+    latitude, longitude = values
+    for value in (latitude, longitude):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+    return latitude, longitude
+
+
+def nearest(objects, attrs, latitude, longitude, radius):
+    """
+    Returns the objects of `objects` within `radius` km of the point,
+    the nearest first.
+
+    Args:
+    -   attrs (tuple): The latitude and longitude attribute names.
+    """
+    found = []
+    for obj in objects:
+        point = coordinates([getattr(obj, attr, None) for attr in attrs])
+        if point is None:
+            continue
+        km = distance(latitude, longitude, *point)
+        if km <= radius:
+            found.append((km, obj.id, obj))
+    found.sort(key=lambda item: item[:2])
+    return [obj for _, _, obj in found]
+
+
+class Grid:
+    """
+    A grid index of the coordinates of keys.
+
+    Attributes:
+    -   cells (dict): Maps each (row, column) cell to the dictionary of
+            the coordinates of the keys in it.
+    -   points (dict): The coordinates of each key.
+    """
+
+    __slots__ = ("cells", "points")
+
+    def __init__(self):
+        self.cells = {}
+        self.points = {}
+
+    def __len__(self):
+        return len(self.points)
+
+    def add(self, key, point):
+        """Moves `key` to `point`, a (latitude, longitude) pair."""
+        self.remove(key)
+        self.points[key] = point
+        self.cells.setdefault(_cell(*point), {})[key] = point
+
+    def remove(self, key):
+        """Removes `key` from the grid, if it is in it."""
+        point = self.points.pop(key, None)
+        if point is None:
+            return
+        cell = _cell(*point)
+        entry = self.cells[cell]
+        del entry[key]
+        if not entry:
+            del self.cells[cell]
+
+    def within(self, box):
+        """
+        Returns the keys whose coordinates are in `box`, reading only the
+        cells overlapping it, or every cell if they are fewer.
+        """
+        south, west, north, east = box
+        first_row, last_row = _index(south), _index(north)
+        if west <= east:
+            spans = [(_index(west), _index(east))]
+        else:
+            spans = [(_index(west), _index(180.0)),
+                     (_index(-180.0), _index(east))]
+        rows = last_row - first_row + 1
+        size = sum(rows * (last - first + 1) for first, last in spans)
+        if size >= len(self.cells):
+            cells = self.cells.values()
+        else:
+            cells = [
+                self.cells[row, column]
+                for first, last in spans
+                for row in range(first_row, last_row + 1)
+                for column in range(first, last + 1)
+                if (row, column) in self.cells
+            ]
+        return [
+            key
+            for entry in cells
+            for key, point in entry.items()
+            if in_box(*point, box)
+        ]
+
+
+def _index(degrees):
+    """Returns the grid row or column holding `degrees`."""
+    return math.floor(degrees / GRID_DEGREES)
+
+
+def _cell(latitude, longitude):
+    """Returns the (row, column) cell of the point."""
+    return _index(latitude), _index(longitude)
+
+
+def _wrap(longitude):
+    """Returns `longitude` brought back within [-180, 180]."""
+    if longitude < -180.0:
+        return longitude + 360.0
+    if longitude > 180.0:
+        return longitude - 360.0
+    return longitude
@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+"""Module defining the locks used by the storage engines"""
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # not available on Windows, where FileLock does nothing
+    fcntl = None
+
+
+class RWLock:
+    """
+    A lock held either by any number of readers or by a single writer.
+
+    Waiting writers go before new readers, so a steady flow of readers
+    cannot starve them. Both sides are reentrant and the writer may also
+    read, but a reader cannot become a writer.
+
+    Usage: `with lock.read(): ...` or `with lock.write(): ...`
+
+    Attributes:
+    -   _mutex (Lock): Guards the state below.
+    -   _cond (Condition): Signals the changes of the state below.
+    -   _readers (dict): Maps the id of each thread holding the lock
+            for reading to how many times it acquired it.
+    -   _writer (int): The id of the thread holding the lock for writing.
+    -   _writes (int): How many times the writer acquired the lock.
+    -   _waiting (int): Number of writers waiting for the lock.
+    -   _sleeping (int): Number of threads waiting on _cond.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._cond = threading.Condition(self._mutex)
+        self._readers = {}
+        self._writer = None
+        self._writes = 0
+        self._waiting = 0
+        self._sleeping = 0
+        self._read = _ReadSide(self)
+        self._write = _WriteSide(self)
+
+    def read(self):
+        """Returns a context manager holding the lock for reading."""
+        return self._read
+
+    def write(self):
+        """Returns a context manager holding the lock for writing."""
+        return self._write
+
+    def writing(self):
+        """Returns whether the calling thread holds the lock for writing."""
+        return self._writer == threading.get_ident()
+
+    def _wait(self):
+        """Waits for a change of the state, with _mutex held."""
+        self._sleeping += 1
+        try:
+            self._cond.wait()
+        finally:
+            self._sleeping -= 1
+
+    def _wake(self):
+        """Wakes the waiting threads up, with _mutex held."""
+        if self._sleeping:
+            self._cond.notify_all()
+
+
+class _ReadSide:
+    """The `with` block holding a RWLock for reading."""
+
+    __slots__ = ("lock",)
+
+    def __init__(self, lock):
+        self.lock = lock
+
+    def __enter__(self):
+        lock = self.lock
+        me = threading.get_ident()
+        if me == lock._writer:
+            return
+        readers = lock._readers
+        if me in readers:
+            readers[me] += 1
+            return
+        with lock._mutex:
+            while lock._writer is not None or lock._waiting:
+                lock._wait()
+            readers[me] = 1
+
+    def __exit__(self, *exc):
+        lock = self.lock
+        me = threading.get_ident()
+        if me == lock._writer:
+            return
+        readers = lock._readers
+        if readers[me] > 1:
+            readers[me] -= 1
+            return
+        with lock._mutex:
+            del readers[me]
+            if not readers:
+                lock._wake()
+
+
+class _WriteSide:
+    """The `with` block holding a RWLock for writing."""
+
+    __slots__ = ("lock",)
+
+    def __init__(self, lock):
+        self.lock = lock
+
+    def __enter__(self):
+        """
+        Raises:
+        -   RuntimeError: If the thread holds the lock for reading.
+        """
+        lock = self.lock
+        me = threading.get_ident()
+        if lock._writer == me:
+            lock._writes += 1
+            return
+        if me in lock._readers:
+            raise RuntimeError("A reader cannot take the write lock")
+        with lock._mutex:
+            lock._waiting += 1
+            try:
+                while lock._writer is not None or lock._readers:
+                    lock._wait()
+            finally:
+                lock._waiting -= 1
+                if not lock._waiting:
+                    # readers held back by this writer may go on
+                    lock._wake()
+            lock._writer = me
+            lock._writes = 1
+
+    def __exit__(self, *exc):
+        lock = self.lock
+        lock._writes -= 1
+        if lock._writes:
+            return
+        with lock._mutex:
+            lock._writer = None
+            lock._wake()
+
+
+class FileLock:
+    """
+    An advisory lock on a file, shared by the processes using it.
+
+    Each `with` block opens its own descriptor, so the threads of a
+    process exclude each other the same way processes do. The lock is
+    not reentrant.
+
+    Usage: `with lock.shared(): ...` or `with lock.exclusive(): ...`
+
+    Attributes:
+    -   path (str): The path to the lock file, None to lock nothing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def shared(self):
+        """Returns a context manager holding the lock with other readers."""
+        return self.__hold(fcntl and fcntl.LOCK_SH)
+
+    def exclusive(self):
+        """Returns a context manager holding the lock alone."""
+        return self.__hold(fcntl and fcntl.LOCK_EX)
+
+    @contextmanager
+    def __hold(self, operation):
+        """Holds the lock in the given fcntl.flock() mode."""
+        if self.path is None or fcntl is None:
+            yield
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, operation)
+            yield
+        finally:
+            # closing the descriptor releases the lock
+            os.close(fd)
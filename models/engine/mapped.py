@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+"""
+Module reading and writing snapshots meant to be memory-mapped.
+
+The records are stored as JSON texts one after the other, followed by
+an index of fixed size entries sorted by key. A reader maps the file in
+memory and finds a record with a binary search on the index, so opening
+a snapshot reads nothing but the header, only the records asked for are
+decoded, and processes mapping the same file share its pages through the
+OS page cache.
+
+Layout of a file:
+>>  header: MAGIC, record count (Q), key width (I), index offset (Q)
+>>  records: one JSON text per record
+>>  index: for each key in sorted order, the key padded with NUL bytes
+>>  to the key width, the offset (Q) and the length (I) of its record
+"""
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_left
+
+MAGIC = b"HBNBMAP1"
+_HEADER = struct.Struct("<8sQIQ")
+_LOCATION = struct.Struct("<QI")
+
+
+def write_mapped(f, items):
+    """
+    Writes the (key, record) pairs of `items` to `f` in the mapped
+    layout. The records are written one at a time, only their keys and
+    locations are held in memory until the index is written.
+
+    Args:
+    -   f (file): A seekable file opened in binary mode.
+    -   items (iterable): The (key, record) pairs to write.
+    """
+    f.write(_HEADER.pack(MAGIC, 0, 0, 0))
+    offset = _HEADER.size
+    index = []
+    for key, record in items:
+        data = json.dumps(record).encode()
+        f.write(data)
+        index.append((key.encode(), offset, len(data)))
+        offset += len(data)
+    index.sort()
+    width = max((len(key) for key, _, _ in index), default=0)
+    for key, start, length in index:
+        f.write(key.ljust(width, b"\0") + _LOCATION.pack(start, length))
+    f.seek(0)
+    f.write(_HEADER.pack(MAGIC, len(index), width, offset))
+    f.seek(0, 2)
+
+
+class MappedSnapshot:
+    """
+    A read-only view of a snapshot file in the mapped layout.
+
+    It behaves as a mapping from key to record, where each record is
+    decoded when it is looked up.
+
+    Attributes:
+    -   count (int): Number of records.
+    -   width (int): Size of the keys in the index.
+    -   entry_size (int): Size of an index entry.
+    -   index_offset (int): Position of the index in the file.
+    """
+
+    def __init__(self, f):
+        """
+        Maps the file `f`, opened in binary mode, in memory. The file
+        can be closed afterwards.
+
+        Raises:
+        -   ValueError: If the file is not in the mapped layout.
+        """
+        if os.fstat(f.fileno()).st_size < _HEADER.size:
+            raise ValueError("Not a mapped snapshot")
+        self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.width, self.index_offset = (
+            _HEADER.unpack_from(self.__map)
+        )
+        self.entry_size = self.width + _LOCATION.size
+        if (
+            magic != MAGIC
+            or self.index_offset + self.count * self.entry_size
+            != self.__map.size()
+        ):
+            raise ValueError("Not a mapped snapshot")
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """Yields the keys in sorted order."""
+        width = self.width
+        index = self.__map[self.index_offset:]
+        for i in range(0, len(index), self.entry_size):
+            yield index[i:i + width].rstrip(b"\0").decode()
+
+    def __contains__(self, key):
+        return self.__find(key) is not None
+
+    def __getitem__(self, key):
+        """
+        Returns the record stored under `key`.
+
+        Raises:
+        -   KeyError: If there is no such record.
+        """
+        location = self.__find(key)
+        if location is None:
+            raise KeyError(key)
+        start, length = location
+        return json.loads(self.__map[start:start + length])
+
+    def get(self, key, default=None):
+        """Returns the record stored under `key`, or `default`."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self):
+        """Yields the (key, record) pairs in sorted order."""
+        width = self.width
+        index = self.__map[self.index_offset:]
+        for i in range(0, len(index), self.entry_size):
+            key = index[i:i + width].rstrip(b"\0").decode()
+            start, length = _LOCATION.unpack_from(index, i + width)
+            yield key, json.loads(self.__map[start:start + length])
+
+    def close(self):
+        """Unmaps the file."""
+        self.__map.close()
+
+    def __key_at(self, i):
+        """Returns the padded key of the index entry `i`."""
+        start = self.index_offset + i * self.entry_size
+        return self.__map[start:start + self.width]
+
+    def __find(self, key):
+        """Returns the (offset, length) of the record of `key`, or None."""
+        target = key.encode()
+        if len(target) > self.width:
+            return None
+        target = target.ljust(self.width, b"\0")
+        i = bisect_left(_Keys(self.__key_at, self.count), target)
+        if i == self.count or self.__key_at(i) != target:
+            return None
+        start = self.index_offset + i * self.entry_size + self.width
+        return _LOCATION.unpack_from(self.__map, start)
+
+
+class _Keys:
+    """The sequence of the padded keys of an index, for bisect."""
+
+    __slots__ = ("key_at", "count")
+
+    def __init__(self, key_at, count):
+        self.key_at = key_at
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return self.key_at(i)
+
+
+def iter_mapped(f):
+    """
+    Yields the (key, record) pairs stored in `f` in the mapped layout.
+
+    Args:
+    -   f (file): A file opened in binary mode.
+
+    Raises:
+    -   ValueError: If the file is not in the mapped layout.
+    """
+    if not os.fstat(f.fileno()).st_size:
+        return
+    snapshot = MappedSnapshot(f)
+    try:
+        yield from snapshot.items()
+    finally:
+        snapshot.close()
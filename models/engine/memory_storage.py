@@ -0,0 +1,232 @@
+#!/usr/bin/python3
+"""Module handling a storage kept in memory only"""
+from models.engine.file_storage import (
+    classes, foreign_keys, geo_attrs, text_attrs
+)
+from models.engine.geo import Grid, circle_box, coordinates, nearest
+from models.engine.search import TextIndex
+from models.engine.query import Query
+
+
+class MemoryStorage:
+    """
+    Manage class instances in memory, without reading or writing any
+    file. The objects are lost when the process exits.
+
+    It serves the tests and benchmarks, and is the baseline to measure
+    the overhead of the other engines against.
+
+    Attributes:
+    -   __objects (dict): A dictionary containing every class instance.
+    -   __by_class (dict): Maps each class name to the dictionary of its
+            instances by key.
+    -   __by_fk (dict): Maps each (class name, attribute, value) of the
+            attributes of `foreign_keys` to the dictionary of the
+            instances holding that value by key.
+    -   __fk_values (dict): The indexed (attribute, value) pairs of each
+            key, to move it when it changes.
+    -   __grids (dict): Maps the class names of `geo_attrs` to the Grid
+            of the coordinates of their instances.
+    -   __texts (dict): Maps the class names of `text_attrs` to the
+            TextIndex of the text of their instances.
+    """
+
+    def __init__(self):
+        """Initializes an empty storage."""
+        self.__objects = {}
+        self.__by_class = {name: {} for name in classes}
+        self.__by_fk = {}
+        self.__fk_values = {}
+        self.__grids = {name: Grid() for name in geo_attrs}
+        self.__texts = {name: TextIndex() for name in text_attrs}
+
+    def all(self, cls=None):
+        """
+        Returns a dictionary of the stored instances by key.
+
+        The returned dictionary is a copy, so it can be iterated while
+        objects are added and removed with new() and delete().
+
+        Args:
+        -   cls (class | str, optional): Only returns the instances of
+                this class (or class name).
+        """
+        if cls is None:
+            return dict(self.__objects)
+        name = cls if isinstance(cls, str) else cls.__name__
+        return dict(self.__by_class.get(name, {}))
+
+    def iter_all(self, cls=None):
+        """
+        Returns the instances to iterate by key, the same as all(): they
+        are all in memory already.
+        """
+        return self.all(cls)
+
+    def get(self, cls, id):
+        """
+        Returns the instance of `cls` (a class or class name) with the
+        given id, or None if there is none.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        return self.__objects.get(f"{name}.{id}")
+
+    def count(self, cls=None):
+        """
+        Returns the number of instances of `cls` (a class or class
+        name), or of every class if `cls` is None.
+        """
+        if cls is None:
+            return len(self.__objects)
+        name = cls if isinstance(cls, str) else cls.__name__
+        return len(self.__by_class.get(name, {}))
+
+    def query(self, cls):
+        """
+        Returns a query on the instances of `cls` (a class or class
+        name), see models.engine.query.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        return Query(self, name, foreign_keys.get(name, ()))
+
+    def related(self, cls, attr, value):
+        """
+        Returns the list of `cls` instances whose foreign key `attr`
+        equals `value`, e.g. related(City, "state_id", state.id).
+
+        Only the attributes listed in `foreign_keys` are indexed, as of
+        the last new() of each instance.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        return list(self.__by_fk.get((name, attr, value), {}).values())
+
+    def within(self, cls, south, west, north, east):
+        """
+        Returns the list of `cls` instances located in the box bounded
+        by the given latitudes and longitudes (in degrees), as of the
+        last new() of each instance. A box whose west is greater than
+        its east crosses the antimeridian.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        grid = self.__grids.get(name)
+        if grid is None:
+            return []
+        box = (south, west, north, east)
+        return [self.__objects[key] for key in grid.within(box)]
+
+    def nearby(self, cls, latitude, longitude, radius):
+        """
+        Returns the list of `cls` instances within `radius` km of the
+        point (`latitude`, `longitude`), the nearest first.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        return nearest(
+            self.within(name, *circle_box(latitude, longitude, radius)),
+            geo_attrs.get(name, ()),
+            latitude,
+            longitude,
+            radius,
+        )
+
+    def search(self, cls, text, limit=None):
+        """
+        Returns the list of `cls` instances whose text matches `text`,
+        the best ranked first, at most `limit` of them, as of the last
+        new() of each instance (see models.engine.search).
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        index = self.__texts.get(name)
+        if index is None:
+            return []
+        return [self.__objects[key] for key in index.search(text, limit)]
+
+    def new(self, obj):
+        """
+        Sets in __objects the obj with key <obj class name>.id
+
+        Args:
+        -   obj (BaseModel): The object to be added.
+        """
+        name = obj.__class__.__name__
+        key = f"{name}.{obj.id}"
+        self.__objects[key] = obj
+        self.__by_class.setdefault(name, {})[key] = obj
+        self.__index_fk(name, key, obj)
+        self.__index_geo(name, key, obj)
+        self.__index_text(name, key, obj)
+
+    def save(self):
+        """Does nothing, the objects are only kept in memory."""
+
+    def delete(self, obj=None):
+        """Deletes an object."""
+        if obj is None:
+            return
+
+        name = obj.__class__.__name__
+        key = f"{name}.{obj.id}"
+        self.__objects.pop(key, None)
+        self.__by_class.get(name, {}).pop(key, None)
+        self.__index_fk(name, key, None)
+        self.__index_geo(name, key, None)
+        self.__index_text(name, key, None)
+
+    def reload(self):
+        """Does nothing, there is nothing to read."""
+
+    def close(self):
+        """Does nothing, there is nothing to release."""
+
+    def __index_fk(self, name, key, obj):
+        """
+        Moves `key` to the foreign key index entries matching `obj`, or
+        out of the index if `obj` is None.
+        """
+        values = ()
+        if obj is not None:
+            values = tuple(
+                (attr, getattr(obj, attr, None))
+                for attr in foreign_keys.get(name, ())
+            )
+        for attr, value in self.__fk_values.pop(key, ()):
+            entry = self.__by_fk[(name, attr, value)]
+            del entry[key]
+            if not entry:
+                del self.__by_fk[(name, attr, value)]
+        for attr, value in values:
+            self.__by_fk.setdefault((name, attr, value), {})[key] = obj
+        if values:
+            self.__fk_values[key] = values
+
+    def __index_geo(self, name, key, obj):
+        """
+        Moves `key` to the grid cell of the coordinates of `obj`, or out
+        of the grid if `obj` is None or has none.
+        """
+        grid = self.__grids.get(name)
+        if grid is None:
+            return
+        point = None
+        if obj is not None:
+            point = coordinates(
+                [getattr(obj, attr, None) for attr in geo_attrs[name]]
+            )
+        if point is None:
+            grid.remove(key)
+        else:
+            grid.add(key, point)
+
+    def __index_text(self, name, key, obj):
+        """
+        Indexes the text of `obj` under `key`, or removes it from the
+        full-text index if `obj` is None.
+        """
+        index = self.__texts.get(name)
+        if index is None:
+            return
+        if obj is None:
+            index.remove(key)
+        else:
+            index.add(
+                key, [getattr(obj, attr, None) for attr in text_attrs[name]]
+            )
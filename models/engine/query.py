@@ -0,0 +1,392 @@
+#!/usr/bin/python3
+"""
+Module defining the queries of the storage engines.
+
+A query is built from `storage.query(cls)` by chaining:
+>>  .filter(name="Nevada", price_by_night__gte=50, id__in=ids)
+>>  .order_by("name", "-price_by_night")
+>>  .limit(10)
+and run with .all(), .first(), .count() or by iterating it. Each
+keyword of filter() is an attribute name, optionally followed by "__"
+and one of the operators of `OPERATORS` ("eq" when there is none).
+
+The engines keeping objects in memory or files run it with Query: the
+objects are read through the cheapest index available (the primary key,
+then the indexed foreign keys, then the sorted index matching the fewest
+objects), or by scanning the class if there is none, and the other
+conditions are checked on each object. The objects read from a sorted
+index are already in its order, so sorting on the same attribute costs
+nothing and a limit stops the read early; a query sorted on an indexed
+attribute walks its index even when no condition ranges over it. The
+SQL engines run it with SQLQuery, as one SELECT statement.
+
+explain() describes how the query runs.
+"""
+import itertools
+import operator
+from sqlalchemy import func, select, text
+
+OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "in": lambda value, values: value in values,
+}
+# the operators a sorted index serves
+RANGE_OPERATORS = ("eq", "lt", "lte", "gt", "gte")
+
+
+def parse_condition(keyword, value):
+    """
+    Returns the (attribute, operator name, value) condition of the
+    filter() keyword `keyword`.
+
+    Raises:
+    -   ValueError: If the operator is unknown.
+    """
+    attr, _, op = keyword.partition("__")
+    op = op or "eq"
+    if op not in OPERATORS:
+        raise ValueError(f"Unknown operator {op!r} in {keyword!r}")
+    if op == "in":
+        # without duplicates, so each object is read once
+        value = tuple(dict.fromkeys(value))
+    return attr, op, value
+
+
+class Query:
+    """
+    A query on the instances of a class, run on an engine keeping the
+    objects in memory or in files.
+
+    Attributes:
+    -   storage: The engine, which provides iter_all(), get(), related()
+            and count().
+    -   cls (class | str): The class (or class name) queried.
+    -   name (str): The class name.
+    -   indexed (tuple): The attributes related() finds the objects of.
+    -   ranged (tuple): The attributes between() finds the objects of.
+    -   conditions (tuple): The (attribute, operator, value) conditions.
+    -   order (tuple): The attributes to sort by, prefixed with "-" for
+            a descending order.
+    -   size (int): The maximum number of objects, None for no limit.
+    """
+
+    def __init__(self, storage, cls, indexed=(), ranged=(), conditions=(),
+                 order=(), size=None):
+        self.storage = storage
+        self.cls = cls
+        self.name = cls if isinstance(cls, str) else cls.__name__
+        self.indexed = indexed
+        self.ranged = ranged
+        self.conditions = conditions
+        self.order = order
+        self.size = size
+
+    def filter(self, **kwargs):
+        """Returns the query keeping the objects matching `kwargs`."""
+        conditions = tuple(
+            parse_condition(keyword, value)
+            for keyword, value in kwargs.items()
+        )
+        return self.__copy(conditions=self.conditions + conditions)
+
+    def order_by(self, *attrs):
+        """Returns the query sorting the objects by `attrs`."""
+        return self.__copy(order=self.order + attrs)
+
+    def limit(self, size):
+        """Returns the query keeping the first `size` objects."""
+        return self.__copy(size=size)
+
+    def all(self):
+        """Returns the list of the objects matching the query."""
+        return list(self)
+
+    def first(self):
+        """Returns the first object matching the query, or None."""
+        return next(iter(self.limit(1)), None)
+
+    def count(self):
+        """Returns the number of objects matching the query."""
+        if not self.conditions and self.size is None:
+            return self.storage.count(self.name)
+        return sum(1 for _ in self)
+
+    def explain(self):
+        """Returns the description of how the query runs, one step a line."""
+        access, _, rest, ordered = self.plan()
+        steps = [access]
+        steps += [f"filter {a} {op} {v!r}" for a, op, v in rest]
+        if self.order and not ordered:
+            steps.append(f"sort by {', '.join(self.order)}")
+        if self.size is not None:
+            steps.append(f"limit {self.size}")
+        return "\n".join(steps)
+
+    def plan(self):
+        """
+        Chooses how the objects are read.
+
+        Returns:
+        -   tuple: The description of the access, a function returning
+                the objects it reads, the conditions left to check on
+                them, and whether they are read in the order asked for.
+        """
+        for i, (attr, op, value) in enumerate(self.conditions):
+            rest = self.conditions[:i] + self.conditions[i + 1:]
+            if attr == "id" and op in ("eq", "in"):
+                ids = (value,) if op == "eq" else value
+                return (
+                    f"primary key lookup {self.name}.id ({len(ids)} ids)",
+                    lambda: (self.storage.get(self.name, id) for id in ids),
+                    rest,
+                    False,
+                )
+        for i, (attr, op, value) in enumerate(self.conditions):
+            rest = self.conditions[:i] + self.conditions[i + 1:]
+            if attr in self.indexed and op in ("eq", "in"):
+                values = (value,) if op == "eq" else value
+                return (
+                    f"index lookup {self.name}.{attr} "
+                    f"({len(values)} values)",
+                    lambda: itertools.chain.from_iterable(
+                        self.storage.related(self.name, attr, value)
+                        for value in values
+                    ),
+                    rest,
+                    False,
+                )
+        ranges = self.__ranges()
+        if ranges:
+            attr, bounds, count = min(
+                ranges, key=lambda r: (r[2], r[0] != self.__order_attr())
+            )
+            return self.__range_plan(attr, bounds, count)
+        attr = self.__order_attr()
+        if attr in self.ranged:
+            return self.__walk_plan(attr)
+        return (
+            f"scan {self.name}",
+            lambda: self.storage.iter_all(self.name).values(),
+            self.conditions,
+            False,
+        )
+
+    def __order_attr(self):
+        """Returns the attribute of a single sort order, or None."""
+        if len(self.order) == 1:
+            return self.order[0].lstrip("-")
+        return None
+
+    def __ranges(self):
+        """
+        Returns the (attribute, bounds, count) of each sorted index some
+        conditions apply to, where bounds are the (low, high, open_low,
+        open_high) arguments of between() meeting these conditions and
+        count is the number of objects within them.
+        """
+        ranges = []
+        for attr in self.ranged:
+            lows = []
+            highs = []
+            for cond_attr, op, value in self.conditions:
+                if cond_attr != attr or op not in RANGE_OPERATORS:
+                    continue
+                if not isinstance(value, (int, float)):
+                    break
+                if op in ("eq", "gt", "gte"):
+                    lows.append((value, op == "gt"))
+                if op in ("eq", "lt", "lte"):
+                    highs.append((value, op != "lt"))
+            else:
+                if not lows and not highs:
+                    continue
+                low, open_low = max(lows) if lows else (None, False)
+                high, closed_high = min(highs) if highs else (None, True)
+                bounds = (low, high, open_low, not closed_high)
+                count = self.storage.count_between(self.name, attr, *bounds)
+                ranges.append((attr, bounds, count))
+        return ranges
+
+    def __range_plan(self, attr, bounds, count):
+        """Returns the plan reading the objects through a sorted index."""
+        low, high, open_low, open_high = bounds
+        ordered = attr == self.__order_attr()
+        reverse = ordered and self.order[0].startswith("-")
+        rest = tuple(
+            condition
+            for condition in self.conditions
+            if condition[0] != attr or condition[1] not in RANGE_OPERATORS
+        )
+        interval = (
+            f"{'(' if open_low else '['}"
+            f"{'' if low is None else low}, {'' if high is None else high}"
+            f"{')' if open_high else ']'}"
+        )
+        access = f"range lookup {self.name}.{attr} {interval}"
+        if count is not None:
+            access += f" ({count} objects)"
+        if reverse:
+            access += " reversed"
+        return (
+            access,
+            lambda: self.storage.between(
+                self.name, attr, low, high, open_low, open_high, reverse
+            ),
+            rest,
+            ordered,
+        )
+
+    def __walk_plan(self, attr):
+        """
+        Returns the plan walking the whole sorted index of `attr` in the
+        order asked for, checking the conditions on each object, so that
+        nothing is sorted and a limit stops the walk early.
+
+        The objects whose value is not indexed (not a number) are found
+        by a scan, sorted apart and read after the numbers, or before
+        them in a descending order, as a sort would place them.
+        """
+        access, walk, rest, ordered = self.__range_plan(
+            attr, (None, None, False, False), None
+        )
+        unindexed = self.storage.count(self.name) - self.storage.count_between(
+            self.name, attr
+        )
+        if not unindexed:
+            return access, walk, rest, ordered
+        reverse = self.order[0].startswith("-")
+
+        def key(obj):
+            return sort_key(getattr(obj, attr, None))
+
+        def apart():
+            objects = [
+                obj
+                for obj in self.storage.iter_all(self.name).values()
+                if obj is not None and key(obj)[0]
+            ]
+            objects.sort(key=key, reverse=reverse)
+            yield from objects
+
+        def read():
+            if reverse:
+                return itertools.chain(apart(), walk())
+            return itertools.chain(walk(), apart())
+
+        access += f" + {unindexed} objects not indexed, sorted"
+        return access, read, rest, ordered
+
+    def __iter__(self):
+        """Yields the objects matching the query."""
+        _, read, rest, ordered = self.plan()
+        objects = (
+            obj for obj in read() if obj is not None and matches(obj, rest)
+        )
+        if self.order and not ordered:
+            objects = list(objects)
+            for attr in reversed(self.order):
+                descending = attr.startswith("-")
+                attr = attr.lstrip("-")
+                objects.sort(
+                    key=lambda obj: sort_key(getattr(obj, attr, None)),
+                    reverse=descending,
+                )
+        if self.size is not None:
+            objects = itertools.islice(objects, self.size)
+        return iter(objects)
+
+    def __copy(self, **changes):
+        """Returns a copy of the query with the given attributes."""
+        attributes = dict(
+            conditions=self.conditions, order=self.order, size=self.size
+        )
+        attributes.update(changes)
+        return type(self)(
+            self.storage, self.cls, self.indexed, self.ranged, **attributes
+        )
+
+
+def matches(obj, conditions):
+    """Returns whether `obj` meets every condition of `conditions`."""
+    for attr, op, value in conditions:
+        actual = getattr(obj, attr, None)
+        if actual is None and op not in ("eq", "ne"):
+            # like NULL in SQL, a missing value is in no range
+            return False
+        try:
+            if not OPERATORS[op](actual, value):
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+def sort_key(value):
+    """
+    Returns the sort key of `value`, so that values of different types
+    never get compared: numbers first, then the other values grouped by
+    type (as SQLite sorts numbers before text), and the missing values
+    last.
+    """
+    if value is None:
+        return (2, "", 0)
+    if isinstance(value, (int, float)):
+        return (0, "", value)
+    return (1, type(value).__name__, value)
+
+
+class SQLQuery(Query):
+    """
+    A query on the instances of a class, run as a SELECT statement.
+
+    Its storage is the session running the statement and its class is
+    the mapped class.
+    """
+
+    def statement(self, *columns):
+        """Returns the SELECT statement of the query."""
+        query = select(*columns or (self.cls,)).select_from(self.cls)
+        for attr, op, value in self.conditions:
+            column = getattr(self.cls, attr)
+            if op == "in":
+                query = query.where(column.in_(value))
+            else:
+                query = query.where(OPERATORS[op](column, value))
+        if not columns:
+            for attr in self.order:
+                column = getattr(self.cls, attr.lstrip("-"))
+                query = query.order_by(
+                    column.desc() if attr.startswith("-") else column
+                )
+            if self.size is not None:
+                query = query.limit(self.size)
+        return query
+
+    def count(self):
+        """Returns the number of rows matching the query."""
+        if self.size is not None:
+            return sum(1 for _ in self)
+        return self.storage.scalar(self.statement(func.count()))
+
+    def explain(self):
+        """Returns the SQL of the query and the plan of the database."""
+        query = self.statement()
+        compiled = query.compile(
+            bind=self.storage.get_bind(),
+            compile_kwargs={"literal_binds": True},
+        )
+        sql = str(compiled)
+        prefix = "EXPLAIN"
+        if compiled.dialect.name == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN"
+        rows = self.storage.execute(text(f"{prefix} {sql}")).all()
+        return "\n".join([sql] + [" ".join(map(str, row)) for row in rows])
+
+    def __iter__(self):
+        """Yields the objects matching the query."""
+        return iter(self.storage.scalars(self.statement()).all())
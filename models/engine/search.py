@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+"""
+Module defining the full-text index of the storage engines.
+
+A TextIndex keeps, for each term, the positions of the term in the text
+of each key (its postings), so a search only reads the postings of the
+terms it asks for. The text of a key is made of several fields, e.g.
+the name and the description of a place, cut into lowercase words by
+tokenize().
+
+A search is made of words and "quoted phrases". A key matches when its
+text holds every word and every phrase (its words next to each other,
+in the same field), and the keys are ranked by BM25: the rarer a word
+and the more often it appears in a short text, the higher the rank.
+"""
+import heapq
+import math
+import re
+
+# the BM25 parameters: how fast repeated words stop adding to the rank,
+# and how much the length of a text lowers it
+K1 = 1.2
+B = 0.75
+
+_WORD = re.compile(r"\w+")
+_PART = re.compile(r'"([^"]*)"?|([^\s"]+)')
+
+
+def tokenize(text):
+    """Returns the lowercase words of `text`."""
+    return _WORD.findall(text.casefold())
+
+
+def parse_search(text):
+    """
+    Returns the phrases of the search `text`, as tuples of words. A
+    word out of quotes is a phrase of its own, unless it holds
+    punctuation (e.g. "sea-side" is the phrase ("sea", "side")).
+    """
+    phrases = []
+    for quoted, word in _PART.findall(text):
+        words = tuple(tokenize(quoted or word))
+        if words:
+            phrases.append(words)
+    return phrases
+
+
+class TextIndex:
+    """
+    An inverted index of the text of keys.
+
+    Attributes:
+    -   postings (dict): Maps each word to the dictionary of the
+            positions of the word in the text of each key.
+    -   words (dict): The distinct words of the text of each key, to
+            remove it.
+    -   lengths (dict): The number of words of the text of each key.
+    -   total (int): The number of words of every text.
+    """
+
+    __slots__ = ("postings", "words", "lengths", "total")
+
+    def __init__(self):
+        self.postings = {}
+        self.words = {}
+        self.lengths = {}
+        self.total = 0
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def add(self, key, fields):
+        """
+        Indexes the text of `key`, the strings of `fields` (the other
+        values are left out), in place of its previous text.
+        """
+        self.remove(key)
+        positions = {}
+        position = 0
+        for field in fields:
+            if not isinstance(field, str):
+                continue
+            for word in tokenize(field):
+                positions.setdefault(word, []).append(position)
+                position += 1
+            # so that phrases do not span two fields
+            position += 1
+        if not positions:
+            return
+        for word, word_positions in positions.items():
+            self.postings.setdefault(word, {})[key] = word_positions
+        self.words[key] = tuple(positions)
+        length = sum(map(len, positions.values()))
+        self.lengths[key] = length
+        self.total += length
+
+    def remove(self, key):
+        """Removes the text of `key` from the index, if it is in it."""
+        length = self.lengths.pop(key, None)
+        if length is None:
+            return
+        self.total -= length
+        for word in self.words.pop(key):
+            entry = self.postings[word]
+            del entry[key]
+            if not entry:
+                del self.postings[word]
+
+    def search(self, text, limit=None):
+        """
+        Returns the keys whose text matches the search `text`, the best
+        ranked first, at most `limit` of them.
+        """
+        phrases = parse_search(text)
+        words = {word for phrase in phrases for word in phrase}
+        if not words or any(word not in self.postings for word in words):
+            return []
+        # from the rarest word, so the candidates are few from the start
+        rarest, *others = sorted(words, key=lambda w: len(self.postings[w]))
+        keys = list(self.postings[rarest])
+        for word in others:
+            entry = self.postings[word]
+            keys = [key for key in keys if key in entry]
+        for phrase in phrases:
+            if len(phrase) > 1:
+                keys = [key for key in keys if self.__holds(key, phrase)]
+        scores = {key: self.__score(key, words) for key in keys}
+
+        def order(key):
+            return -scores[key], key
+
+        if limit is not None:
+            return heapq.nsmallest(limit, keys, key=order)
+        return sorted(keys, key=order)
+
+    def __holds(self, key, phrase):
+        """Returns whether the text of `key` holds the words of `phrase`."""
+        starts = set(self.postings[phrase[0]][key])
+        for offset, word in enumerate(phrase[1:], 1):
+            starts.intersection_update(
+                position - offset for position in self.postings[word][key]
+            )
+            if not starts:
+                return False
+        return True
+
+    def __score(self, key, words):
+        """Returns the BM25 rank of the text of `key` for `words`."""
+        count = len(self.lengths)
+        norm = K1 * (1 - B + B * self.lengths[key] * count / self.total)
+        score = 0.0
+        for word in words:
+            entry = self.postings[word]
+            frequency = len(entry[key])
+            idf = math.log(1 + (count - len(entry) + 0.5) / (len(entry) + 0.5))
+            score += idf * frequency * (K1 + 1) / (frequency + norm)
+        return score
@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+"""Module reading and writing JSON snapshot files one record at a time"""
+import json
+import re
+from json.decoder import scanstring
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+KEY = re.compile(r'[ \t\n\r]*"((?:[^"\\]|\\.)*)"[ \t\n\r]*:[ \t\n\r]*')
+
+
+class _Scanner:
+    """
+    Reads a JSON text from a file in chunks and decodes it value by value.
+
+    Attributes:
+    -   buf (str): The part of the file read but not consumed yet.
+    -   pos (int): The position of the next character to consume in buf.
+    """
+
+    def __init__(self, f, chunk_size):
+        """
+        Args:
+        -   f (file): The file to read from.
+        -   chunk_size (int): Number of characters read at a time.
+        """
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        """Reads the next chunk, returns False at the end of the file."""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self):
+        """Moves to the next significant character, returns it or ''."""
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars):
+        """Consumes the next significant character if it is in `chars`."""
+        char = self.skip_whitespace()
+        if not char or char not in chars:
+            raise ValueError(
+                f"Expecting one of {chars!r} at position {self.pos}"
+            )
+        self.pos += 1
+        return char
+
+    def key(self):
+        """Decodes the next `"key":` of an object."""
+        while True:
+            match = KEY.match(self.buf, self.pos)
+            if match is not None and match.end() < len(self.buf):
+                break
+            if not self.fill():
+                raise ValueError(f"Expecting a key at position {self.pos}")
+        self.pos = match.end()
+        return scanstring(self.buf, match.start(1))[0]
+
+    def value(self):
+        """Decodes the next JSON value."""
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if not self.fill():
+                    raise
+                continue
+            # a number may go on in the next chunk
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json(f, chunk_size=CHUNK_SIZE):
+    """
+    Yields the (key, value) pairs of the JSON object stored in `f` one
+    at a time, so the whole text is never held in memory.
+
+    Args:
+    -   f (file): A file opened in text mode.
+    -   chunk_size (int, optional): Number of characters read at a time.
+
+    Raises:
+    -   ValueError: If the file is not a valid JSON object.
+    """
+    scanner = _Scanner(f, chunk_size)
+    if not scanner.skip_whitespace():
+        return
+    scanner.expect("{")
+    if scanner.skip_whitespace() == "}":
+        scanner.pos += 1
+    else:
+        while True:
+            key = scanner.key()
+            yield key, scanner.value()
+            if scanner.expect(",}") == "}":
+                break
+    if scanner.skip_whitespace():
+        raise ValueError(f"Extra data at position {scanner.pos}")
+
+
+def write_json(f, items):
+    """
+    Writes the (key, value) pairs of `items` to `f` as a JSON object,
+    one pair at a time.
+
+    Args:
+    -   f (file): A file opened in text mode.
+    -   items (iterable): The (key, value) pairs to write.
+    """
+    f.write("{")
+    separator = ""
+    for key, value in items:
+        f.write(f"{separator}{json.dumps(key)}: {json.dumps(value)}")
+        separator = ", "
+    f.write("}")
@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+"""Module handling SQLite storage"""
+import os
+from sqlalchemy import create_engine, event
+from models.engine.db_storage import DBStorage
+
+HBNB_SQLITE_PATH = os.getenv("HBNB_SQLITE_PATH", "hbnb.db")
+
+
+class SQLiteStorage(DBStorage):
+    """
+    Implements a storage engine keeping the models in a SQLite file.
+
+    It stores the same SQLAlchemy models as DBStorage, without a database
+    server. The file is opened in WAL mode, so readers do not block the
+    writer, and each commit only appends the changed pages to the log.
+
+    Attributes:
+        file_path (str): The path to the database file.
+    """
+
+    def __init__(self, file_path=None):
+        """
+        Creates the engine of the database file.
+
+        Args:
+            file_path (str, optional): The path to the database file.
+                Defaults to the `HBNB_SQLITE_PATH` environment variable.
+        """
+        self.file_path = file_path or HBNB_SQLITE_PATH
+        engine = create_engine(f"sqlite:///{self.file_path}")
+        event.listen(engine, "connect", _configure)
+        super().__init__(engine)
+
+
+def _configure(dbapi_connection, connection_record):
+    """Sets the pragmas of each new connection to the database file."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # in WAL mode, only a power loss can undo the last commits
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
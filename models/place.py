@@ -2,11 +2,13 @@
 """ Place Module for HBNB project """
 from models.base_model import BaseModel, Base
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, Integer, ForeignKey, Float, Table
-from models import storage_type
+from sqlalchemy import (
+    Column, String, Integer, ForeignKey, Float, Index, Table
+)
+from models import sql_storage
 
 
-if storage_type == 'db':
+if sql_storage:
     place_amenity = Table(
         'place_amenity',
         Base.metadata,
@@ -30,16 +32,38 @@ if storage_type == 'db':
 class Place(BaseModel, Base):
     """A place to stay"""
 
-    if storage_type == 'db':
+    if sql_storage:
         __tablename__ = 'places'
-        city_id = Column(String(60), ForeignKey('cities.id'), nullable=False)
-        user_id = Column(String(60), ForeignKey('users.id'), nullable=False)
+        # box searches read a range of latitudes, then the longitudes
+        __table_args__ = (
+            Index('ix_places_latitude_longitude', 'latitude', 'longitude'),
+        )
+        city_id = Column(
+            String(60),
+            ForeignKey('cities.id'),
+            nullable=False,
+            index=True,
+        )
+        user_id = Column(
+            String(60),
+            ForeignKey('users.id'),
+            nullable=False,
+            index=True,
+        )
         name = Column(String(128), nullable=False)
         description = Column(String(1024))
-        number_rooms = Column(Integer, default=0, nullable=False)
-        number_bathrooms = Column(Integer, default=0, nullable=False)
-        max_guest = Column(Integer, default=0, nullable=False)
-        price_by_night = Column(Integer, default=0, nullable=False)
+        number_rooms = Column(
+            Integer, default=0, nullable=False, index=True
+        )
+        number_bathrooms = Column(
+            Integer, default=0, nullable=False, index=True
+        )
+        max_guest = Column(
+            Integer, default=0, nullable=False, index=True
+        )
+        price_by_night = Column(
+            Integer, default=0, nullable=False, index=True
+        )
         latitude = Column(Float)
         longitude = Column(Float)
         cities = relationship('City', back_populates='places')
@@ -67,22 +91,16 @@ class Place(BaseModel, Base):
         def reviews(self):
             """getter attribute returns the list of Review instances"""
             from models.review import Review
-            from models.__init__ import storage
+            from models import storage
 
-            return [
-                review
-                for review in storage.all(Review).values()
-                if review.state_id == self.id
-            ]
+            return storage.related(Review, "place_id", self.id)
 
         @property
         def amenities(self):
             """getter attribute returns the list of Amenity instances"""
             from models.amenity import Amenity
-            from models.__init__ import storage
+            from models import storage
 
-            return [
-                amenity
-                for amenity in storage.all(Amenity).values()
-                if amenity.state_id == self.id
-            ]
+            return storage.query(Amenity).filter(
+                id__in=self.amenity_ids
+            ).all()
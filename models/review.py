@@ -3,17 +3,27 @@
 from models.base_model import BaseModel, Base
 from sqlalchemy.orm import relationship
 from sqlalchemy import Column, String, ForeignKey
-from models import storage_type
+from models import sql_storage
 
 
 class Review(BaseModel, Base):
     """Review class to store review information"""
 
-    if storage_type == 'db':
+    if sql_storage:
         __tablename__ = 'reviews'
         text = Column(String(1024), nullable=False)
-        place_id = Column(String(60), ForeignKey('places.id'), nullable=False)
-        user_id = Column(String(60), ForeignKey('users.id'), nullable=False)
+        place_id = Column(
+            String(60),
+            ForeignKey('places.id'),
+            nullable=False,
+            index=True,
+        )
+        user_id = Column(
+            String(60),
+            ForeignKey('users.id'),
+            nullable=False,
+            index=True,
+        )
         user = relationship('User', back_populates='reviews')
         place = relationship('Place', back_populates='reviews')
     else:
@@ -3,13 +3,13 @@
 from sqlalchemy import Column, String
 from sqlalchemy.orm import relationship
 from models.base_model import BaseModel, Base
-from models import storage_type
+from models import sql_storage
 
 
 class State(BaseModel, Base):
     """State class"""
 
-    if storage_type == 'db':
+    if sql_storage:
         __tablename__ = 'states'
         name = Column(String(128), nullable=False)
         cities = relationship(
@@ -21,11 +21,7 @@ class State(BaseModel, Base):
         @property
         def cities(self):
             """getter for list of city instances related to the state"""
-            from models.__init__ import storage
+            from models import storage
             from models.city import City
 
-            return [
-                city
-                for city in storage.all(City).values()
-                if city.state_id == self.id
-            ]
+            return storage.related(City, "state_id", self.id)
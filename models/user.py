@@ -3,13 +3,13 @@
 from sqlalchemy import Column, String
 from sqlalchemy.orm import relationship
 from models.base_model import BaseModel, Base
-from models import storage_type
+from models import sql_storage
 
 
 class User(BaseModel, Base):
     """User class"""
 
-    if storage_type == 'db':
+    if sql_storage:
         __tablename__ = 'users'
         email = Column(String(128), nullable=False)
         password = Column(String(128), nullable=False)
@@ -0,0 +1,26 @@
+#!/usr/bin/python3
+"""
+The tests of the project.
+
+The dbm and SQLite engines the tests run on keep their files in a
+temporary directory, removed once the tests end, unless HBNB_DBM_PATH or
+HBNB_SQLITE_PATH say otherwise.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="hbnb-tests-")
+os.environ.setdefault("HBNB_DBM_PATH", os.path.join(_tmp, "hbnb.dbm"))
+os.environ.setdefault("HBNB_SQLITE_PATH", os.path.join(_tmp, "hbnb.db"))
+
+
+@atexit.register
+def _remove_tmp():
+    """Closes the storage of the tests, then removes its files"""
+    models = sys.modules.get("models")
+    if models is not None:
+        models.storage.close()
+    shutil.rmtree(_tmp, ignore_errors=True)
@@ -3,7 +3,7 @@
 import os
 import unittest
 from io import StringIO
-from models import storage
+from models import sql_storage, storage
 from unittest.mock import patch
 from console import HBNBCommand, error_messages, classes
 
@@ -441,3 +441,54 @@ class TestUserDotNotation(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+@unittest.skipIf(sql_storage, 'Not testing object searches. Using db storage.')
+class TestSearch(unittest.TestCase):
+    """Testing the search command"""
+
+    @classmethod
+    def setUp(cls):
+        cls.console = HBNBCommand()
+        cls.place = classes["Place"](
+            name="Ocean loft", description="Quiet loft with an ocean view"
+        )
+        cls.place.save()
+
+    @classmethod
+    def tearDown(cls):
+        storage.delete(cls.place)
+        if os.path.exists("hbnb.json"):
+            os.remove("hbnb.json")
+
+    def test_search(self):
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.console.onecmd('search Place "ocean view" quiet')
+        output = mock_stdout.getvalue().strip()
+        self.assertEqual(output, str([str(self.place)]))
+
+    def test_search_dot_notation(self):
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.console.onecmd(
+                self.console.precmd('Place.search("ocean view")')
+            )
+        output = mock_stdout.getvalue().strip()
+        self.assertEqual(output, str([str(self.place)]))
+
+    def test_search_without_match(self):
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.console.onecmd("search Review ocean")
+        output = mock_stdout.getvalue().strip()
+        self.assertEqual(output, "[]")
+
+    def test_search_without_text(self):
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.console.onecmd("search Place")
+        output = mock_stdout.getvalue().strip()
+        self.assertEqual(output, error_messages["no_search"])
+
+    def test_search_with_invalid_clsname(self):
+        with patch('sys.stdout', new=StringIO()) as mock_stdout:
+            self.console.onecmd("search all ocean")
+        output = mock_stdout.getvalue().strip()
+        self.assertEqual(output, error_messages["no_cls"])
@@ -3,7 +3,7 @@
 import unittest
 from models.base_model import BaseModel
 from models.city import City
-from models import storage_type
+from models import sql_storage
 
 
 class TestCity(unittest.TestCase):
@@ -37,7 +37,7 @@ class TestCity(unittest.TestCase):
         """Test that City has attribute name, and it's an empty string"""
         city = City()
         self.assertTrue(hasattr(city, "name"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(city.name, None)
         else:
             self.assertEqual(city.name, "")
@@ -46,7 +46,7 @@ class TestCity(unittest.TestCase):
         """Test that City has attribute state_id, and it's an empty string"""
         city = City()
         self.assertTrue(hasattr(city, "state_id"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(city.state_id, None)
         else:
             self.assertEqual(city.state_id, "")
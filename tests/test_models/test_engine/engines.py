@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+"""Module sharing the setup of the tests run on every object engine"""
+import os
+import tempfile
+import unittest
+
+
+class ObjectEnginesTestCase(unittest.TestCase):
+    """Base class of the tests run on every object engine"""
+
+    def setUp(self):
+        """Set up a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        # after the storages are closed
+        self.addCleanup(self.tmp.cleanup)
+
+    def storages(self, objects):
+        """Returns every object engine, holding `objects`"""
+        from models.engine.dbm_storage import DBMStorage
+        from models.engine.file_storage import FileStorage
+        from models.engine.memory_storage import MemoryStorage
+
+        storages = [
+            MemoryStorage(),
+            FileStorage(os.path.join(self.tmp.name, 'hbnb.json')),
+            DBMStorage(os.path.join(self.tmp.name, 'hbnb')),
+        ]
+        for fs in storages:
+            for obj in objects:
+                fs.new(obj)
+            fs.save()
+            self.addCleanup(fs.close)
+        return storages
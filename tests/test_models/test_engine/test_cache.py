@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+"""Module for testing the cache of built objects"""
+import os
+import tempfile
+import unittest
+from models.engine.cache import read_cache, write_cache
+from models.state import State
+
+
+class test_cache(unittest.TestCase):
+    """Class to test the cache reader and writer"""
+
+    def setUp(self):
+        """Write a cache to a temporary file"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'file.json.cache')
+        self.state = State(name="California")
+        self.objects = {f"State.{self.state.id}": self.state}
+        write_cache(self.path, (1, 2, 3), self.objects)
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """The objects read back as they were written"""
+        objects = read_cache(self.path, (1, 2, 3))
+        self.assertEqual(list(objects), list(self.objects))
+        state = objects[f"State.{self.state.id}"]
+        self.assertIsInstance(state, State)
+        self.assertEqual(state.to_dict(), self.state.to_dict())
+
+    def test_fingerprint(self):
+        """A cache written for other files is not used"""
+        self.assertIsNone(read_cache(self.path, (1, 2, 4)))
+
+    def test_missing(self):
+        """There is nothing to read without a cache"""
+        self.assertIsNone(read_cache(self.path + '.missing', (1, 2, 3)))
+
+    def test_damaged(self):
+        """Truncated or altered caches are not used"""
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for damaged in (data[:-1], data[:5], data[:-1] + b'\0',
+                        b'HBNBPKL\x02' + data[8:]):
+            with open(self.path, 'wb') as f:
+                f.write(damaged)
+            self.assertIsNone(read_cache(self.path, (1, 2, 3)))
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+"""Module for testing the columnar snapshot layout"""
+import json
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from models.engine.columnar import iter_columnar, main, write_columnar
+
+
+class test_columnar(unittest.TestCase):
+    """Class to test the columnar reader, writer and converter"""
+
+    records = {
+        "State.1": {
+            "id": "1", "created_at": "2024-01-01T10:00:00.000001",
+            "updated_at": "2024-01-01T10:00:00", "name": "Califørnia",
+            "__class__": "State",
+        },
+        "Place.2": {
+            "id": "2", "created_at": "2024-01-01T10:00:00.000001",
+            "updated_at": "2024-01-02T10:00:00.500000",
+            "price_by_night": 120, "latitude": 1.5, "amenity_ids": ["a"],
+            "__class__": "Place",
+        },
+        "Place.3": {
+            "id": "3", "created_at": "2024-01-01 10:00:00",
+            "updated_at": "2024-01-01T10:00:00+01:00",
+            "price_by_night": 1 << 70, "latitude": 2, "name": None,
+            "__class__": "Place",
+        },
+        "State.4": {"id": "other", "__class__": "City", "flag": True},
+    }
+
+    def roundtrip(self, records, **kwargs):
+        """Writes and reads back `records`"""
+        f = BytesIO()
+        write_columnar(f, records.items(), **kwargs)
+        f.seek(0)
+        return dict(iter_columnar(f))
+
+    def test_roundtrip(self):
+        """Every record reads back as it was written"""
+        self.assertEqual(self.roundtrip(self.records), self.records)
+
+    def test_small_blocks(self):
+        """Records are split in blocks of the given size"""
+        records = {
+            f"User.{i}": {"id": str(i), "__class__": "User", "n": i}
+            for i in range(10)
+        }
+        self.assertEqual(self.roundtrip(records, block_size=3), records)
+
+    def test_smaller_than_json(self):
+        """Repeated attribute names and datetimes take less room"""
+        records = {
+            f"User.{i}": {
+                "id": str(i), "created_at": "2024-01-01T10:00:00.000001",
+                "updated_at": "2024-01-01T10:00:00.000001",
+                "__class__": "User", "email": f"user{i}@mail.com",
+            }
+            for i in range(100)
+        }
+        f = BytesIO()
+        write_columnar(f, records.items())
+        self.assertLess(len(f.getvalue()), len(json.dumps(records)) / 2)
+
+    def test_empty(self):
+        """Empty files and files without records yield nothing"""
+        self.assertEqual(list(iter_columnar(BytesIO(b""))), [])
+        self.assertEqual(self.roundtrip({}), {})
+
+    def test_invalid(self):
+        """Other and truncated files raise ValueError"""
+        f = BytesIO()
+        write_columnar(f, self.records.items())
+        for data in (b'{"State.1": {}}', f.getvalue()[:-3]):
+            with self.subTest(data=data[:10]):
+                with self.assertRaises(ValueError):
+                    list(iter_columnar(BytesIO(data)))
+
+    def test_converter(self):
+        """A JSON file converted back and forth is unchanged"""
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "hbnb.json")
+            columnar = os.path.join(tmp, "hbnb.col")
+            target = os.path.join(tmp, "back.json")
+            with open(source, 'w') as f:
+                json.dump(self.records, f)
+            self.assertEqual(main(["from-json", source, columnar]), 0)
+            self.assertEqual(main(["to-json", columnar, target]), 0)
+            with open(target) as f:
+                self.assertEqual(json.load(f), self.records)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+"""Module for testing dbm storage"""
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from models import sql_storage
+
+
+@unittest.skipIf(sql_storage, 'Not testing dbm storage. Using db storage.')
+class test_DBMStorage(unittest.TestCase):
+    """Class to test the dbm storage methods"""
+
+    def setUp(self):
+        """Set up a storage in a temporary directory"""
+        from models.state import State
+        from models.city import City
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.fs = self.storage()
+        self.state = State(name="California")
+        self.city = City(state_id=self.state.id, name="San Francisco")
+        self.fs.new(self.state)
+        self.fs.new(self.city)
+        self.fs.save()
+
+    def tearDown(self):
+        """Close the storage and remove the temporary directory"""
+        self.fs.close()
+        self.tmp.cleanup()
+
+    def storage(self, **kwargs):
+        """Returns a dbm storage using the temporary directory"""
+        from models.engine.dbm_storage import DBMStorage
+
+        return DBMStorage(os.path.join(self.tmp.name, 'hbnb'), **kwargs)
+
+    def test_persisted(self):
+        """Saved objects are read back by another storage"""
+        self.fs.close()
+        fs = self.storage()
+        state = fs.get("State", self.state.id)
+        self.assertEqual(state.to_dict(), self.state.to_dict())
+        self.assertIs(fs.get("State", self.state.id), state)
+        self.assertEqual(
+            fs.related("City", "state_id", self.state.id)[0].to_dict(),
+            self.city.to_dict(),
+        )
+        fs.close()
+
+    def test_all(self):
+        """all() returns the dictionary of one or every class"""
+        from models.state import State
+
+        state_key = f"State.{self.state.id}"
+        city_key = f"City.{self.city.id}"
+        objs = self.fs.all()
+        self.assertIs(type(objs), dict)
+        self.assertEqual(set(objs), {state_key, city_key})
+        self.assertEqual(
+            self.fs.all(State)[state_key].to_dict(), self.state.to_dict()
+        )
+        self.assertEqual(list(self.fs.all("City")), [city_key])
+
+    def test_iter_all(self):
+        """iter_all() maps the keys to the objects of one or every class"""
+        from models.state import State
+
+        state_key = f"State.{self.state.id}"
+        city_key = f"City.{self.city.id}"
+        self.assertEqual(set(self.fs.iter_all()), {state_key, city_key})
+        self.assertEqual(list(self.fs.iter_all(State)), [state_key])
+        self.assertEqual(len(self.fs.iter_all("City")), 1)
+        self.assertIn(city_key, self.fs.iter_all())
+        self.assertNotIn(city_key, self.fs.iter_all(State))
+        self.assertIsNone(self.fs.iter_all(State).get(city_key))
+        with self.assertRaises(KeyError):
+            self.fs.iter_all()["State.missing"]
+
+    def test_lru(self):
+        """Only the objects used last stay built"""
+        from models.engine.file_storage import classes
+        from models.state import State
+
+        self.fs.close()
+        fs = self.storage(cache_size=2)
+        states = [State(name=str(i)) for i in range(5)]
+        for state in states:
+            fs.new(state)
+        fs.save()
+        fs.reload()
+        with patch.dict(classes, State=MagicMock(wraps=State)) as built:
+            names = [obj.name for obj in fs.iter_all(State).values()]
+            self.assertEqual(built["State"].call_count, 6)
+            fs.get(State, states[0].id)
+            count = built["State"].call_count
+            fs.get(State, states[0].id)
+            self.assertEqual(built["State"].call_count, count)
+        self.assertEqual(
+            sorted(names), ["0", "1", "2", "3", "4", "California"]
+        )
+        self.assertLessEqual(len(fs._DBMStorage__cache), 2)
+        fs.close()
+
+    def test_unsaved(self):
+        """New and deleted objects are seen before they are saved"""
+        from models.city import City
+
+        other = City(state_id=self.state.id, name="Fremont")
+        self.fs.new(other)
+        self.assertIn(f"City.{other.id}", self.fs.all(City))
+        cities = self.fs.related(City, "state_id", self.state.id)
+        self.assertEqual(
+            {city.name for city in cities}, {"San Francisco", "Fremont"}
+        )
+        other.state_id = "elsewhere"
+        self.assertEqual(
+            len(self.fs.related(City, "state_id", self.state.id)), 1
+        )
+
+    def test_count(self):
+        """count() includes the objects not saved yet"""
+        from models.city import City
+
+        self.assertEqual(self.fs.count(), 2)
+        self.assertEqual(self.fs.count(City), 1)
+        other = City(state_id=self.state.id, name="Fremont")
+        self.fs.new(other)
+        self.fs.new(self.city)
+        self.assertEqual(self.fs.count("City"), 2)
+        self.fs.delete(self.city)
+        self.assertEqual(self.fs.count("City"), 1)
+        self.assertEqual(self.fs.count("Missing"), 0)
+
+    def test_delete(self):
+        """Deleted objects leave the files and the indexes"""
+        from models.city import City
+
+        self.fs.delete(self.city)
+        self.fs.close()
+        fs = self.storage()
+        self.assertIsNone(fs.get(City, self.city.id))
+        self.assertEqual(fs.related(City, "state_id", self.state.id), [])
+        self.assertEqual(len(fs.all()), 1)
+        fs.close()
+
+    def test_moved_foreign_key(self):
+        """Changing a foreign key moves the object in the index"""
+        from models.city import City
+
+        self.city.state_id = "other"
+        self.fs.new(self.city)
+        self.fs.save()
+        self.fs.reload()
+        self.assertEqual(self.fs.related(City, "state_id", self.state.id), [])
+        self.assertEqual(
+            [c.id for c in self.fs.related(City, "state_id", "other")],
+            [self.city.id],
+        )
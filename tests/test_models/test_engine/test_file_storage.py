@@ -1,25 +1,33 @@
 #!/usr/bin/python3
 """Module for testing file storage"""
+import gc
+import json
 import unittest
 from models.base_model import BaseModel
-from models import storage
+from models import sql_storage, storage
+from models.engine.file_storage import FileStorage
 import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
 
 
 @unittest.skipIf(
-    os.getenv('HBNB_TYPE_STORAGE') == 'db',
-    'Not testing file storage. Using db storage.',
+    not isinstance(storage, FileStorage),
+    'Not testing file storage. Using another storage.',
 )
 class test_fileStorage(unittest.TestCase):
     """Class to test the file storage method"""
 
     def setUp(self):
         """Set up test environment"""
-        del_list = []
-        for key in storage.all().keys():
-            del_list.append(key)
-        for key in del_list:
-            del storage.all()[key]
+        for obj in list(storage.all().values()):
+            storage.delete(obj)
+        if os.path.exists('hbnb.json'):
+            os.remove('hbnb.json')
 
     def tearDown(self):
         """Remove storage file at end of tests"""
@@ -101,9 +109,1348 @@ class test_fileStorage(unittest.TestCase):
             temp = key
         self.assertEqual(temp, key)
 
+    def test_all_by_class(self):
+        """all() filters by class or class name"""
+        from models.user import User
+
+        user = User()
+        base = BaseModel()
+        storage.new(user)
+        storage.new(base)
+        for cls in (User, "User"):
+            self.assertEqual(storage.all(cls), {f"User.{user.id}": user})
+        self.assertEqual(storage.all("State"), {})
+
+    def test_all_by_class_after_delete(self):
+        """Deleted objects leave the class partition"""
+        from models.user import User
+
+        user = User()
+        storage.new(user)
+        storage.delete(user)
+        self.assertEqual(storage.all(User), {})
+
+    def test_get(self):
+        """get() finds an instance by class and id"""
+        from models.user import User
+
+        user = User()
+        storage.new(user)
+        self.assertIs(storage.get(User, user.id), user)
+        self.assertIs(storage.get("User", user.id), user)
+        self.assertIsNone(storage.get(User, "missing"))
+
+    def test_count(self):
+        """count() counts the instances of a class or of every class"""
+        from models.user import User
+
+        for _ in range(3):
+            storage.new(User())
+        storage.new(BaseModel())
+        self.assertEqual(storage.count(User), 3)
+        self.assertEqual(storage.count("User"), 3)
+        self.assertEqual(storage.count("State"), 0)
+        self.assertEqual(storage.count(), 4)
+
+    def test_state_cities(self):
+        """State.cities is served by the foreign key index"""
+        from models.state import State
+        from models.city import City
+
+        state, other = State(), State()
+        city = City(state_id=state.id)
+        for obj in (state, other, city):
+            storage.new(obj)
+        self.assertEqual(state.cities, [city])
+        self.assertEqual(other.cities, [])
+
+    def test_related_follows_updates(self):
+        """Changing or deleting a child moves it in the index"""
+        from models.city import City
+
+        city = City(state_id="a")
+        storage.new(city)
+        city.state_id = "b"
+        storage.new(city)
+        self.assertEqual(storage.related(City, "state_id", "a"), [])
+        self.assertEqual(storage.related(City, "state_id", "b"), [city])
+        storage.delete(city)
+        self.assertEqual(storage.related(City, "state_id", "b"), [])
+
+    def test_place_reviews_and_amenities(self):
+        """Place.reviews and Place.amenities return the linked objects"""
+        from models.place import Place
+        from models.review import Review
+        from models.amenity import Amenity
+
+        place = Place()
+        review = Review(place_id=place.id)
+        wifi, tv = Amenity(), Amenity()
+        place.amenity_ids = [wifi.id, "missing"]
+        for obj in (place, review, wifi, tv):
+            storage.new(obj)
+        self.assertEqual(place.reviews, [review])
+        self.assertEqual(place.amenities, [wifi])
+
     def test_storage_var_created(self):
         """FileStorage object storage created"""
-        from models.engine.file_storage import FileStorage
-
         print(type(storage))
         self.assertEqual(type(storage), FileStorage)
+
+
+class TemporaryStorageTestCase(unittest.TestCase):
+    """
+    Base class of the tests of storages kept in a temporary directory
+
+    Attributes:
+    -   file_name (str): The name of the file of the storages.
+    -   options (dict): The keyword arguments of the storages.
+    """
+
+    file_name = 'hbnb.json'
+    options = {}
+
+    def setUp(self):
+        """Set up a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, self.file_name)
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.tmp.cleanup()
+
+    def new_storage(self, name=None, **kwargs):
+        """Returns a storage of the file `name` (`file_name` by default) of
+        the temporary directory, with the class options updated by `kwargs`"""
+        path = os.path.join(self.tmp.name, name or self.file_name)
+        return FileStorage(path, **dict(self.options, **kwargs))
+
+    def reloaded(self, name=None, **kwargs):
+        """Returns a new storage loaded from the files"""
+        fs = self.new_storage(name, **kwargs)
+        fs.reload()
+        return fs
+
+
+class test_fileStorageJournal(TemporaryStorageTestCase):
+    """Class to test the journal mode of the file storage"""
+
+    options = {'mode': 'journal'}
+
+    def setUp(self):
+        """Set up a journaled storage in a temporary directory"""
+        super().setUp()
+        self.journal = self.path + '.journal'
+        self.storage = self.new_storage()
+
+    def test_save_appends_changed_objects_only(self):
+        """Each save appends one line per changed object"""
+        first, second = BaseModel(), BaseModel()
+        self.storage.new(first)
+        self.storage.new(second)
+        self.storage.save()
+        first.name = "first"
+        self.storage.new(first)
+        self.storage.save()
+        with open(self.journal) as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn(first.id, lines[2])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_reload_replays_journal(self):
+        """Reload applies the journal in order"""
+        kept, gone = BaseModel(), BaseModel()
+        self.storage.new(kept)
+        self.storage.new(gone)
+        self.storage.save()
+        kept.name = "kept"
+        self.storage.new(kept)
+        self.storage.save()
+        self.storage.delete(gone)
+        objs = self.reloaded().all()
+        self.assertEqual(list(objs), [f"BaseModel.{kept.id}"])
+        self.assertEqual(objs[f"BaseModel.{kept.id}"].name, "kept")
+
+    def test_reload_ignores_truncated_line(self):
+        """A partially written last line is skipped"""
+        obj = BaseModel()
+        self.storage.new(obj)
+        self.storage.save()
+        with open(self.journal, 'a') as f:
+            f.write('{"key": "BaseModel.x", "obj": {"id"')
+        self.assertEqual(list(self.reloaded().all()), [f"BaseModel.{obj.id}"])
+
+    def test_snapshot_save_folds_journal(self):
+        """A full save writes the JSON file and removes the journal"""
+        obj = BaseModel()
+        self.storage.new(obj)
+        self.storage.save()
+        fs = self.reloaded(mode='snapshot')
+        fs.save()
+        self.assertFalse(os.path.exists(self.journal))
+        self.assertIn(f"BaseModel.{obj.id}", self.reloaded().all())
+
+    def test_compact_folds_journal(self):
+        """Compaction rewrites the JSON file and removes the journal"""
+        kept, gone = BaseModel(), BaseModel()
+        self.storage.new(kept)
+        self.storage.new(gone)
+        self.storage.save()
+        self.storage.delete(gone)
+        self.storage.compact(wait=True)
+        self.assertFalse(os.path.exists(self.journal))
+        with open(self.path) as f:
+            self.assertEqual(list(json.load(f)), [f"BaseModel.{kept.id}"])
+        self.assertEqual(list(self.reloaded().all()), [f"BaseModel.{kept.id}"])
+
+    def test_writes_during_compaction(self):
+        """Entries appended after the journal is sealed are kept"""
+        first, second = BaseModel(), BaseModel()
+        self.storage.new(first)
+        self.storage.save()
+        self.storage.compact()
+        self.storage.new(second)
+        self.storage.save()
+        self.storage.compact(wait=True)
+        self.assertEqual(
+            set(self.reloaded().all()),
+            {f"BaseModel.{first.id}", f"BaseModel.{second.id}"},
+        )
+
+    def test_compaction_is_triggered_by_size(self):
+        """A journal past the size limit gets compacted"""
+        from models.engine import file_storage
+
+        with patch.object(file_storage, 'HBNB_JOURNAL_MAX_BYTES', 1):
+            obj = BaseModel()
+            self.storage.new(obj)
+            self.storage.save()
+            self.storage.compact(wait=True)
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.journal))
+        self.assertIn(f"BaseModel.{obj.id}", self.reloaded().all())
+
+    def test_reloads_during_compaction(self):
+        """Threads reloading while the journal is folded lose no change"""
+        from models.engine import file_storage
+
+        kept = [BaseModel(name=str(i)) for i in range(100)]
+        for obj in kept:
+            self.storage.new(obj)
+        self.storage.save()
+        done = threading.Event()
+
+        def write():
+            for i in range(60):
+                obj = kept[i]
+                obj.name = f"changed {i}"
+                self.storage.new(obj)
+                self.storage.save()
+                temporary = BaseModel()
+                self.storage.new(temporary)
+                self.storage.save()
+                self.storage.delete(temporary)
+
+        def read():
+            while not done.is_set():
+                self.storage.all()
+                self.storage.reload()
+
+        with patch.object(file_storage, 'HBNB_JOURNAL_MAX_BYTES', 2000):
+            writers = [threading.Thread(target=write) for _ in range(3)]
+            readers = [threading.Thread(target=read) for _ in range(3)]
+            for thread in writers + readers:
+                thread.start()
+            for thread in writers:
+                thread.join()
+            done.set()
+            for thread in readers:
+                thread.join()
+            self.storage.compact(wait=True)
+        expected = {f"BaseModel.{obj.id}" for obj in kept}
+        self.assertEqual(set(self.storage.all()), expected)
+        self.assertEqual(set(self.reloaded().all()), expected)
+
+
+class test_fileStorageReload(TemporaryStorageTestCase):
+    """Class to test that reload only reads what changed"""
+
+    def pair(self, mode):
+        """Returns a writer and a reader loaded from the same files"""
+        writer = self.new_storage(mode=mode)
+        reader = self.new_storage(mode=mode)
+        return writer, reader
+
+    def test_reload_skipped_when_unchanged(self):
+        """Reloading unchanged files keeps the objects as they are"""
+        storage = self.new_storage()
+        obj = BaseModel()
+        storage.new(obj)
+        storage.save()
+        obj.name = "not saved"
+        storage.close()
+        self.assertIs(storage.all()[f"BaseModel.{obj.id}"], obj)
+        self.assertEqual(obj.name, "not saved")
+
+    def test_reload_keeps_unchanged_objects(self):
+        """Only the records that changed are turned into new objects"""
+        writer, reader = self.pair('snapshot')
+        same, changed, gone = BaseModel(), BaseModel(), BaseModel()
+        for obj in (same, changed, gone):
+            writer.new(obj)
+        writer.save()
+        reader.reload()
+        before = reader.all().copy()
+        changed.name = "changed"
+        writer.new(changed)
+        writer.delete(gone)
+        reader.reload()
+        after = reader.all()
+        self.assertIs(after[f"BaseModel.{same.id}"],
+                      before[f"BaseModel.{same.id}"])
+        self.assertEqual(after[f"BaseModel.{changed.id}"].name, "changed")
+        self.assertNotIn(f"BaseModel.{gone.id}", after)
+
+    def test_reload_reads_journal_tail(self):
+        """Entries appended by another storage are picked up"""
+        writer, reader = self.pair('journal')
+        first, second = BaseModel(), BaseModel()
+        writer.new(first)
+        writer.save()
+        reader.reload()
+        writer.new(second)
+        writer.save()
+        writer.delete(first)
+        with patch.object(reader, '_FileStorage__load') as full:
+            reader.reload()
+        full.assert_not_called()
+        self.assertEqual(list(reader.all()), [f"BaseModel.{second.id}"])
+
+
+class test_fileStorageLazy(TemporaryStorageTestCase):
+    """Class to test the lazy mode of the file storage"""
+
+    def setUp(self):
+        """Save a few objects and load them back lazily"""
+        from models.state import State
+        from models.city import City
+
+        super().setUp()
+        writer = self.new_storage()
+        self.state = State(name="California")
+        self.city = City(state_id=self.state.id, name="San Francisco")
+        self.other = City(state_id="elsewhere")
+        for obj in (self.state, self.city, self.other):
+            writer.new(obj)
+        writer.save()
+        self.storage = self.reloaded(lazy=True)
+
+    def built(self):
+        """Returns the keys of the objects built so far"""
+        return set(self.storage._FileStorage__objects)
+
+    def test_nothing_built_on_reload(self):
+        """Reload keeps the records without building objects"""
+        self.assertEqual(self.built(), set())
+
+    def test_get_builds_one_object(self):
+        """get() only builds the requested object"""
+        state = self.storage.get("State", self.state.id)
+        self.assertEqual(state.name, "California")
+        self.assertEqual(state.created_at, self.state.created_at)
+        self.assertEqual(self.built(), {f"State.{self.state.id}"})
+        self.assertIs(self.storage.get("State", self.state.id), state)
+
+    def test_count_builds_nothing(self):
+        """count() counts the records without building objects"""
+        self.assertEqual(self.storage.count("State"), 1)
+        self.assertEqual(self.storage.count(), 3)
+        self.assertEqual(self.built(), set())
+
+    def test_all_by_class_and_related(self):
+        """all(cls) and related() only build the objects they return"""
+        from models.city import City
+
+        self.storage.all("State")
+        self.assertEqual(self.built(), {f"State.{self.state.id}"})
+        cities = self.storage.related(City, "state_id", self.state.id)
+        self.assertEqual([city.id for city in cities], [self.city.id])
+        self.assertNotIn(f"City.{self.other.id}", self.built())
+
+    def test_all_builds_everything(self):
+        """all() without a class builds every object"""
+        self.assertEqual(len(self.storage.all()), 3)
+        self.assertEqual(len(self.built()), 3)
+
+    def test_save_keeps_unbuilt_records(self):
+        """Records that were never built are saved as they were read"""
+        state = self.storage.get("State", self.state.id)
+        state.name = "Nevada"
+        self.storage.new(state)
+        self.storage.save()
+        fs = self.reloaded()
+        self.assertEqual(len(fs.all()), 3)
+        self.assertEqual(fs.get("State", self.state.id).name, "Nevada")
+        self.assertEqual(fs.get("City", self.city.id).name, "San Francisco")
+
+
+class test_fileStorageSharded(TemporaryStorageTestCase):
+    """Class to test the one file per class layout of the file storage"""
+
+    options = {'sharded': True}
+
+    def setUp(self):
+        """Set up a sharded storage in a temporary directory"""
+        from models.state import State
+        from models.city import City
+
+        super().setUp()
+        self.storage = self.new_storage()
+        self.state = State(name="California")
+        self.city = City(state_id=self.state.id)
+        self.storage.new(self.state)
+        self.storage.new(self.city)
+        self.storage.save()
+
+    def shard(self, name):
+        """Returns the path of the file holding the class `name`"""
+        return os.path.join(self.tmp.name, f'hbnb.{name}.json')
+
+    def test_one_file_per_class(self):
+        """Each class is saved to its own file"""
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.shard('State')) as f:
+            self.assertEqual(list(json.load(f)), [f"State.{self.state.id}"])
+        with open(self.shard('City')) as f:
+            self.assertEqual(list(json.load(f)), [f"City.{self.city.id}"])
+
+    def test_save_writes_dirty_classes_only(self):
+        """Only the files of the changed classes are rewritten"""
+        os.remove(self.shard('City'))
+        self.state.name = "Nevada"
+        self.storage.new(self.state)
+        self.storage.save()
+        self.assertFalse(os.path.exists(self.shard('City')))
+        fs = self.new_storage()
+        fs.reload()
+        self.assertEqual(fs.get("State", self.state.id).name, "Nevada")
+
+    def test_reload_reads_changed_files_only(self):
+        """Files that did not change are not read again"""
+        reader = self.new_storage()
+        reader.reload()
+        city = reader.get("City", self.city.id)
+        self.state.name = "Nevada"
+        self.storage.new(self.state)
+        self.storage.save()
+        read = []
+        records = reader._FileStorage__snapshot_records
+
+        def spy(path):
+            read.append(path)
+            return records(path)
+
+        with patch.object(reader, '_FileStorage__snapshot_records', spy):
+            reader.reload()
+        self.assertEqual(read, [self.shard('State')])
+        self.assertEqual(reader.get("State", self.state.id).name, "Nevada")
+        self.assertIs(reader.get("City", self.city.id), city)
+
+    def test_compaction_writes_touched_files(self):
+        """The journal is folded into the files of its classes"""
+        from models.amenity import Amenity
+
+        storage = self.new_storage(mode='journal')
+        storage.reload()
+        os.remove(self.shard('City'))
+        amenity = Amenity(name="Wifi")
+        storage.new(amenity)
+        storage.save()
+        storage.compact(wait=True)
+        self.assertFalse(os.path.exists(self.shard('City')))
+        with open(self.shard('Amenity')) as f:
+            self.assertEqual(list(json.load(f)), [f"Amenity.{amenity.id}"])
+
+
+class test_fileStorageBatch(TemporaryStorageTestCase):
+    """Class to test the batch() context of the file storage"""
+
+    def setUp(self):
+        """Set up a storage holding one saved object"""
+        super().setUp()
+        self.storage = self.new_storage()
+        self.kept = BaseModel(name="kept")
+        self.storage.new(self.kept)
+        self.storage.save()
+
+    def spy(self):
+        """Returns a mock wrapping the storage's full write"""
+        write = self.storage._FileStorage__write_snapshot
+        return patch.object(
+            self.storage, '_FileStorage__write_snapshot', wraps=write
+        )
+
+    def test_saves_once(self):
+        """The saves made in the block are written once, at exit"""
+        objs = [BaseModel() for _ in range(3)]
+        with self.spy() as write:
+            with self.storage.batch():
+                for obj in objs:
+                    self.storage.new(obj)
+                    self.storage.save()
+                self.storage.delete(self.kept)
+                write.assert_not_called()
+        write.assert_called_once()
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), 3)
+
+    def test_nested_blocks(self):
+        """Inner blocks are written with the outermost one"""
+        with self.spy() as write:
+            with self.storage.batch():
+                with self.storage.batch():
+                    self.storage.new(BaseModel())
+                    self.storage.save()
+                write.assert_not_called()
+        write.assert_called_once()
+
+    def test_no_save_no_write(self):
+        """A block that never saves writes nothing"""
+        with self.spy() as write:
+            with self.storage.batch():
+                self.storage.new(BaseModel())
+        write.assert_not_called()
+
+    def test_rollback(self):
+        """An exception restores the objects and skips the save"""
+        created = BaseModel()
+        with self.spy() as write:
+            with self.assertRaises(RuntimeError):
+                with self.storage.batch():
+                    self.storage.new(created)
+                    self.kept.name = "changed"
+                    self.storage.new(self.kept)
+                    self.storage.save()
+                    self.storage.delete(self.kept)
+                    raise RuntimeError
+        write.assert_not_called()
+        self.assertEqual(list(self.storage.all()),
+                         [f"BaseModel.{self.kept.id}"])
+        self.assertIs(self.storage.get(BaseModel, self.kept.id), self.kept)
+        self.assertEqual(self.kept.name, "kept")
+
+    def test_other_threads(self):
+        """The saves of other threads are neither deferred nor rolled back"""
+        other = BaseModel(name="other")
+        entered = threading.Event()
+
+        def save_other():
+            entered.wait()
+            self.storage.new(other)
+            self.storage.save()
+
+        thread = threading.Thread(target=save_other)
+        thread.start()
+        with self.assertRaises(RuntimeError):
+            with self.storage.batch():
+                self.storage.new(BaseModel(name="rolled back"))
+                entered.set()
+                # the other thread waits for the end of the block
+                time.sleep(0.2)
+                raise RuntimeError
+        thread.join()
+        self.assertIs(self.storage.get(BaseModel, other.id), other)
+        reloaded = self.reloaded()
+        self.assertEqual(
+            sorted(obj.name for obj in reloaded.all().values()),
+            ["kept", "other"],
+        )
+
+
+class test_fileStorageWriteBehind(TemporaryStorageTestCase):
+    """Class to test the write-behind mode of the file storage"""
+
+    def setUp(self):
+        """Set up a write-behind storage whose flusher never wakes up"""
+        super().setUp()
+        self.storage = self.new_storage(write_behind=3600)
+
+    def tearDown(self):
+        """Flush the storage and remove the temporary directory"""
+        self.storage.flush()
+        super().tearDown()
+
+    def saved(self):
+        """Returns the records found in the Json file"""
+        with open(self.path) as f:
+            return json.load(f)
+
+    def test_save_is_deferred(self):
+        """save() returns before anything is written"""
+        self.storage.new(BaseModel())
+        self.storage.save()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_flush_coalesces(self):
+        """The saves made before a flush are written once"""
+        obj = BaseModel()
+        self.storage.new(obj)
+        write = self.storage._FileStorage__write_snapshot
+        with patch.object(
+            self.storage, '_FileStorage__write_snapshot', wraps=write
+        ) as spy:
+            for i in range(5):
+                obj.name = f"name {i}"
+                self.storage.save()
+            self.storage.flush()
+            self.storage.flush()
+        spy.assert_called_once()
+        key = f"BaseModel.{obj.id}"
+        self.assertEqual(self.saved()[key]["name"], "name 4")
+
+    def test_threshold_wakes_flusher(self):
+        """The flusher writes as soon as enough objects are dirty"""
+        with patch(
+            'models.engine.file_storage.HBNB_WRITE_BEHIND_MAX_DIRTY', 2
+        ):
+            self.storage.new(BaseModel())
+            self.storage.new(BaseModel())
+            self.storage.save()
+        for _ in range(100):
+            if os.path.exists(self.path):
+                break
+            time.sleep(0.05)
+        self.assertEqual(len(self.saved()), 2)
+
+    def test_flusher_survives_errors(self):
+        """A failed flush is logged and retried on the next round"""
+        obj = BaseModel(name=object())
+        with patch(
+            'models.engine.file_storage.HBNB_WRITE_BEHIND_MAX_DIRTY', 1
+        ), self.assertLogs('models.engine.file_storage', 'ERROR') as logs:
+            self.storage.new(obj)
+            self.storage.save()
+            for _ in range(100):
+                if logs.records:
+                    break
+                time.sleep(0.05)
+        self.assertIn("TypeError", logs.output[0])
+        obj.name = "fixed"
+        with patch(
+            'models.engine.file_storage.HBNB_WRITE_BEHIND_MAX_DIRTY', 1
+        ):
+            self.storage.save()
+        for _ in range(100):
+            if os.path.exists(self.path):
+                break
+            time.sleep(0.05)
+        self.assertEqual(
+            self.saved()[f"BaseModel.{obj.id}"]["name"], "fixed"
+        )
+
+    def test_flush_in_batch(self):
+        """Nothing is flushed while a batch() block runs"""
+        self.storage.new(BaseModel())
+        self.storage.save()
+        with self.storage.batch():
+            self.storage.flush()
+            self.assertFalse(os.path.exists(self.path))
+
+    def test_reload_flushes(self):
+        """A reload writes the pending saves before reading the file"""
+        obj = BaseModel()
+        other = self.new_storage()
+        other.new(BaseModel())
+        other.save()
+        self.storage.new(obj)
+        self.storage.save()
+        self.storage.reload()
+        self.assertIn(f"BaseModel.{obj.id}", self.saved())
+
+    def test_flush_at_exit(self):
+        """The storages are flushed by one hook when the interpreter exits"""
+        with patch('atexit.register') as register:
+            other = self.new_storage('other.json', write_behind=3600)
+        register.assert_not_called()
+        for fs in (self.storage, other):
+            fs.new(BaseModel())
+            fs.save()
+        FileStorage._FileStorage__flush_all()
+        self.assertEqual(len(self.saved()), 1)
+        self.assertEqual(len(self.reloaded('other.json').all()), 1)
+
+    def test_one_flusher(self):
+        """The storages share one flusher, which stops once they are gone"""
+        def flushers():
+            return [
+                thread for thread in threading.enumerate()
+                if thread.name == "FileStorage flusher"
+            ]
+
+        storages = [self.new_storage(write_behind=3600) for _ in range(3)]
+        self.assertEqual(len(flushers()), 1)
+        flusher = flushers()[0]
+        del storages
+        self.storage = self.new_storage()
+        gc.collect()
+        flusher.join(5)
+        self.assertFalse(flusher.is_alive())
+
+
+class test_fileStorageSync(TemporaryStorageTestCase):
+    """Class to test the crash safety and durability of the saves"""
+
+    def test_crash_keeps_old_file(self):
+        """A write failing halfway leaves the previous file as it was"""
+        fs = self.new_storage()
+        fs.new(BaseModel())
+        fs.save()
+        with open(self.path) as f:
+            before = f.read()
+
+        def crash(f, items):
+            f.write('{"BaseModel.')
+            raise OSError("disk full")
+
+        fs.new(BaseModel())
+        file_format = fs._FileStorage__format._replace(write=crash)
+        with patch.object(fs, '_FileStorage__format', file_format):
+            with self.assertRaises(OSError):
+                fs.save()
+        with open(self.path) as f:
+            self.assertEqual(f.read(), before)
+
+    def test_save_without_changes(self):
+        """A save with nothing changed since the last one writes nothing"""
+        fs = self.new_storage()
+        obj = BaseModel()
+        fs.new(obj)
+        fs.save()
+        replace = fs._FileStorage__replace
+        with patch.object(
+            fs, '_FileStorage__replace', wraps=replace
+        ) as spy:
+            fs.save()
+            spy.assert_not_called()
+            fs.delete(obj)
+            fs.save()
+            spy.assert_called_once()
+        os.remove(self.path)
+        fs.save()
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_no_fsync_by_default(self):
+        """Nothing is flushed to disk unless asked"""
+        fs = self.new_storage(sync="none")
+        fs.new(BaseModel())
+        with patch('os.fsync') as fsync:
+            fs.save()
+        fsync.assert_not_called()
+
+    def test_fsync(self):
+        """The file and its directory are flushed on every save"""
+        for mode in ("snapshot", "journal"):
+            with self.subTest(mode=mode):
+                fs = self.new_storage(mode=mode, sync="fsync")
+                fs.new(BaseModel())
+                with patch('os.fsync') as fsync:
+                    fs.save()
+                self.assertEqual(fsync.call_count, 2)
+
+    def test_group_commit(self):
+        """Saves made during a write share the next one"""
+        fsync = os.fsync
+
+        def slow_fsync(fd):
+            time.sleep(0.1)
+            fsync(fd)
+
+        for mode in ("snapshot", "journal"):
+            with self.subTest(mode=mode):
+                name = f'{mode}.json'
+                fs = self.new_storage(name, mode=mode, sync="group")
+
+                def save(obj):
+                    fs.new(obj)
+                    fs.save()
+
+                objs = [BaseModel() for _ in range(8)]
+                write = fs._FileStorage__write
+                with patch('os.fsync', slow_fsync), patch.object(
+                    fs, '_FileStorage__write', wraps=write
+                ) as spy:
+                    threads = [
+                        threading.Thread(target=save, args=(obj,))
+                        for obj in objs
+                    ]
+                    for thread in threads:
+                        thread.start()
+                    for thread in threads:
+                        thread.join()
+                self.assertLess(spy.call_count, len(objs))
+                reader = self.reloaded(name, mode=mode)
+                self.assertEqual(len(reader.all()), len(objs))
+
+    def test_group_commit_deletes(self):
+        """Deletes, which write with the objects locked, do not deadlock"""
+        fs = self.new_storage(sync="group")
+
+        def churn():
+            for _ in range(20):
+                obj = BaseModel()
+                fs.new(obj)
+                fs.save()
+                fs.delete(obj)
+
+        threads = [threading.Thread(target=churn) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(fs.all(), {})
+
+
+class test_fileStorageThreads(TemporaryStorageTestCase):
+    """Class to test the file storage used by several threads"""
+
+    def setUp(self):
+        """Set up a storage in a temporary directory"""
+        super().setUp()
+        self.storage = self.new_storage()
+
+    def test_all_is_a_snapshot(self):
+        """all() is not changed by later calls to new() and delete()"""
+        obj = BaseModel()
+        self.storage.new(obj)
+        objects = self.storage.all()
+        self.storage.new(BaseModel())
+        self.storage.delete(obj)
+        self.assertEqual(list(objects), [f"BaseModel.{obj.id}"])
+
+    def test_concurrent_readers_and_writers(self):
+        """Iterating all() while other threads write never fails"""
+        errors = []
+        done = threading.Event()
+
+        def write():
+            try:
+                for _ in range(50):
+                    obj = BaseModel()
+                    self.storage.new(obj)
+                    self.storage.delete(obj)
+            finally:
+                done.set()
+
+        def read():
+            try:
+                while not done.is_set():
+                    for key in self.storage.all():
+                        self.storage.get(BaseModel, key.split('.')[1])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=read) for _ in range(3)]
+        threads.append(threading.Thread(target=write))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.storage.all(), {})
+
+    def test_reload_keeps_unsaved_changes(self):
+        """A reload between a change and its save does not undo it"""
+        for mode in ("snapshot", "journal"):
+            with self.subTest(mode=mode):
+                name = f'{mode}.json'
+                fs = self.new_storage(name, mode=mode)
+                gone = BaseModel()
+                fs.new(gone)
+                fs.save()
+                added = BaseModel()
+                fs.new(added)
+                # the delete is not written yet
+                with patch.object(fs, 'save'):
+                    fs.delete(gone)
+                other = self.reloaded(name, mode=mode)
+                committed = BaseModel()
+                other.new(committed)
+                other.save()
+                fs.reload()
+                expected = {
+                    f"BaseModel.{added.id}", f"BaseModel.{committed.id}"
+                }
+                self.assertEqual(set(fs.all()), expected)
+                fs.save()
+                reader = self.reloaded(name, mode=mode)
+                self.assertEqual(set(reader.all()), expected)
+
+
+class test_fileStorageProcesses(TemporaryStorageTestCase):
+    """Class to test the file storage shared by several processes"""
+
+    options = {'locking': True}
+
+    def test_writers_merge(self):
+        """A save keeps the objects saved meanwhile by someone else"""
+        for mode in ("snapshot", "journal"):
+            with self.subTest(mode=mode):
+                first = self.reloaded(mode=mode)
+                second = self.reloaded(mode=mode)
+                a, b = BaseModel(), BaseModel()
+                first.new(a)
+                first.save()
+                second.new(b)
+                second.save()
+                reader = self.reloaded()
+                self.assertIn(f"BaseModel.{a.id}", reader.all())
+                self.assertIn(f"BaseModel.{b.id}", reader.all())
+                for fs in (first, second):
+                    for obj in list(fs.all().values()):
+                        fs.delete(obj)
+
+    def test_reload_on_commit_only(self):
+        """The files are read only after another process committed"""
+        writer = self.reloaded()
+        reader = self.reloaded()
+        writer.new(BaseModel())
+        writer.save()
+        load = reader._FileStorage__reload
+        with patch.object(
+            reader, '_FileStorage__reload', wraps=load
+        ) as spy:
+            reader.reload()
+            reader.reload()
+            self.assertEqual(spy.call_count, 1)
+            writer.reload()
+            reader.reload()
+            self.assertEqual(spy.call_count, 1)
+        self.assertEqual(len(reader.all()), 1)
+
+    def hold_fold(self, fs):
+        """
+        Returns an event the compaction of `fs` waits for once it wrote
+        its files aside, and an event set when it starts waiting.
+        """
+        write = fs._FileStorage__write_aside
+        folding, release = threading.Event(), threading.Event()
+
+        def write_aside(*args):
+            write(*args)
+            folding.set()
+            release.wait(10)
+
+        patcher = patch.object(fs, '_FileStorage__write_aside', write_aside)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return folding, release
+
+    def test_saves_during_fold(self):
+        """Saves and reloads do not wait for the files to be rewritten"""
+        fs = self.reloaded(mode="journal")
+        first, second = BaseModel(), BaseModel()
+        fs.new(first)
+        fs.save()
+        folding, release = self.hold_fold(fs)
+        fs.compact()
+        self.assertTrue(folding.wait(10))
+
+        def save():
+            fs.new(second)
+            fs.save()
+            self.reloaded().reload()
+
+        thread = threading.Thread(target=save)
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        release.set()
+        fs.compact(wait=True)
+        self.assertEqual(
+            set(self.reloaded().all()),
+            {f"BaseModel.{first.id}", f"BaseModel.{second.id}"},
+        )
+
+    def test_fold_starts_over(self):
+        """A fold drops its files if the old ones were rewritten meanwhile"""
+        fs = self.reloaded(mode="journal")
+        first, second = BaseModel(), BaseModel()
+        fs.new(first)
+        fs.save()
+        folding, release = self.hold_fold(fs)
+        fs.compact()
+        self.assertTrue(folding.wait(10))
+        other = self.reloaded()
+        other.new(second)
+        other.save()
+        release.set()
+        fs.compact(wait=True)
+        self.assertEqual(
+            set(self.reloaded().all()),
+            {f"BaseModel.{first.id}", f"BaseModel.{second.id}"},
+        )
+        self.assertFalse(
+            [name for name in os.listdir(self.tmp.name)
+             if name.endswith('.tmp')]
+        )
+
+    def test_concurrent_processes(self):
+        """Processes saving at the same time lose no object"""
+        script = (
+            "from models.engine.file_storage import FileStorage\n"
+            "from models.base_model import BaseModel\n"
+            "import sys\n"
+            "fs = FileStorage(sys.argv[1], locking=True)\n"
+            "fs.reload()\n"
+            "for _ in range(20):\n"
+            "    fs.new(BaseModel())\n"
+            "    fs.save()\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))
+        )))
+        processes = [
+            subprocess.Popen(
+                [sys.executable, "-c", script, self.path], cwd=root
+            )
+            for _ in range(3)
+        ]
+        for process in processes:
+            self.assertEqual(process.wait(), 0)
+        self.assertEqual(len(self.reloaded().all()), 60)
+
+
+class test_fileStorageColumnar(TemporaryStorageTestCase):
+    """Class to test the file storage with columnar snapshots"""
+
+    file_name = 'hbnb.col'
+    options = {'file_format': 'columnar'}
+
+    def test_save_reload(self):
+        """Objects are saved and reloaded in the columnar layout"""
+        from models.state import State
+        from models.place import Place
+
+        for mode in ("snapshot", "journal"):
+            with self.subTest(mode=mode):
+                fs = self.reloaded(mode=mode)
+                state = State(name="California")
+                place = Place(name="Home", price_by_night=100)
+                fs.new(state)
+                fs.new(place)
+                fs.save()
+                fs.compact(wait=True)
+                with open(self.path, 'rb') as f:
+                    self.assertEqual(f.read(8), b"HBNBCOL1")
+                reloaded = self.reloaded().all()
+                self.assertEqual(
+                    reloaded[f"State.{state.id}"].to_dict(), state.to_dict()
+                )
+                self.assertEqual(
+                    reloaded[f"Place.{place.id}"].to_dict(), place.to_dict()
+                )
+
+    def test_default_path(self):
+        """The columnar format has its own default file"""
+        fs = FileStorage(file_format="columnar")
+        self.assertEqual(fs._FileStorage__file_path, "hbnb.col")
+
+
+class test_fileStorageMapped(TemporaryStorageTestCase):
+    """Class to test the file storage with memory-mapped snapshots"""
+
+    file_name = 'hbnb.map'
+    options = {'file_format': 'mapped'}
+
+    def setUp(self):
+        """Set up a saved mapped snapshot in a temporary directory"""
+        from models.state import State
+        from models.city import City
+
+        super().setUp()
+        fs = self.reloaded(lazy=False)
+        self.state = State(name="California")
+        self.city = City(state_id=self.state.id, name="San Francisco")
+        fs.new(self.state)
+        fs.new(self.city)
+        fs.save()
+
+    def test_reload_decodes_nothing(self):
+        """A lazy reload reads the index only"""
+        from models.engine.mapped import MappedSnapshot
+
+        with patch.object(
+            MappedSnapshot, '__getitem__', autospec=True,
+            side_effect=MappedSnapshot.__getitem__,
+        ) as getitem:
+            fs = self.reloaded(lazy=True)
+            getitem.assert_not_called()
+            city = fs.get("City", self.city.id)
+            self.assertEqual(getitem.call_count, 1)
+        self.assertEqual(city.name, "San Francisco")
+        self.assertEqual(fs.related("City", "state_id", self.state.id), [city])
+
+    def test_save_keeps_records(self):
+        """Records never decoded are saved as they were"""
+        from models.state import State
+
+        fs = self.reloaded(lazy=True)
+        other = State(name="Nevada")
+        fs.new(other)
+        fs.save()
+        reloaded = self.reloaded(lazy=False)
+        self.assertEqual(len(reloaded.all()), 3)
+        self.assertEqual(
+            reloaded.get("City", self.city.id).to_dict(), self.city.to_dict()
+        )
+
+    def test_not_lazy(self):
+        """Without lazy mode every object is built on reload"""
+        fs = self.reloaded(lazy=False)
+        self.assertEqual(
+            fs.get("State", self.state.id).to_dict(), self.state.to_dict()
+        )
+
+
+class test_fileStorageCache(TemporaryStorageTestCase):
+    """Class to test the file storage cache of built objects"""
+
+    file_name = 'file.json'
+    options = {'cache': True}
+
+    def setUp(self):
+        """Set up a saved snapshot in a temporary directory"""
+        from models.state import State
+
+        super().setUp()
+        fs = self.reloaded()
+        self.state = State(name="California")
+        fs.new(self.state)
+        fs.save()
+
+    def test_written_on_load(self):
+        """A load from the JSON file writes the cache"""
+        self.assertFalse(os.path.exists(self.path + '.cache'))
+        self.reloaded()
+        self.assertTrue(os.path.exists(self.path + '.cache'))
+
+    def test_hit_skips_json(self):
+        """A matching cache is used instead of the JSON file"""
+        self.reloaded()
+        with patch.object(
+            FileStorage, '_FileStorage__snapshot_records'
+        ) as records:
+            fs = self.reloaded()
+            records.assert_not_called()
+        state = fs.get("State", self.state.id)
+        self.assertEqual(state.to_dict(), self.state.to_dict())
+        self.assertEqual(fs.all("State"), {f"State.{state.id}": state})
+
+    def test_stale_cache(self):
+        """A cache older than the JSON file is rebuilt"""
+        from models.state import State
+
+        fs = self.reloaded()
+        other = State(name="Nevada")
+        fs.new(other)
+        fs.save()
+        reloaded = self.reloaded()
+        self.assertIsNotNone(reloaded.get("State", other.id))
+        self.assertEqual(len(reloaded.all()), 2)
+
+    def test_damaged_cache(self):
+        """A damaged cache is ignored"""
+        self.reloaded()
+        with open(self.path + '.cache', 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b'\0')
+        fs = self.reloaded()
+        self.assertEqual(len(fs.all()), 1)
+
+    def test_not_lazy(self):
+        """The cache is not used in lazy mode"""
+        self.reloaded(lazy=True)
+        self.assertFalse(os.path.exists(self.path + '.cache'))
+
+
+class test_fileStorageCompressed(TemporaryStorageTestCase):
+    """Class to test the file storage with compressed snapshots"""
+
+    magics = {'.gz': b'\x1f\x8b', '.bz2': b'BZh', '.xz': b'\xfd7zXZ'}
+
+    def test_round_trip(self):
+        """Objects read back from every codec and format"""
+        from models.state import State
+
+        for ext, magic in self.magics.items():
+            for file_format in ('json', 'columnar'):
+                with self.subTest(ext=ext, file_format=file_format):
+                    name = f"file.{file_format}{ext}"
+                    fs = self.reloaded(name, file_format=file_format)
+                    state = State(name="Califørnia")
+                    fs.new(state)
+                    fs.save()
+                    path = os.path.join(self.tmp.name, name)
+                    with open(path, 'rb') as f:
+                        self.assertEqual(f.read(len(magic)), magic)
+                    reloaded = self.reloaded(name, file_format=file_format)
+                    self.assertEqual(
+                        reloaded.get("State", state.id).to_dict(),
+                        state.to_dict(),
+                    )
+
+    def test_journal(self):
+        """Compaction writes the compressed file"""
+        from models.state import State
+
+        fs = self.reloaded('file.json.gz', mode="journal")
+        state = State(name="California")
+        fs.new(state)
+        fs.save()
+        fs.compact()
+        reloaded = self.reloaded('file.json.gz')
+        self.assertIsNotNone(reloaded.get("State", state.id))
+        self.assertFalse(
+            os.path.exists(os.path.join(self.tmp.name, 'file.json.gz.journal'))
+        )
+
+    def test_sharded(self):
+        """The class name goes before the format extension"""
+        from models.state import State
+
+        fs = self.reloaded('file.json.gz', sharded=True)
+        fs.new(State(name="California"))
+        fs.save()
+        self.assertTrue(
+            os.path.exists(os.path.join(self.tmp.name, 'file.State.json.gz'))
+        )
+
+    def test_empty(self):
+        """An empty compressed file holds no object"""
+        open(os.path.join(self.tmp.name, 'file.json.xz'), 'w').close()
+        self.assertEqual(self.reloaded('file.json.xz').all(), {})
+
+    def test_mapped(self):
+        """Mapped snapshots cannot be compressed"""
+        with self.assertRaises(ValueError):
+            FileStorage('file.map.gz', file_format="mapped")
+
+
+@unittest.skipIf(sql_storage, 'Not testing sorted indexes. Using db storage.')
+class test_fileStorageSorted(TemporaryStorageTestCase):
+    """Class to test the sorted indexes of the file storage"""
+
+    def setUp(self):
+        """Save a few places"""
+        from models.place import Place
+
+        super().setUp()
+        self.storage = self.reloaded()
+        self.places = [
+            Place(name=f"Place {i}", price_by_night=price)
+            for i, price in enumerate((120, 80, 200, 80, 50))
+        ]
+        for place in self.places:
+            self.storage.new(place)
+        self.storage.save()
+
+    def prices(self, **kwargs):
+        """Returns the prices between() yields"""
+        return [
+            place.price_by_night
+            for place in self.storage.between(
+                "Place", "price_by_night", **kwargs
+            )
+        ]
+
+    def test_between(self):
+        """Objects are yielded in order within the bounds"""
+        self.assertEqual(self.prices(), [50, 80, 80, 120, 200])
+        self.assertEqual(self.prices(low=80, high=120), [80, 80, 120])
+        self.assertEqual(
+            self.prices(low=80, high=120, open_low=True, open_high=True), []
+        )
+        self.assertEqual(self.prices(high=100, reverse=True), [80, 80, 50])
+        self.assertEqual(self.prices(low=300), [])
+        self.assertEqual(
+            self.storage.count_between("Place", "price_by_night", 60, 150), 3
+        )
+        self.assertEqual(self.storage.count_between("Place", "name"), 0)
+
+    def test_index_follows_changes(self):
+        """new() and delete() keep the index sorted"""
+        from models.place import Place
+
+        self.prices()
+        place = self.places[2]
+        place.price_by_night = 10
+        self.storage.new(place)
+        self.storage.delete(self.places[0])
+        self.storage.new(Place(price_by_night=90))
+        self.assertEqual(self.prices(), [10, 50, 80, 80, 90])
+
+    def test_lazy(self):
+        """The index is built from the records, without building objects"""
+        fs = self.reloaded(lazy=True)
+        self.assertEqual(fs.count_between("Place", "price_by_night", 80), 4)
+        self.assertEqual(fs._FileStorage__objects, {})
+        cheapest = next(fs.between("Place", "price_by_night"))
+        self.assertEqual(cheapest.id, self.places[4].id)
+        self.assertEqual(len(fs._FileStorage__objects), 1)
+
+    def test_query_plans(self):
+        """Queries read the sorted index matching the fewest objects"""
+        query = self.storage.query("Place")
+        by_range = query.filter(price_by_night__lte=100, max_guest__gte=0)
+        self.assertEqual(
+            by_range.explain(),
+            "range lookup Place.price_by_night [, 100] (3 objects)\n"
+            "filter max_guest gte 0",
+        )
+        self.assertEqual(len(by_range.all()), 3)
+        dearest = query.order_by("-price_by_night").limit(2)
+        self.assertEqual(
+            dearest.explain(),
+            "range lookup Place.price_by_night [, ] reversed\nlimit 2",
+        )
+        self.assertEqual(
+            [place.price_by_night for place in dearest], [200, 120]
+        )
+        filtered = query.filter(name__ne="Place 2").order_by("price_by_night")
+        self.assertEqual(
+            filtered.explain(),
+            "range lookup Place.price_by_night [, ]\n"
+            "filter name ne 'Place 2'",
+        )
+        self.assertEqual(
+            [place.price_by_night for place in filtered], [50, 80, 80, 120]
+        )
+
+    def test_query_unindexed_values(self):
+        """Values that are not numbers are sorted apart from the index"""
+        from models.place import Place
+
+        self.storage.new(Place(name="quoted", price_by_night="30"))
+        self.storage.new(Place(name="unpriced", price_by_night=None))
+        query = self.storage.query("Place").filter(name__ne="Place 2")
+        cheapest = query.order_by("price_by_night")
+        self.assertEqual(
+            cheapest.explain(),
+            "range lookup Place.price_by_night [, ]"
+            " + 2 objects not indexed, sorted\n"
+            "filter name ne 'Place 2'",
+        )
+        self.assertEqual(
+            [place.price_by_night for place in cheapest],
+            [50, 80, 80, 120, "30", None],
+        )
+        self.assertEqual(
+            [place.price_by_night for place in cheapest.limit(2)], [50, 80]
+        )
+        dearest = query.order_by("-price_by_night")
+        self.assertEqual(
+            [place.price_by_night for place in dearest],
+            [None, "30", 120, 80, 80, 50],
+        )
@@ -0,0 +1,172 @@
+#!/usr/bin/python3
+"""Module for testing the geospatial index"""
+import os
+import random
+import unittest
+from models import sql_storage
+from models.engine.geo import Grid, circle_box, distance, in_box
+from tests.test_models.test_engine.engines import ObjectEnginesTestCase
+
+
+class test_geometry(unittest.TestCase):
+    """Class to test the distances and boxes"""
+
+    def test_distance(self):
+        """Great-circle distances in km"""
+        self.assertEqual(distance(37.77, -122.41, 37.77, -122.41), 0)
+        # San Francisco to Los Angeles
+        self.assertAlmostEqual(
+            distance(37.7749, -122.4194, 34.0522, -118.2437), 559, delta=1
+        )
+        # one degree of longitude on the equator, across the antimeridian
+        self.assertAlmostEqual(distance(0, 179.5, 0, -179.5), 111.2, 1)
+
+    def test_circle_box(self):
+        """The box holds every point of the circle"""
+        rng = random.Random(0)
+        for _ in range(200):
+            latitude = rng.uniform(-85, 85)
+            longitude = rng.uniform(-180, 180)
+            radius = rng.choice((1, 50, 500))
+            box = circle_box(latitude, longitude, radius)
+            for _ in range(20):
+                lat = latitude + rng.uniform(-5, 5)
+                lon = (longitude + rng.uniform(-30, 30) + 180) % 360 - 180
+                if -90 <= lat <= 90 and distance(
+                    latitude, longitude, lat, lon
+                ) <= radius:
+                    self.assertTrue(in_box(lat, lon, box))
+
+    def test_poles_and_antimeridian(self):
+        """Boxes wrap around the antimeridian and widen at the poles"""
+        south, west, north, east = circle_box(0, 179.9, 50)
+        self.assertGreater(west, east)
+        self.assertTrue(in_box(0, -179.9, (south, west, north, east)))
+        self.assertFalse(in_box(0, 0, (south, west, north, east)))
+        self.assertEqual(circle_box(89.9, 0, 50)[1::2], (-180.0, 180.0))
+
+
+class test_grid(unittest.TestCase):
+    """Class to test the grid index"""
+
+    def test_within(self):
+        """The grid finds the same keys as a scan"""
+        rng = random.Random(1)
+        grid = Grid()
+        points = {}
+        for i in range(2000):
+            points[i] = (rng.uniform(-60, 60), rng.uniform(-180, 180))
+            grid.add(i, points[i])
+        for i in range(0, 2000, 3):
+            grid.remove(i)
+            del points[i]
+        grid.add(1, (10.0, 10.0))
+        points[1] = (10.0, 10.0)
+        self.assertEqual(len(grid), len(points))
+        for box in (
+            (-10, -10, 10, 10.0),
+            (5.5, 100.25, 6.5, 101),
+            (-30, 170, 30, -170),
+            (-90, -180, 90, 180),
+        ):
+            self.assertEqual(
+                sorted(grid.within(box)),
+                sorted(k for k, p in points.items() if in_box(*p, box)),
+            )
+
+
+@unittest.skipIf(sql_storage, 'Not testing object engines. Using db storage.')
+class test_engines(ObjectEnginesTestCase):
+    """Class to test the nearby and box searches of the object engines"""
+
+    def setUp(self):
+        """Set up places around San Francisco and the antimeridian"""
+        from models.place import Place
+
+        super().setUp()
+        self.places = {
+            name: Place(name=name, latitude=latitude, longitude=longitude)
+            for name, latitude, longitude in (
+                ("Mission", 37.76, -122.42),
+                ("Oakland", 37.80, -122.27),
+                ("Los Angeles", 34.05, -118.24),
+                ("Fiji", -17.7, 178.0),
+                ("Samoa", -13.8, -172.1),
+            )
+        }
+
+    def names(self, places):
+        """Returns the names of `places`"""
+        return [place.name for place in places]
+
+    def test_nearby(self):
+        """Places within a radius, the nearest first"""
+        for fs in self.storages(self.places.values()):
+            with self.subTest(storage=type(fs).__name__):
+                self.assertEqual(
+                    self.names(fs.nearby("Place", 37.77, -122.41, 20)),
+                    ["Mission", "Oakland"],
+                )
+                self.assertEqual(
+                    self.names(fs.nearby("Place", 37.80, -122.27, 600)),
+                    ["Oakland", "Mission", "Los Angeles"],
+                )
+                self.assertEqual(fs.nearby("Place", 0, 0, 100), [])
+                self.assertEqual(fs.nearby("State", 37.77, -122.41, 20), [])
+
+    def test_within(self):
+        """Places in a box, across the antimeridian too"""
+        for fs in self.storages(self.places.values()):
+            with self.subTest(storage=type(fs).__name__):
+                self.assertEqual(
+                    sorted(self.names(fs.within("Place", 30, -125, 38, -118))),
+                    ["Los Angeles", "Mission", "Oakland"],
+                )
+                self.assertEqual(
+                    sorted(self.names(fs.within("Place", -20, 170, 0, -170))),
+                    ["Fiji", "Samoa"],
+                )
+
+    def test_moved_and_deleted(self):
+        """The index follows new() and delete()"""
+        from models.place import Place
+
+        for fs in self.storages(self.places.values()):
+            with self.subTest(storage=type(fs).__name__):
+                place = Place(name="Moving", latitude=37.77, longitude=-122.4)
+                fs.new(place)
+                fs.save()
+                self.assertIn("Moving", self.names(fs.within(
+                    "Place", 37, -123, 38, -122
+                )))
+                place.latitude, place.longitude = -17.6, 178.1
+                fs.new(place)
+                fs.delete(self.places["Fiji"])
+                fs.save()
+                self.assertEqual(
+                    self.names(fs.nearby("Place", -17.7, 178.0, 50)),
+                    ["Moving"],
+                )
+                self.assertEqual(
+                    self.names(fs.nearby("Place", 37.77, -122.41, 20)),
+                    ["Mission", "Oakland"],
+                )
+
+    def test_lazy(self):
+        """The file storage builds only the places it returns"""
+        from models.engine.file_storage import FileStorage
+
+        path = os.path.join(self.tmp.name, 'lazy.json')
+        fs = FileStorage(path)
+        for place in self.places.values():
+            fs.new(place)
+        fs.save()
+        lazy = FileStorage(path, lazy=True)
+        lazy.reload()
+        self.assertEqual(
+            self.names(lazy.nearby("Place", 37.77, -122.41, 5)), ["Mission"]
+        )
+        self.assertEqual(
+            list(lazy._FileStorage__objects),
+            [f"Place.{self.places['Mission'].id}"],
+        )
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+"""Module for testing the storage locks"""
+import os
+import tempfile
+import threading
+import time
+import unittest
+from models.engine.locks import FileLock, RWLock, fcntl
+
+
+class test_rwLock(unittest.TestCase):
+    """Class to test the reader/writer lock"""
+
+    def setUp(self):
+        """Set up a lock"""
+        self.lock = RWLock()
+
+    def run_thread(self, target):
+        """Starts `target` in a thread and returns the thread"""
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def test_readers_share(self):
+        """Several threads can read at the same time"""
+        inside = threading.Barrier(2, timeout=5)
+
+        def read():
+            with self.lock.read():
+                inside.wait()
+
+        threads = [self.run_thread(read) for _ in range(2)]
+        for thread in threads:
+            thread.join(5)
+        self.assertFalse(inside.broken)
+
+    def test_writer_excludes_readers(self):
+        """Readers wait for the writer to be done"""
+        events = []
+
+        def read():
+            with self.lock.read():
+                events.append("read")
+
+        with self.lock.write():
+            thread = self.run_thread(read)
+            time.sleep(0.05)
+            events.append("written")
+        thread.join(5)
+        self.assertEqual(events, ["written", "read"])
+
+    def test_waiting_writer_goes_first(self):
+        """A waiting writer goes before the readers coming after it"""
+        events = []
+
+        def write():
+            with self.lock.write():
+                events.append("write")
+
+        def read():
+            with self.lock.read():
+                events.append("read")
+
+        with self.lock.read():
+            writer = self.run_thread(write)
+            time.sleep(0.05)
+            reader = self.run_thread(read)
+            time.sleep(0.05)
+            self.assertEqual(events, [])
+        writer.join(5)
+        reader.join(5)
+        self.assertEqual(events, ["write", "read"])
+
+    def test_reentrant(self):
+        """The writer can read and write again, readers can read again"""
+        with self.lock.write():
+            with self.lock.write():
+                with self.lock.read():
+                    pass
+        with self.lock.read():
+            with self.lock.read():
+                pass
+        with self.lock.write():
+            pass
+
+    def test_no_upgrade(self):
+        """A reader cannot take the write lock"""
+        with self.lock.read():
+            with self.assertRaises(RuntimeError):
+                with self.lock.write():
+                    pass
+
+
+class test_fileLock(unittest.TestCase):
+    """Class to test the advisory file lock"""
+
+    def setUp(self):
+        """Set up a lock in a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.lock = FileLock(os.path.join(self.tmp.name, 'hbnb.json.lock'))
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.tmp.cleanup()
+
+    def holds(self, side):
+        """Returns whether another thread gets `side` of the lock soon"""
+        acquired = threading.Event()
+
+        def take():
+            with side():
+                acquired.set()
+
+        thread = threading.Thread(target=take, daemon=True)
+        thread.start()
+        return acquired.wait(0.2)
+
+    @unittest.skipIf(fcntl is None, 'fcntl is not available')
+    def test_shared(self):
+        """Readers share the lock but exclude writers"""
+        with self.lock.shared():
+            self.assertTrue(self.holds(self.lock.shared))
+            self.assertFalse(self.holds(self.lock.exclusive))
+
+    @unittest.skipIf(fcntl is None, 'fcntl is not available')
+    def test_exclusive(self):
+        """A writer excludes everyone"""
+        with self.lock.exclusive():
+            self.assertFalse(self.holds(self.lock.shared))
+
+    def test_no_path(self):
+        """A lock without a path locks nothing"""
+        lock = FileLock(None)
+        with lock.exclusive():
+            with lock.exclusive():
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
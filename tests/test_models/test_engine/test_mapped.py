@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""Module for testing the memory-mapped snapshot layout"""
+import os
+import tempfile
+import unittest
+from models.engine.mapped import MappedSnapshot, iter_mapped, write_mapped
+
+
+class test_mappedSnapshot(unittest.TestCase):
+    """Class to test the mapped snapshot reader and writer"""
+
+    records = {
+        "State.b": {"id": "b", "name": "Califørnia", "__class__": "State"},
+        "City.a": {"id": "a", "state_id": "b", "__class__": "City"},
+        "Place.long-id": {"id": "long-id", "amenity_ids": ["x"]},
+    }
+
+    def setUp(self):
+        """Write the records to a temporary file"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'hbnb.map')
+        self.write(self.records)
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.tmp.cleanup()
+
+    def write(self, records):
+        """Writes `records` to the temporary file"""
+        with open(self.path, 'wb') as f:
+            write_mapped(f, records.items())
+
+    def open(self):
+        """Returns the snapshot of the temporary file"""
+        with open(self.path, 'rb') as f:
+            return MappedSnapshot(f)
+
+    def test_lookup(self):
+        """Records are found by key"""
+        snapshot = self.open()
+        self.assertEqual(len(snapshot), 3)
+        for key, record in self.records.items():
+            self.assertIn(key, snapshot)
+            self.assertEqual(snapshot[key], record)
+        for key in ("State.c", "A", "Place.long-id-longer", ""):
+            self.assertNotIn(key, snapshot)
+            self.assertIsNone(snapshot.get(key))
+        with self.assertRaises(KeyError):
+            snapshot["State.c"]
+        snapshot.close()
+
+    def test_sorted_keys(self):
+        """Keys and records are listed in key order"""
+        snapshot = self.open()
+        self.assertEqual(list(snapshot), sorted(self.records))
+        self.assertEqual(dict(snapshot.items()), self.records)
+        snapshot.close()
+
+    def test_iter_mapped(self):
+        """The streaming reader yields every record"""
+        with open(self.path, 'rb') as f:
+            self.assertEqual(dict(iter_mapped(f)), self.records)
+        self.write({})
+        with open(self.path, 'rb') as f:
+            self.assertEqual(dict(iter_mapped(f)), {})
+        open(self.path, 'w').close()
+        with open(self.path, 'rb') as f:
+            self.assertEqual(dict(iter_mapped(f)), {})
+
+    def test_invalid(self):
+        """Files in another layout raise ValueError"""
+        for data in (b'{"State.1": {}}' * 3, b"HBNB"):
+            with self.subTest(data=data):
+                with open(self.path, 'wb') as f:
+                    f.write(data)
+                with self.assertRaises(ValueError):
+                    self.open()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""Module for testing memory storage"""
+import os
+import unittest
+from models import sql_storage
+from models.engine.memory_storage import MemoryStorage
+
+
+@unittest.skipIf(sql_storage, 'Not testing memory storage. Using db storage.')
+class test_MemoryStorage(unittest.TestCase):
+    """Class to test the memory storage methods"""
+
+    def setUp(self):
+        """Set up a storage holding a state and one of its cities"""
+        from models.state import State
+        from models.city import City
+
+        self.fs = MemoryStorage()
+        self.state = State(name="California")
+        self.city = City(state_id=self.state.id, name="San Francisco")
+        self.fs.new(self.state)
+        self.fs.new(self.city)
+
+    def test_all(self):
+        """all() returns copies of every object or those of a class"""
+        from models.state import State
+
+        objects = self.fs.all()
+        self.assertEqual(
+            objects,
+            {
+                f"State.{self.state.id}": self.state,
+                f"City.{self.city.id}": self.city,
+            },
+        )
+        objects.clear()
+        self.assertEqual(len(self.fs.all()), 2)
+        self.assertEqual(list(self.fs.all(State).values()), [self.state])
+        self.assertEqual(list(self.fs.all("City").values()), [self.city])
+
+    def test_get_related(self):
+        """Objects are found by id and by foreign key"""
+        from models.city import City
+
+        self.assertIs(self.fs.get("State", self.state.id), self.state)
+        self.assertIsNone(self.fs.get("State", self.city.id))
+        self.assertEqual(
+            self.fs.related(City, "state_id", self.state.id), [self.city]
+        )
+        self.city.state_id = "other"
+        self.fs.new(self.city)
+        self.assertEqual(self.fs.related(City, "state_id", self.state.id), [])
+        self.assertEqual(
+            self.fs.related(City, "state_id", "other"), [self.city]
+        )
+
+    def test_count(self):
+        """count() counts the instances of a class or of every class"""
+        from models.city import City
+
+        self.assertEqual(self.fs.count(), 2)
+        self.assertEqual(self.fs.count(City), 1)
+        self.assertEqual(self.fs.count("Place"), 0)
+        self.fs.delete(self.city)
+        self.assertEqual(self.fs.count("City"), 0)
+
+    def test_delete(self):
+        """Deleted objects are forgotten"""
+        self.fs.delete(self.city)
+        self.fs.delete(None)
+        self.assertEqual(list(self.fs.all()), [f"State.{self.state.id}"])
+        self.assertEqual(self.fs.all("City"), {})
+        self.assertEqual(
+            self.fs.related("City", "state_id", self.state.id), []
+        )
+
+    def test_no_io(self):
+        """Saving, reloading and closing touch no file"""
+        cwd = os.getcwd()
+        before = set(os.listdir(cwd))
+        self.fs.save()
+        self.fs.reload()
+        self.fs.close()
+        self.assertEqual(set(os.listdir(cwd)), before)
+        self.assertEqual(len(self.fs.all()), 2)
@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+"""Module for testing the storage queries"""
+import os
+import tempfile
+import unittest
+from models import sql_storage
+from models.engine.memory_storage import MemoryStorage
+from models.engine.query import parse_condition
+
+
+class test_parseCondition(unittest.TestCase):
+    """Class to test the parsing of the filter() keywords"""
+
+    def test_operators(self):
+        """Keywords name an attribute and an optional operator"""
+        self.assertEqual(parse_condition("name", "a"), ("name", "eq", "a"))
+        self.assertEqual(
+            parse_condition("max_guest__gte", 2), ("max_guest", "gte", 2)
+        )
+        self.assertEqual(
+            parse_condition("id__in", ["a", "b", "a"]),
+            ("id", "in", ("a", "b")),
+        )
+        with self.assertRaises(ValueError):
+            parse_condition("name__like", "a%")
+
+
+@unittest.skipIf(sql_storage, 'Not testing object queries. Using db storage.')
+class test_query(unittest.TestCase):
+    """Class to test the queries of the engines holding objects"""
+
+    def setUp(self):
+        """Set up a storage holding two states and their cities"""
+        from models.state import State
+        from models.city import City
+        from models.place import Place
+
+        self.fs = MemoryStorage()
+        self.states = [State(name="California"), State(name="Nevada")]
+        self.cities = [
+            City(state_id=self.states[0].id, name="San Francisco"),
+            City(state_id=self.states[0].id, name="Fremont"),
+            City(state_id=self.states[1].id, name="Reno"),
+        ]
+        self.places = [
+            Place(city_id=self.cities[0].id, name=f"Place {i}",
+                  price_by_night=price)
+            for i, price in enumerate((120, 80, 200, 80))
+        ]
+        for obj in self.states + self.cities + self.places:
+            self.fs.new(obj)
+
+    def names(self, query):
+        """Returns the names of the objects of `query`"""
+        return [obj.name for obj in query]
+
+    def test_filters(self):
+        """Equality, range and membership conditions"""
+        from models.place import Place
+
+        query = self.fs.query(Place)
+        self.assertEqual(
+            sorted(self.names(query.filter(price_by_night=80))),
+            ["Place 1", "Place 3"],
+        )
+        self.assertEqual(
+            sorted(self.names(query.filter(price_by_night__gt=100))),
+            ["Place 0", "Place 2"],
+        )
+        self.assertEqual(
+            self.names(
+                query.filter(price_by_night__gte=80, price_by_night__lt=120)
+                .filter(name__ne="Place 3")
+            ),
+            ["Place 1"],
+        )
+        self.assertEqual(
+            sorted(self.names(query.filter(name__in=["Place 2", "Place 9"]))),
+            ["Place 2"],
+        )
+        self.assertEqual(query.filter(description__gt="a").all(), [])
+
+    def test_order_limit(self):
+        """Objects are sorted on several keys and limited"""
+        from models.place import Place
+
+        query = self.fs.query(Place).order_by("price_by_night", "-name")
+        self.assertEqual(
+            self.names(query),
+            ["Place 3", "Place 1", "Place 0", "Place 2"],
+        )
+        self.assertEqual(self.names(query.limit(2)), ["Place 3", "Place 1"])
+        self.assertEqual(query.first().name, "Place 3")
+        self.assertEqual(query.count(), 4)
+        self.assertEqual(query.limit(2).count(), 2)
+        self.assertIsNone(query.filter(name="none").first())
+
+    def test_order_mixed_types(self):
+        """Values of different types are sorted without comparing them"""
+        from models.place import Place
+
+        # e.g. a place created from the console with a quoted price
+        self.places[0].price_by_night = "30"
+        self.places[1].price_by_night = None
+        query = self.fs.query(Place).order_by("price_by_night")
+        self.assertEqual(
+            self.names(query), ["Place 3", "Place 2", "Place 0", "Place 1"]
+        )
+        self.assertEqual(
+            self.names(query.order_by("-name").limit(2)),
+            ["Place 3", "Place 2"],
+        )
+
+    def test_plans(self):
+        """The cheapest index is chosen before a scan"""
+        from models.city import City
+
+        state = self.states[0]
+        query = self.fs.query(City)
+        by_id = query.filter(name="Reno", id=self.cities[2].id)
+        self.assertEqual(
+            by_id.explain(),
+            "primary key lookup City.id (1 ids)\nfilter name eq 'Reno'",
+        )
+        self.assertEqual(self.names(by_id), ["Reno"])
+        by_fk = query.filter(state_id=state.id).order_by("name").limit(1)
+        self.assertEqual(
+            by_fk.explain(),
+            "index lookup City.state_id (1 values)\nsort by name\nlimit 1",
+        )
+        self.assertEqual(self.names(by_fk), ["Fremont"])
+        scan = query.filter(name__in=["Reno", "Fremont"])
+        self.assertEqual(
+            scan.explain(), "scan City\nfilter name in ('Reno', 'Fremont')"
+        )
+        self.assertEqual(scan.count(), 2)
+
+    def test_file_and_dbm_storages(self):
+        """The other engines holding objects run the same queries"""
+        from models.engine.dbm_storage import DBMStorage
+        from models.engine.file_storage import FileStorage
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for fs in (
+                FileStorage(os.path.join(tmp, 'hbnb.json')),
+                DBMStorage(os.path.join(tmp, 'hbnb')),
+            ):
+                for obj in self.states + self.cities + self.places:
+                    fs.new(obj)
+                fs.save()
+                query = fs.query("City").filter(
+                    state_id=self.states[0].id, name__lt="S"
+                )
+                self.assertTrue(query.explain().startswith("index lookup"))
+                self.assertEqual(self.names(query), ["Fremont"])
+                fs.close()
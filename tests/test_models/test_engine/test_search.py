@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+"""Module for testing the full-text index"""
+import os
+import unittest
+from models import sql_storage
+from models.engine.search import TextIndex, parse_search, tokenize
+from tests.test_models.test_engine.engines import ObjectEnginesTestCase
+
+
+class test_parsing(unittest.TestCase):
+    """Class to test the words of texts and searches"""
+
+    def test_tokenize(self):
+        """Texts are cut into lowercase words"""
+        self.assertEqual(
+            tokenize("Sea-side CAFÉ, 2 rooms!"),
+            ["sea", "side", "café", "2", "rooms"],
+        )
+
+    def test_parse_search(self):
+        """Words and quoted phrases"""
+        self.assertEqual(
+            parse_search('quiet "Ocean view" sea-side ""'),
+            [("quiet",), ("ocean", "view"), ("sea", "side")],
+        )
+        self.assertEqual(parse_search('"unclosed phrase'),
+                         [("unclosed", "phrase")])
+        self.assertEqual(parse_search(' ,; '), [])
+
+
+class test_textIndex(unittest.TestCase):
+    """Class to test the inverted index"""
+
+    def setUp(self):
+        """Index a few texts"""
+        self.index = TextIndex()
+        self.index.add("loft", ["Ocean loft", "Quiet loft with an ocean view"])
+        self.index.add("house", ["Beach house", "A view of the ocean"])
+        self.index.add("studio", ["Studio", None, "Ocean, ocean, ocean"])
+        self.index.add("cabin", ["Cabin", "View of the mountains"])
+
+    def test_search(self):
+        """Every word must match, the best ranked first"""
+        self.assertEqual(
+            self.index.search("ocean"), ["studio", "loft", "house"]
+        )
+        self.assertEqual(self.index.search("OCEAN view"), ["loft", "house"])
+        self.assertEqual(self.index.search("ocean", limit=1), ["studio"])
+        self.assertEqual(self.index.search("ocean desert"), [])
+        self.assertEqual(self.index.search(""), [])
+
+    def test_phrases(self):
+        """Phrases match words next to each other, in one field"""
+        self.assertEqual(self.index.search('"ocean view"'), ["loft"])
+        self.assertEqual(self.index.search('"view of the"'),
+                         ["cabin", "house"])
+        # "loft" ends the name and "quiet" starts the description
+        self.assertEqual(self.index.search('"loft quiet"'), [])
+
+    def test_add_remove(self):
+        """Texts are replaced and removed"""
+        self.index.add("cabin", ["Cabin", "Ocean front"])
+        self.index.remove("studio")
+        self.index.remove("unknown")
+        self.assertEqual(
+            sorted(self.index.search("ocean")), ["cabin", "house", "loft"]
+        )
+        self.assertEqual(self.index.search("mountains"), [])
+        self.assertNotIn("mountains", self.index.postings)
+        self.index.add("house", [None, ""])
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(
+            self.index.total, sum(self.index.lengths.values())
+        )
+
+
+@unittest.skipIf(sql_storage, 'Not testing object engines. Using db storage.')
+class test_engines(ObjectEnginesTestCase):
+    """Class to test the searches of the object engines"""
+
+    def setUp(self):
+        """Set up places and reviews"""
+        from models.place import Place
+        from models.review import Review
+
+        super().setUp()
+        self.loft = Place(
+            name="Ocean loft", description="Quiet loft with an ocean view"
+        )
+        self.house = Place(name="Beach house", description="Sea view")
+        self.review = Review(
+            place_id=self.loft.id, text="The ocean view is stunning"
+        )
+        self.objects = [self.loft, self.house, self.review]
+
+    def ids(self, objects):
+        """Returns the ids of `objects`"""
+        return [obj.id for obj in objects]
+
+    def test_search(self):
+        """Places and reviews are searched apart"""
+        for fs in self.storages(self.objects):
+            with self.subTest(storage=type(fs).__name__):
+                self.assertEqual(
+                    self.ids(fs.search("Place", "view")),
+                    [self.house.id, self.loft.id],
+                )
+                self.assertEqual(
+                    self.ids(fs.search("Place", '"ocean view"')),
+                    [self.loft.id],
+                )
+                self.assertEqual(
+                    self.ids(fs.search("Review", "stunning")),
+                    [self.review.id],
+                )
+                self.assertEqual(fs.search("Place", "stunning"), [])
+                self.assertEqual(fs.search("State", "view"), [])
+
+    def test_changed_and_deleted(self):
+        """The index follows new() and delete()"""
+        from models.place import Place
+
+        for fs in self.storages(self.objects):
+            with self.subTest(storage=type(fs).__name__):
+                cabin = Place(name="Cabin", description="Lake view")
+                fs.new(cabin)
+                fs.save()
+                self.assertIn(cabin.id, self.ids(fs.search("Place", "view")))
+                cabin.description = "By the lake"
+                fs.new(cabin)
+                fs.delete(self.loft)
+                fs.save()
+                self.assertEqual(
+                    self.ids(fs.search("Place", "view")), [self.house.id]
+                )
+                self.assertEqual(
+                    self.ids(fs.search("Place", "lake")), [cabin.id]
+                )
+
+    def test_lazy(self):
+        """The file storage builds only the objects it returns"""
+        from models.engine.file_storage import FileStorage
+
+        path = os.path.join(self.tmp.name, 'lazy.json')
+        fs = FileStorage(path)
+        for obj in self.objects:
+            fs.new(obj)
+        fs.save()
+        lazy = FileStorage(path, lazy=True)
+        lazy.reload()
+        self.assertEqual(
+            self.ids(lazy.search("Place", "quiet")), [self.loft.id]
+        )
+        self.assertEqual(
+            list(lazy._FileStorage__objects), [f"Place.{self.loft.id}"]
+        )
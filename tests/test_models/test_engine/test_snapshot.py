@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+"""Module for testing the snapshot readers and writers"""
+import json
+import unittest
+from io import StringIO
+from models.engine.snapshot import iter_json, write_json
+
+
+class test_jsonStream(unittest.TestCase):
+    """Class to test the streaming JSON reader and writer"""
+
+    records = {
+        "State.1": {"id": "1", "name": "California", "__class__": "State"},
+        "Place.2": {"id": "2", "price_by_night": 123456, "latitude": 1.5},
+        "Review.3": {"id": "3", "text": "a \"quoted\" text, {not} json"},
+    }
+
+    def test_iter_json_small_chunks(self):
+        """Records spanning several chunks are decoded"""
+        text = json.dumps(self.records, indent=2)
+        for chunk_size in (1, 3, 7, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                pairs = iter_json(StringIO(text), chunk_size)
+                self.assertEqual(dict(pairs), self.records)
+
+    def test_iter_json_empty(self):
+        """Empty files and empty objects yield nothing"""
+        self.assertEqual(list(iter_json(StringIO(""))), [])
+        self.assertEqual(list(iter_json(StringIO(" { } "))), [])
+
+    def test_iter_json_invalid(self):
+        """Invalid files raise a ValueError"""
+        for text in ('[1, 2]', '{"a": {}', '{"a" {}}', '{"a": {}}}x'):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    list(iter_json(StringIO(text), 2))
+
+    def test_write_json(self):
+        """The written text is the same as json.dump"""
+        f = StringIO()
+        write_json(f, self.records.items())
+        self.assertEqual(f.getvalue(), json.dumps(self.records))
+        f = StringIO()
+        write_json(f, [])
+        self.assertEqual(f.getvalue(), "{}")
@@ -0,0 +1,251 @@
+#!/usr/bin/python3
+"""Module for testing SQLite storage"""
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from models import storage, storage_type
+
+ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+)
+
+
+@unittest.skipIf(storage_type != 'sqlite', 'Not testing SQLite storage.')
+class test_SQLiteStorage(unittest.TestCase):
+    """Class to test the SQLite storage methods"""
+
+    def test_new_save_delete(self):
+        """Saved objects are listed until they are deleted"""
+        from models.state import State
+
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        key = f"State.{state.id}"
+        self.assertIs(storage.all(State)[key], state)
+        self.assertIn(key, storage.all())
+        storage.delete(state)
+        storage.save()
+        self.assertNotIn(key, storage.all("State"))
+
+    def test_all_classes(self):
+        """all() without a class lists the objects of every class"""
+        from models.state import State
+        from models.amenity import Amenity
+
+        state = State(name="Nevada")
+        amenity = Amenity(name="Wifi")
+        storage.new(state)
+        storage.new(amenity)
+        storage.save()
+        objects = storage.all()
+        self.assertIn(f"State.{state.id}", objects)
+        self.assertIn(f"Amenity.{amenity.id}", objects)
+        storage.delete(state)
+        storage.delete(amenity)
+        storage.save()
+
+
+class test_SQLiteStorageFile(unittest.TestCase):
+    """Class to test the SQLite database file from other processes"""
+
+    def setUp(self):
+        """Set up a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'hbnb.db')
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.tmp.cleanup()
+
+    def run_script(self, script):
+        """Runs `script` with the SQLite storage, returns its output"""
+        env = dict(
+            os.environ, HBNB_TYPE_STORAGE='sqlite', HBNB_SQLITE_PATH=self.path
+        )
+        env.pop('HBNB_ENV', None)
+        return subprocess.run(
+            [sys.executable, '-c', script], cwd=ROOT, env=env,
+            check=True, capture_output=True, text=True,
+        ).stdout
+
+    def test_persisted(self):
+        """Objects saved by a process are read back by the next one"""
+        self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            "from models.city import City\n"
+            "state = State(name='California')\n"
+            "storage.new(state)\n"
+            "storage.new(City(name='Fremont', state_id=state.id))\n"
+            "storage.save()\n"
+            "storage.close()\n"
+        )
+        out = self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            "state, = storage.all(State).values()\n"
+            "print(state.name, [city.name for city in state.cities])\n"
+        )
+        self.assertEqual(out, "California ['Fremont']\n")
+
+    def test_get_count(self):
+        """Objects are fetched by id and counted by class"""
+        out = self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            "state = State(name='California')\n"
+            "storage.new(state)\n"
+            "storage.new(State(name='Nevada'))\n"
+            "storage.save()\n"
+            "storage.close()\n"
+            "print(storage.get(State, state.id).name,"
+            " storage.get('State', 'missing'),"
+            " storage.count(State), storage.count('City'), storage.count())\n"
+        )
+        self.assertEqual(out, "California None 2 0 2\n")
+
+    def test_console_destroy(self):
+        """The console commits the objects it destroys"""
+        state_id = self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            "state = State(name='California')\n"
+            "storage.new(state)\n"
+            "storage.new(State(name='Nevada'))\n"
+            "storage.save()\n"
+            "storage.close()\n"
+            "print(state.id)\n"
+        ).strip()
+        self.run_script(
+            "from console import HBNBCommand\n"
+            f"HBNBCommand().onecmd('destroy State {state_id}')\n"
+        )
+        out = self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            f"print(storage.get(State, '{state_id}'), storage.count(State))\n"
+        )
+        self.assertEqual(out, "None 1\n")
+
+    def test_query(self):
+        """Queries run as SQL and use the indexes"""
+        out = self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            "from models.city import City\n"
+            "state = State(name='California')\n"
+            "storage.new(state)\n"
+            "for name in ('Fremont', 'Oakland', 'San Jose'):\n"
+            "    storage.new(City(name=name, state_id=state.id))\n"
+            "storage.save()\n"
+            "query = storage.query(City).filter(\n"
+            "    state_id=state.id, name__in=['Oakland', 'San Jose']\n"
+            ").order_by('-name')\n"
+            "print([city.name for city in query], query.count(),\n"
+            "      query.limit(1).first().name)\n"
+            "print(query.explain())\n"
+        )
+        result, sql = out.split("\n", 1)
+        self.assertEqual(result, "['San Jose', 'Oakland'] 2 San Jose")
+        self.assertIn("ORDER BY cities.name DESC", sql)
+        self.assertIn("ix_cities_state_id", sql)
+
+    def test_nearby(self):
+        """Box searches read the (latitude, longitude) index"""
+        out = self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            "from models.city import City\n"
+            "from models.user import User\n"
+            "from models.place import Place\n"
+            "state = State(name='California')\n"
+            "city = City(name='San Francisco', state_id=state.id)\n"
+            "user = User(email='a@b.c', password='pwd')\n"
+            "for obj in (state, city, user):\n"
+            "    storage.new(obj)\n"
+            "for name, lat, lon in (('Mission', 37.76, -122.42),\n"
+            "                       ('Oakland', 37.80, -122.27),\n"
+            "                       ('Fiji', -17.7, 178.0),\n"
+            "                       ('Samoa', -13.8, -172.1)):\n"
+            "    storage.new(Place(name=name, latitude=lat, longitude=lon,\n"
+            "                      city_id=city.id, user_id=user.id))\n"
+            "storage.save()\n"
+            "nearby = storage.nearby(Place, 37.8, -122.3, 20)\n"
+            "print([place.name for place in nearby])\n"
+            "print(sorted(p.name for p in storage.within(\n"
+            "    Place, -20, 170, 0, -170)))\n"
+            "print(storage.query(Place).filter(latitude__gt=0).explain())\n"
+        )
+        nearby, within, sql = out.split("\n", 2)
+        self.assertEqual(nearby, "['Oakland', 'Mission']")
+        self.assertEqual(within, "['Fiji', 'Samoa']")
+        self.assertIn("ix_places_latitude_longitude", sql)
+
+    def test_search(self):
+        """The rows holding the words are ranked"""
+        out = self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            "from models.city import City\n"
+            "from models.user import User\n"
+            "from models.place import Place\n"
+            "state = State(name='California')\n"
+            "city = City(name='San Francisco', state_id=state.id)\n"
+            "user = User(email='a@b.c', password='pwd')\n"
+            "for obj in (state, city, user):\n"
+            "    storage.new(obj)\n"
+            "for name, description in (\n"
+            "        ('Ocean loft', 'Quiet loft with an ocean view'),\n"
+            "        ('Beach house', 'Sea view'),\n"
+            "        ('Overview', 'Downtown')):\n"
+            "    storage.new(Place(name=name, description=description,\n"
+            "                      city_id=city.id, user_id=user.id))\n"
+            "storage.save()\n"
+            "for text in ('view', '\"ocean view\"', 'OCEAN quiet'):\n"
+            "    found = storage.search('Place', text)\n"
+            "    print([place.name for place in found])\n"
+        )
+        self.assertEqual(
+            out.splitlines(),
+            [
+                "['Beach house', 'Ocean loft']",
+                "['Ocean loft']",
+                "['Ocean loft']",
+            ],
+        )
+
+    def test_wal_and_indexes(self):
+        """The file is in WAL mode and the queried columns are indexed"""
+        self.run_script("from models import storage\nstorage.close()\n")
+        with sqlite3.connect(self.path) as conn:
+            mode, = conn.execute("PRAGMA journal_mode").fetchone()
+            indexed = {
+                (table, column)
+                for table in ("cities", "places", "reviews")
+                for _, index, *_ in conn.execute(
+                    f"PRAGMA index_list({table})"
+                )
+                for _, _, column in conn.execute(
+                    f"PRAGMA index_info({index})"
+                )
+            }
+        conn.close()
+        self.assertEqual(mode, "wal")
+        self.assertLessEqual(
+            {
+                ("cities", "state_id"),
+                ("places", "city_id"),
+                ("places", "user_id"),
+                ("places", "price_by_night"),
+                ("places", "max_guest"),
+                ("places", "number_rooms"),
+                ("places", "latitude"),
+                ("reviews", "place_id"),
+                ("reviews", "user_id"),
+            },
+            indexed,
+        )
@@ -2,7 +2,7 @@
 """Test module for Place class"""
 import unittest
 from models.place import Place
-from models import storage_type
+from models import sql_storage
 from models.base_model import BaseModel
 
 
@@ -82,7 +82,7 @@ class TestPlace(unittest.TestCase):
         """Test Place has attr city_id, and it's an empty string"""
         place = Place()
         self.assertTrue(hasattr(place, "city_id"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(place.city_id, None)
         else:
             self.assertEqual(place.city_id, "")
@@ -91,7 +91,7 @@ class TestPlace(unittest.TestCase):
         """Test Place has attr user_id, and it's an empty string"""
         place = Place()
         self.assertTrue(hasattr(place, "user_id"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(place.user_id, None)
         else:
             self.assertEqual(place.user_id, "")
@@ -100,7 +100,7 @@ class TestPlace(unittest.TestCase):
         """Test Place has attr name, and it's an empty string"""
         place = Place()
         self.assertTrue(hasattr(place, "name"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(place.name, None)
         else:
             self.assertEqual(place.name, "")
@@ -109,7 +109,7 @@ class TestPlace(unittest.TestCase):
         """Test Place has attr description, and it's an empty string"""
         place = Place()
         self.assertTrue(hasattr(place, "description"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(place.description, None)
         else:
             self.assertEqual(place.description, "")
@@ -118,7 +118,7 @@ class TestPlace(unittest.TestCase):
         """Test Place has attr number_rooms, and it's an int == 0"""
         place = Place()
         self.assertTrue(hasattr(place, "number_rooms"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(place.number_rooms, None)
         else:
             self.assertEqual(type(place.number_rooms), int)
@@ -128,7 +128,7 @@ class TestPlace(unittest.TestCase):
         """Test Place has attr number_bathrooms, and it's an int == 0"""
         place = Place()
         self.assertTrue(hasattr(place, "number_bathrooms"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(place.number_bathrooms, None)
         else:
             self.assertEqual(type(place.number_bathrooms), int)
@@ -138,7 +138,7 @@ class TestPlace(unittest.TestCase):
         """Test Place has attr max_guest, and it's an int == 0"""
         place = Place()
         self.assertTrue(hasattr(place, "max_guest"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(place.max_guest, None)
         else:
             self.assertEqual(type(place.max_guest), int)
@@ -148,7 +148,7 @@ class TestPlace(unittest.TestCase):
         """Test Place has attr price_by_night, and it's an int == 0"""
         place = Place()
         self.assertTrue(hasattr(place, "price_by_night"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(place.price_by_night, None)
         else:
             self.assertEqual(type(place.price_by_night), int)
@@ -158,7 +158,7 @@ class TestPlace(unittest.TestCase):
         """Test Place has attr latitude, and it's a float == 0.0"""
         place = Place()
         self.assertTrue(hasattr(place, "latitude"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(place.latitude, None)
         else:
             self.assertEqual(type(place.latitude), float)
@@ -168,13 +168,13 @@ class TestPlace(unittest.TestCase):
         """Test Place has attr longitude, and it's a float == 0.0"""
         place = Place()
         self.assertTrue(hasattr(place, "longitude"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(place.longitude, None)
         else:
             self.assertEqual(type(place.longitude), float)
             self.assertEqual(place.longitude, 0.0)
 
-    @unittest.skipIf(storage_type == 'db', "not testing File Storage")
+    @unittest.skipIf(sql_storage, "not testing File Storage")
     def test_amenity_ids_attr(self):
         """Test Place has attr amenity_ids, and it's an empty list"""
         place = Place()
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """Test module for Review class"""
 import unittest
-from models import storage_type
+from models import sql_storage
 from models.review import Review
 from models.base_model import BaseModel
 
@@ -42,7 +42,7 @@ class TestReview(unittest.TestCase):
         """Test Review has attr place_id, and it's an empty string"""
         review = Review()
         self.assertTrue(hasattr(review, "place_id"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(review.place_id, None)
         else:
             self.assertEqual(review.place_id, "")
@@ -51,7 +51,7 @@ class TestReview(unittest.TestCase):
         """Test Review has attr user_id, and it's an empty string"""
         review = Review()
         self.assertTrue(hasattr(review, "user_id"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(review.user_id, None)
         else:
             self.assertEqual(review.user_id, "")
@@ -60,7 +60,7 @@ class TestReview(unittest.TestCase):
         """Test Review has attr text, and it's an empty string"""
         review = Review()
         self.assertTrue(hasattr(review, "text"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(review.text, None)
         else:
             self.assertEqual(review.text, "")
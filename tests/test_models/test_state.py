@@ -3,7 +3,7 @@
 import unittest
 from models.base_model import BaseModel
 from models.state import State
-from models import storage_type
+from models import sql_storage
 
 
 class TestState(unittest.TestCase):
@@ -32,7 +32,7 @@ class TestState(unittest.TestCase):
         """Test that State has attribute name, and it's as an empty string"""
         state = State()
         self.assertTrue(hasattr(state, "name"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(state.name, None)
         else:
             self.assertEqual(state.name, "")
@@ -2,7 +2,7 @@
 """Test module for User class"""
 import unittest
 from models.user import User
-from models import storage_type
+from models import sql_storage
 from models.base_model import BaseModel
 
 
@@ -47,7 +47,7 @@ class TestUser(unittest.TestCase):
         """Test that User has attr email, and it's an empty string"""
         user = User()
         self.assertTrue(hasattr(user, "email"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(user.email, None)
         else:
             self.assertEqual(user.email, "")
@@ -56,7 +56,7 @@ class TestUser(unittest.TestCase):
         """Test that User has attr password, and it's an empty string"""
         user = User()
         self.assertTrue(hasattr(user, "password"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(user.password, None)
         else:
             self.assertEqual(user.password, "")
@@ -65,7 +65,7 @@ class TestUser(unittest.TestCase):
         """Test that User has attr first_name, and it's an empty string"""
         user = User()
         self.assertTrue(hasattr(user, "first_name"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(user.first_name, None)
         else:
             self.assertEqual(user.first_name, "")
@@ -74,7 +74,7 @@ class TestUser(unittest.TestCase):
         """Test that User has attr last_name, and it's an empty string"""
         user = User()
         self.assertTrue(hasattr(user, "last_name"))
-        if storage_type == 'db':
+        if sql_storage:
             self.assertEqual(user.last_name, None)
         else:
             self.assertEqual(user.last_name, "")
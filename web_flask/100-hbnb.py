@@ -1,14 +1,24 @@
 #!/usr/bin/python3
 """
 Script that starts a Flask web application with a route:
->>  '/hbnb' that displays a list of all States, Cities and Amenities
+>>  '/hbnb' that displays a list of all States, Cities and Amenities,
+>>  and the cheapest places matching the optional query parameters
+>>  max_price, min_guests, min_rooms and min_bathrooms
 """
 import os
-from flask import Flask, render_template
+from flask import Flask, render_template, request
 from models import storage
 
 app = Flask(__name__)
 
+# query parameter: filter() keyword of the places
+place_filters = {
+    'max_price': 'price_by_night__lte',
+    'min_guests': 'max_guest__gte',
+    'min_rooms': 'number_rooms__gte',
+    'min_bathrooms': 'number_bathrooms__gte',
+}
+
 
 def get_image_names():
     """Returns a list of image names without extension"""
@@ -30,13 +40,25 @@ def teardown(exception):
 def hbnb_filters():
     """Displays a list of all States, Cities and Amenities"""
     states = list(storage.all("State").values())
-    places = list(storage.all("Place").values())
     amenities = list(storage.all("Amenity").values())
+    filters = {}
+    for param, keyword in place_filters.items():
+        value = request.args.get(param, type=int)
+        if value is not None:
+            filters[keyword] = value
+    # the sorted indexes of the storage serve the filters and the order
+    places = (
+        storage.query("Place")
+        .filter(**filters)
+        .order_by("price_by_night")
+        .limit(6)  # Display only the 6 cheapest places
+        .all()
+    )
     return render_template(
         '100-hbnb.html',
         stylesheets=True,
         states=states,
-        places=places[:6],  # Display only first 6 places
+        places=places,
         amenities=amenities,
         css_file_prefix='102-',
         image_names=get_image_names(),
@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+"""
+Script that starts a Flask web application with a route:
+>>  '/search?q=<text>' that displays the Places and Reviews whose text
+>>  matches the words and "quoted phrases" of q, the best matches first
+"""
+from flask import Flask, render_template, request
+from models import storage
+
+app = Flask(__name__)
+
+# the number of Places and of Reviews displayed
+LIMIT = 20
+
+
+@app.teardown_appcontext
+def teardown(exception):
+    """Closes the current SQLAlchemy Session"""
+    storage.close()
+
+
+@app.route('/search', strict_slashes=False)
+def search():
+    """Displays the Places and Reviews matching the search"""
+    text = request.args.get('q', '').strip()
+    places = reviews = []
+    if text:
+        places = storage.search("Place", text, LIMIT)
+        reviews = storage.search("Review", text, LIMIT)
+    return render_template(
+        '101-search.html', text=text, places=places, reviews=reviews
+    )
+
+
+if __name__ == '__main__':
+    app.run()
@@ -20,10 +20,13 @@ def teardown(exception):
 @app.route('/states/<state_id>', strict_slashes=False)
 def states(state_id=None):
     """Displays a list of all States or Cities in a State"""
-    states = storage.all("State")
     if state_id:
-        state_id = f"State.{state_id}"
-    return render_template('9-states.html', states=states, state_id=state_id)
+        state = storage.get("State", state_id)
+        return render_template(
+            '9-states.html', state=state, state_id=state_id
+        )
+    states = storage.all("State")
+    return render_template('9-states.html', states=states, state_id=None)
 
 
 if __name__ == '__main__':